@@ -30,6 +30,16 @@ from course.core.scoring import score as default_score
 from course.core.types import Example, RolloutSample
 
 
+# Highest reward the scorer can return (binary verifier). Declared so the harness
+# can stop scoring once a sample reaches it (`course.selection_demo --lazy`).
+MAX_REWARD = 1.0
+
+# pick_best below ranks by (-reward, tie_break_key, index). Lazy/cascaded selection
+# reproduces exactly that ranking, so the harness only uses it for policies that
+# declare it; any other pick_best runs eagerly.
+REFERENCE_RANKING = True
+
+
 @dataclass(frozen=True, slots=True)
 class SelectionResult:
     """Result of selecting one sample from a list."""
@@ -9,6 +9,11 @@ from course.core.scoring import score as default_score
 from course.core.types import Example, RolloutSample
 
 
+# Highest reward the scorer can return (binary verifier). Declared so the harness
+# can stop scoring once a sample reaches it (`course.selection_demo --lazy`).
+MAX_REWARD = 1.0
+
+
 @dataclass(frozen=True, slots=True)
 class SelectionResult:
     """Result of selecting one sample from a list."""
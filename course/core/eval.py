@@ -1,46 +1,61 @@
 from __future__ import annotations
 
-from collections import Counter
+import time
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
 from course.core.completion_sources import CompletionSource, JsonlCompletionSource
-from course.core.datasets import load_examples
-from course.core.io import atomic_write_text, make_run_dir, utc_now_iso, write_json, write_jsonl, write_manifest
+from course.core.datasets import index_by_id, load_examples
+from course.core.io import (
+    atomic_write_text,
+    dump_jsonl_record,
+    ensure_dir,
+    follow_jsonl,
+    make_run_dir,
+    utc_now_iso,
+    write_json,
+    write_jsonl,
+    write_manifest,
+)
+from course.core.rollouts import parse_completion_record
 from course.core.scoring import SCORER_NAME, SCORER_VERSION, score
+from course.core.slices import SliceAccumulator
+from course.core.stats import hash_unit, wilson_interval
+from course.core.types import Example, RolloutSample
 
+_TOP_FAILURES = 10
 
-def evaluate_examples(
-    *,
-    dataset_path: Path,
-    completion_source: CompletionSource,
-    out_dir: Path,
-    max_examples: Optional[int] = None,
-) -> Dict[str, Any]:
-    """Evaluate a dataset using a completion source, writing run artifacts.
-
-    This is the core of Loop A.
-    """
+ScorerFn = Callable[[Example, Any], Dict[str, Any]]
 
-    created_utc = utc_now_iso()
 
-    examples = load_examples(dataset_path)
-    if max_examples is not None:
-        examples = examples[:max_examples]
+class EvalAccumulator:
+    """Running aggregates for Loop A.
 
-    results: list[Dict[str, Any]] = []
-    outcome_codes: Counter[str] = Counter()
-    missing = 0
+    Scores one (example, sample) pair at a time and keeps only counters plus the
+    first few failures, so the summary can be produced at any point without
+    holding the results in memory. `group_by` adds per-slice metrics (see
+    `course.core.slices`) computed in the same pass. `scorer` defaults to the
+    course `score`; callers may pass a memoizing wrapper (see `CachedScorer`).
+    """
 
-    total_reward = 0.0
+    def __init__(self, group_by: Optional[Sequence[str]] = None, *, scorer: ScorerFn = score) -> None:
+        self.scorer = scorer
+        self.n = 0
+        self.n_pass = 0
+        self.missing = 0
+        self.outcome_codes: Counter[str] = Counter()
+        self.kl_sum = 0.0
+        self.n_kl = 0
+        self.top_failures: list[Dict[str, Any]] = []
+        self.slices = SliceAccumulator(group_by) if group_by else None
 
-    kl_vals: list[float] = []
+    def add(self, ex: Example, sample: Optional[RolloutSample]) -> Dict[str, Any]:
+        """Score one example and return its results.jsonl record."""
 
-    for ex in examples:
-        sample = completion_source.get(ex.id)
         missing_completion = sample is None
         if missing_completion:
-            missing += 1
+            self.missing += 1
             completion = None
             sum_logprob = None
             sum_ref_logprob = None
@@ -51,131 +66,433 @@ def evaluate_examples(
             sum_ref_logprob = sample.sum_ref_logprob
             kl_est = sample.kl_estimate()
             if kl_est is not None:
-                kl_vals.append(float(kl_est))
+                self.kl_sum += float(kl_est)
+                self.n_kl += 1
 
-        scored = score(ex, completion)
+        scored = self.scorer(ex, completion)
         reward = float(scored.get("reward", 0.0))
         details = scored.get("details", {})
 
         # Enforce binary reward assumption.
         assert reward in (0.0, 1.0), f"Reward must be 0.0 or 1.0, got {reward} for example {ex.id}"
 
-        total_reward += reward
-
         # Stable classification for grouping.
         outcome = (details or {}).get("result") or {}
         code = str(outcome.get("code") or "unknown")
-        
+
         # Override outcome_code for missing completions to maintain semantic honesty.
         if missing_completion:
             code = "missing_completion"
-        
-        outcome_codes[code] += 1
-
-        results.append(
-            {
-                "id": ex.id,
-                "prompt": ex.prompt,
-                "expected_answer": ex.expected_answer,
-                "completion": "" if completion is None else completion,
-                "missing_completion": bool(missing_completion),
-                "reward": reward,
-                "outcome_code": code,
-                "sum_logprob": sum_logprob,
-                "sum_ref_logprob": sum_ref_logprob,
-                "kl_est": kl_est,
-                "details": details,
-            }
-        )
 
-    n = len(examples)
-    n_pass = sum(1 for r in results if r["reward"] == 1.0)
-    pass_rate = (n_pass / n) if n else 0.0
-
-    # Summaries for failures only (excluding ok)
-    failures = {k: v for k, v in outcome_codes.items() if k != "ok"}
-
-    summary: Dict[str, Any] = {
-        "run": {
-            "created_utc": created_utc,
-            "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
-            "dataset_path": str(dataset_path),
-            "completion_source": completion_source.describe(),
-            "n_examples": n,
-            "n_missing_completions": missing,
-        },
-        "metrics": {
-            "mean_reward": pass_rate,
-            "pass_rate": pass_rate,
-            "n_pass": n_pass,
-            "n_fail": n - n_pass,
-        },
-        "outcomes": {
-            "counts": dict(outcome_codes.most_common()),
-            "failures": dict(sorted(failures.items(), key=lambda kv: kv[1], reverse=True)),
-        },
-    }
-
-    if kl_vals:
-        mean_kl = sum(kl_vals) / len(kl_vals)
-        summary["metrics"]["n_with_kl"] = len(kl_vals)
-        summary["metrics"]["mean_kl_est"] = mean_kl
+        self.n += 1
+        if reward == 1.0:
+            self.n_pass += 1
+        self.outcome_codes[code] += 1
+        if self.slices is not None:
+            self.slices.add(ex, reward=reward, code=code, kl_est=kl_est)
+
+        row = {
+            "id": ex.id,
+            "prompt": ex.prompt,
+            "expected_answer": ex.expected_answer,
+            "completion": "" if completion is None else completion,
+            "missing_completion": bool(missing_completion),
+            "reward": reward,
+            "outcome_code": code,
+            "sum_logprob": sum_logprob,
+            "sum_ref_logprob": sum_ref_logprob,
+            "kl_est": kl_est,
+            "details": details,
+        }
+        if reward == 0.0 and len(self.top_failures) < _TOP_FAILURES:
+            self.top_failures.append(row)
+        return row
+
+    def summary(
+        self,
+        *,
+        created_utc: str,
+        dataset_path: Path,
+        completion_source: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        n = self.n
+        n_pass = self.n_pass
+        pass_rate = (n_pass / n) if n else 0.0
+
+        # Summaries for failures only (excluding ok)
+        failures = {k: v for k, v in self.outcome_codes.items() if k != "ok"}
+
+        summary: Dict[str, Any] = {
+            "run": {
+                "created_utc": created_utc,
+                "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
+                "dataset_path": str(dataset_path),
+                "completion_source": completion_source,
+                "n_examples": n,
+                "n_missing_completions": self.missing,
+            },
+            "metrics": {
+                "mean_reward": pass_rate,
+                "pass_rate": pass_rate,
+                "n_pass": n_pass,
+                "n_fail": n - n_pass,
+            },
+            "outcomes": {
+                "counts": dict(self.outcome_codes.most_common()),
+                "failures": dict(sorted(failures.items(), key=lambda kv: kv[1], reverse=True)),
+            },
+        }
+
+        if self.n_kl:
+            summary["metrics"]["n_with_kl"] = self.n_kl
+            summary["metrics"]["mean_kl_est"] = self.kl_sum / self.n_kl
+
+        if self.slices is not None:
+            summary["slices"] = self.slices.to_dict()
+
+        return summary
+
+
+class CachedScorer:
+    """Memoize `score` by (example id, expected answer, completion), LRU-bounded.
+
+    Valid because the scorer contract requires determinism. Useful when the same
+    completions are scored many times, e.g. across checkpoints in a sweep. At
+    most `max_entries` results are kept (least recently used evicted first), so
+    a long sweep's memory does not grow with every distinct pair it has seen;
+    `max_entries=None` keeps everything, 0 disables caching.
+    """
 
-    write_jsonl(out_dir / "results.jsonl", results)
-    write_json(out_dir / "summary.json", summary)
+    def __init__(self, scorer: ScorerFn = score, *, max_entries: Optional[int] = 100_000):
+        if max_entries is not None and max_entries < 0:
+            raise ValueError(f"max_entries must be >= 0 or None (got {max_entries})")
+        self.scorer = scorer
+        self.max_entries = max_entries
+        self._cache: OrderedDict[Tuple[str, int, str], Dict[str, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __call__(self, ex: Example, completion: Any) -> Dict[str, Any]:
+        key = (ex.id, ex.expected_answer, "" if completion is None else str(completion))
+        out = self._cache.get(key)
+        if out is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return out
+        self.misses += 1
+        out = self.scorer(ex, completion)
+        if self.max_entries != 0:
+            self._cache[key] = out
+            if self.max_entries is not None and len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return out
+
+
+class CompletionJoin:
+    """Join a stream of completion records against an indexed dataset.
+
+    Records are paired with their Example as they arrive (no completions map is
+    built). Duplicate ids raise, like `load_frozen_rollouts`; ids that are not in
+    the dataset are counted and skipped.
+    """
 
-    # Human-readable summary
-    top_failures = [r for r in results if r["reward"] == 0.0][:10]
+    def __init__(self, ex_by_id: Dict[str, Example], *, source: Any):
+        self.ex_by_id = ex_by_id
+        self.source = source
+        self.seen: set[str] = set()
+        self.unknown_ids = 0
+
+    def pairs(self, records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Example, RolloutSample]]:
+        for rec in records:
+            ex_id, sample = parse_completion_record(rec, source=self.source)
+            ex = self.ex_by_id.get(ex_id)
+            if ex is None:
+                self.unknown_ids += 1
+                continue
+            if ex_id in self.seen:
+                raise ValueError(f"Duplicate completion id {ex_id!r} in {self.source}")
+            self.seen.add(ex_id)
+            yield ex, sample
+
+    def unmatched(self, examples: Iterable[Example]) -> Iterator[Example]:
+        """Examples (in dataset order) that never received a completion."""
+        for ex in examples:
+            if ex.id not in self.seen:
+                yield ex
+
+
+def render_eval_md(summary: Dict[str, Any], top_failures: Sequence[Dict[str, Any]]) -> str:
+    """Human-readable summary.md for an eval run."""
+
+    run = summary["run"]
+    metrics = summary["metrics"]
 
     md_lines = []
     md_lines.append("# Eval run\n")
-    md_lines.append(f"- Created (UTC): `{created_utc}`\n")
+    md_lines.append(f"- Created (UTC): `{run['created_utc']}`\n")
     md_lines.append(f"- Scorer: `{SCORER_NAME}` v`{SCORER_VERSION}`\n")
-    md_lines.append(f"- Dataset: `{dataset_path}`\n")
-    md_lines.append(f"- Completion source: `{summary['run']['completion_source']}`\n")
-    md_lines.append(f"- Examples: `{n}` (missing completions: `{missing}`)\n")
+    md_lines.append(f"- Dataset: `{run['dataset_path']}`\n")
+    md_lines.append(f"- Completion source: `{run['completion_source']}`\n")
+    md_lines.append(f"- Examples: `{run['n_examples']}` (missing completions: `{run['n_missing_completions']}`)\n")
+
+    follow = run.get("follow")
+    if follow:
+        state = "complete" if follow.get("complete") else "in progress"
+        md_lines.append(f"- Follow mode: **{state}** ({run['n_examples']} / {follow.get('n_expected')} scored)\n")
+
+    sampling = summary.get("sampling")
+    if sampling:
+        md_lines.append(
+            f"- Sampled run: `{sampling['n_sampled']}` of `{sampling['n_population']}` examples "
+            f"(mode={sampling['mode']}, seed={sampling['seed']}) — do not gate against full runs\n"
+        )
 
     md_lines.append("\n## Metrics\n")
-    md_lines.append(f"- pass_rate: **{pass_rate:.3f}**\n")
-    md_lines.append(f"- n_pass: `{summary['metrics']['n_pass']}`\n")
-    md_lines.append(f"- n_fail: `{summary['metrics']['n_fail']}`\n")
+    md_lines.append(f"- pass_rate: **{metrics['pass_rate']:.3f}**\n")
+    if "pass_rate_ci" in metrics:
+        ci = metrics["pass_rate_ci"]
+        md_lines.append(f"- pass_rate {ci['level']:.0%} CI ({ci['method']}): [{ci['low']:.3f}, {ci['high']:.3f}]\n")
+    md_lines.append(f"- n_pass: `{metrics['n_pass']}`\n")
+    md_lines.append(f"- n_fail: `{metrics['n_fail']}`\n")
 
-    if kl_vals:
-        md_lines.append(f"- mean_kl_est: **{summary['metrics']['mean_kl_est']:.3f}** (n={len(kl_vals)})\n")
+    if "mean_kl_est" in metrics:
+        md_lines.append(f"- mean_kl_est: **{metrics['mean_kl_est']:.3f}** (n={metrics['n_with_kl']})\n")
 
     md_lines.append("\n## Outcome codes (grouping)\n")
-    for code, cnt in outcome_codes.most_common():
+    for code, cnt in summary["outcomes"]["counts"].items():
         md_lines.append(f"- `{code}`: {cnt}\n")
 
-    md_lines.append("\n## First 10 failures (inspect details in results.jsonl)\n")
+    for key, by_value in (summary.get("slices") or {}).items():
+        md_lines.append(f"\n## Slices by `{key}`\n\n")
+        md_lines.append("| value | n | pass_rate | mean_kl_est | top failure |\n")
+        md_lines.append("|---|---:|---:|---:|---|\n")
+        for value, st in by_value.items():
+            kl = f"{st['mean_kl_est']:.3f}" if "mean_kl_est" in st else "-"
+            fails = [(c, k) for c, k in st["outcome_counts"].items() if c != "ok"]
+            top = f"`{fails[0][0]}` ({fails[0][1]})" if fails else "-"
+            md_lines.append(f"| `{value}` | {st['n']} | {st['pass_rate']:.3f} | {kl} | {top} |\n")
+
+    md_lines.append(f"\n## First {_TOP_FAILURES} failures (inspect details in results.jsonl)\n")
     for r in top_failures:
         preview = str(r["completion"])[:80].replace("\n", " ")
         md_lines.append(f"- `{r['id']}` [{r['outcome_code']}] completion preview: `{preview}...`\n")
 
-    atomic_write_text(out_dir / "summary.md", "".join(md_lines))
+    return "".join(md_lines)
+
+
+def evaluate_examples(
+    *,
+    dataset_path: Path,
+    completion_source: CompletionSource,
+    out_dir: Path,
+    max_examples: Optional[int] = None,
+    group_by: Optional[Sequence[str]] = None,
+    sample_frac: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    seed: int = 0,
+    ci_level: float = 0.95,
+) -> Dict[str, Any]:
+    """Evaluate a dataset using a completion source, writing run artifacts.
+
+    This is the core of Loop A. `group_by` lists slice keys (metadata fields or
+    derived keys such as `prompt_op`) to report per-slice metrics for.
+
+    Approximate mode: with `sample_frac` and/or `time_budget` (seconds), examples
+    are visited in a hash-seeded random order (see `hash_unit`) instead of file
+    order. `sample_frac` keeps the examples whose hash falls below the fraction;
+    `time_budget` stops scoring when the budget runs out. Any prefix of that
+    order is a uniform random subsample, so the summary reports pass_rate with a
+    Wilson confidence interval and flags the run as sampled.
+    """
+
+    created_utc = utc_now_iso()
+
+    examples = load_examples(dataset_path)
+    if max_examples is not None:
+        examples = examples[:max_examples]
+
+    approximate = sample_frac is not None or time_budget is not None
+    order = examples
+    if approximate:
+        keyed = sorted((hash_unit(ex.id, seed=seed), i, ex) for i, ex in enumerate(examples))
+        if sample_frac is not None:
+            keyed = [t for t in keyed if t[0] < sample_frac]
+        order = [ex for _u, _i, ex in keyed]
+
+    deadline = (time.monotonic() + time_budget) if time_budget is not None else None
+    timed_out = False
+
+    def _rows():
+        nonlocal timed_out
+        for ex in order:
+            if deadline is not None and time.monotonic() >= deadline:
+                timed_out = True
+                return
+            yield acc.add(ex, completion_source.get(ex.id))
+
+    acc = EvalAccumulator(group_by)
+    # Rows are scored lazily while results.jsonl is being written.
+    write_jsonl(out_dir / "results.jsonl", _rows())
+
+    summary = acc.summary(
+        created_utc=created_utc,
+        dataset_path=dataset_path,
+        completion_source=completion_source.describe(),
+    )
+    if approximate:
+        low, high = wilson_interval(acc.n_pass, acc.n, level=ci_level)
+        summary["metrics"]["pass_rate_ci"] = {"method": "wilson", "level": ci_level, "low": low, "high": high}
+        summary["sampling"] = {
+            "mode": "time_budget" if time_budget is not None else "sample_frac",
+            "sampled": acc.n < len(examples),
+            "seed": seed,
+            "sample_frac": sample_frac,
+            "time_budget_secs": time_budget,
+            "stopped_by_time_budget": timed_out,
+            "n_population": len(examples),
+            "n_sampled": acc.n,
+        }
+    write_json(out_dir / "summary.json", summary)
+    atomic_write_text(out_dir / "summary.md", render_eval_md(summary, acc.top_failures))
 
     return summary
 
 
+def follow_eval(
+    *,
+    dataset_path: Path,
+    completions_path: Path,
+    out_dir: Path,
+    max_examples: Optional[int] = None,
+    refresh_secs: float = 2.0,
+    poll_interval: float = 0.5,
+    idle_timeout: Optional[float] = 30.0,
+    group_by: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Loop A over a completions stream that is still being written.
+
+    `completions_path` is a JSONL file that may still be growing, or "-" for
+    stdin. Each record is scored as soon as it arrives and appended to
+    results.jsonl; summary.json / summary.md are rewritten at most once every
+    `refresh_secs`. The stream ends at EOF (stdin), once every example has a
+    completion, or after `idle_timeout` seconds without new lines. Examples that
+    never received a completion are then scored as missing, so the final summary
+    matches a batch eval of the same inputs.
+    """
+
+    created_utc = utc_now_iso()
+
+    examples = load_examples(dataset_path)
+    if max_examples is not None:
+        examples = examples[:max_examples]
+    ex_by_id = index_by_id(examples)
+
+    acc = EvalAccumulator(group_by)
+    join = CompletionJoin(ex_by_id, source=completions_path)
+    source_desc: Dict[str, Any] = {"type": "jsonl_follow", "path": str(completions_path)}
+
+    def _write_summary(complete: bool) -> Dict[str, Any]:
+        summary = acc.summary(created_utc=created_utc, dataset_path=dataset_path, completion_source=source_desc)
+        summary["run"]["follow"] = {
+            "complete": complete,
+            "n_expected": len(examples),
+            "n_unknown_ids": join.unknown_ids,
+        }
+        write_json(out_dir / "summary.json", summary)
+        atomic_write_text(out_dir / "summary.md", render_eval_md(summary, acc.top_failures))
+        return summary
+
+    ensure_dir(out_dir)
+    last_refresh = time.monotonic()
+    with (out_dir / "results.jsonl").open("w", encoding="utf-8") as f:
+        stream = follow_jsonl(
+            completions_path,
+            poll_interval=poll_interval,
+            idle_timeout=idle_timeout,
+            stop=lambda: len(join.seen) == len(examples),
+        )
+        for ex, sample in join.pairs(stream):
+            f.write(dump_jsonl_record(acc.add(ex, sample)))
+
+            now = time.monotonic()
+            if now - last_refresh >= refresh_secs:
+                f.flush()
+                _write_summary(complete=False)
+                last_refresh = now
+
+        for ex in join.unmatched(examples):
+            f.write(dump_jsonl_record(acc.add(ex, None)))
+
+    source_desc["n"] = len(join.seen)
+    return _write_summary(complete=True)
+
+
 def run_eval(
     *,
     dataset_path: Path,
     completions_path: Path,
     out_dir: Optional[Path] = None,
     max_examples: Optional[int] = None,
+    follow: bool = False,
+    refresh_secs: float = 2.0,
+    idle_timeout: Optional[float] = 30.0,
+    group_by: Optional[Sequence[str]] = None,
+    sample_frac: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    seed: int = 0,
+    ci_level: float = 0.95,
     argv: Optional[list[str]] = None,
     args: Optional[Dict[str, Any]] = None,
 ) -> tuple[Path, Dict[str, Any]]:
     """Convenience wrapper used by the CLI.
 
     Creates a run directory (if needed), evaluates, and writes a manifest with CLI args.
+    With `follow=True` the completions are consumed as a live stream (see `follow_eval`).
+    Sampled runs (`sample_frac` / `time_budget`) are recorded as such in the
+    manifest so `course.gate` can refuse to compare them with full runs; their
+    pass_rate CI is reported at `ci_level`.
     """
 
+    if follow and (sample_frac is not None or time_budget is not None):
+        raise ValueError("follow mode cannot be combined with sample_frac/time_budget")
+    if time_budget is not None and time_budget <= 0:
+        raise ValueError(f"time_budget must be > 0 seconds (got {time_budget})")
+    if not 0.0 < ci_level < 1.0:
+        raise ValueError(f"ci_level must be in (0, 1) (got {ci_level})")
+
     if out_dir is None:
         out_dir = make_run_dir(Path("runs"), prefix="eval")
 
-    source = JsonlCompletionSource(completions_path)
-    summary = evaluate_examples(dataset_path=dataset_path, completion_source=source, out_dir=out_dir, max_examples=max_examples)
+    if follow:
+        summary = follow_eval(
+            dataset_path=dataset_path,
+            completions_path=completions_path,
+            out_dir=out_dir,
+            max_examples=max_examples,
+            refresh_secs=refresh_secs,
+            idle_timeout=idle_timeout,
+            group_by=group_by,
+        )
+        source_desc = summary["run"]["completion_source"]
+    else:
+        source = JsonlCompletionSource(completions_path)
+        summary = evaluate_examples(
+            dataset_path=dataset_path,
+            completion_source=source,
+            out_dir=out_dir,
+            max_examples=max_examples,
+            group_by=group_by,
+            sample_frac=sample_frac,
+            time_budget=time_budget,
+            seed=seed,
+            ci_level=ci_level,
+        )
+        source_desc = source.describe()
 
     # Manifest: hashes + args + env snapshot.
     # NOTE: We always write this, even for programmatic use, because it's a
@@ -189,7 +506,11 @@ def run_eval(
         args=args or {},
         inputs=[dataset_path, completions_path],
         scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
-        extra={"completion_source": source.describe()},
+        extra={
+            "completion_source": source_desc,
+            "sampled": bool((summary.get("sampling") or {}).get("sampled")),
+            "sampling": summary.get("sampling"),
+        },
     )
 
     return out_dir, summary
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
 
-from course.core.io import read_jsonl
+from course.core.io import iter_jsonl, iter_jsonl_fields, parse_jsonl_line, project_jsonl_line
+from course.core.stats import category_bootstrap, mcnemar_exact
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True, slots=True)
@@ -19,6 +22,14 @@ class RunStats:
     n_examples: int
     pass_rate: float
     outcome_counts: Dict[str, int]
+    # Approximate runs (course.eval --sample-frac/--time-budget) only cover a subsample.
+    sampled: bool = False
+    sampling: Dict[str, Any] = field(default_factory=dict)
+
+
+# Row fields the gate needs; see `project_jsonl_line`.
+_STATS_FIELDS = ("reward", "outcome_code")
+_JOIN_FIELDS = ("id", "reward", "outcome_code")
 
 
 def _read_json(path: Path) -> Dict[str, Any]:
@@ -50,6 +61,7 @@ def load_run_stats(run_dir: Path) -> RunStats:
 
     summary = _read_json(summary_path)
     run = summary.get("run") or {}
+    sampling = summary.get("sampling") or {}
     scorer = run.get("scorer") or {}
 
     created_utc = str(run.get("created_utc") or "")
@@ -59,21 +71,27 @@ def load_run_stats(run_dir: Path) -> RunStats:
 
     # Extract dataset SHA256 from manifest.json inputs (first input is dataset).
     dataset_sha256 = ""
+    sampled = bool(sampling.get("sampled"))
     if manifest_path.exists():
         manifest = _read_json(manifest_path)
         inputs = manifest.get("inputs") or []
         if inputs and isinstance(inputs[0], dict):
             dataset_sha256 = str(inputs[0].get("sha256") or "")
+        extra = manifest.get("extra") or {}
+        sampled = sampled or bool(extra.get("sampled"))
+        sampling = sampling or (extra.get("sampling") or {})
 
-    records = read_jsonl(results_path)
-    n = len(records)
-    rewards = [float(r.get("reward", 0.0) or 0.0) for r in records]
-    pass_rate = (sum(rewards) / n) if n else 0.0
-
+    # Only reward + outcome_code are decoded; rows without outcome_code come back
+    # whole so `_outcome_code` can fall back to `details`.
+    n = 0
+    reward_sum = 0.0
     counts: Dict[str, int] = {}
-    for r in records:
+    for r in iter_jsonl_fields(results_path, _STATS_FIELDS, require=_required(_STATS_FIELDS)):
+        n += 1
+        reward_sum += float(r.get("reward", 0.0) or 0.0)
         c = _outcome_code(r)
         counts[c] = counts.get(c, 0) + 1
+    pass_rate = (reward_sum / n) if n else 0.0
 
     return RunStats(
         run_dir=run_dir,
@@ -85,22 +103,243 @@ def load_run_stats(run_dir: Path) -> RunStats:
         n_examples=n,
         pass_rate=pass_rate,
         outcome_counts=counts,
+        sampled=sampled,
+        sampling=dict(sampling) if sampled else {},
     )
 
 
+class _UnsortedResults(Exception):
+    pass
+
+
+# (id, baseline row or None, candidate row or None)
+PairIter = Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+
+
+def _required(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    # Without outcome_code, `_outcome_code` needs the row's `details`: decode it whole.
+    return ("outcome_code",) if "outcome_code" in fields else ()
+
+
+def _iter_rows(path: Path, fields: Optional[Tuple[str, ...]]) -> Iterator[Dict[str, Any]]:
+    if fields is None:
+        return iter_jsonl(path)
+    return iter_jsonl_fields(path, fields, require=_required(fields))
+
+
+def _iter_ids_sorted(path: Path, fields: Optional[Tuple[str, ...]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    prev: Optional[str] = None
+    for rec in _iter_rows(path, fields):
+        ex_id = str(rec.get("id"))
+        if prev is not None and ex_id <= prev:
+            raise _UnsortedResults(f"{path}: {ex_id!r} after {prev!r}")
+        prev = ex_id
+        yield ex_id, rec
+
+
+def _join_sorted(base_path: Path, cand_path: Path, fields: Optional[Tuple[str, ...]] = None) -> PairIter:
+    """Merge-join two results files sorted by id, one row of each in memory."""
+
+    base_it, cand_it = _iter_ids_sorted(base_path, fields), _iter_ids_sorted(cand_path, fields)
+    b = next(base_it, None)
+    c = next(cand_it, None)
+    while b is not None or c is not None:
+        if c is None or (b is not None and b[0] < c[0]):
+            yield b[0], b[1], None
+            b = next(base_it, None)
+        elif b is None or c[0] < b[0]:
+            yield c[0], None, c[1]
+            c = next(cand_it, None)
+        else:
+            yield b[0], b[1], c[1]
+            b, c = next(base_it, None), next(cand_it, None)
+
+
+def _join_indexed(base_path: Path, cand_path: Path, fields: Optional[Tuple[str, ...]] = None) -> PairIter:
+    """Join any-order results: index candidate id -> byte offset, stream the baseline."""
+
+    def _read_at(f: Any, offset: int) -> Dict[str, Any]:
+        f.seek(offset)
+        line = f.readline().decode("utf-8")
+        source = f"{cand_path}@{offset}"
+        if fields is None:
+            rec = parse_jsonl_line(line, lineno=-1, source=source)
+        else:
+            rec = project_jsonl_line(line, fields, require=_required(fields), lineno=-1, source=source)
+        assert rec is not None
+        return rec
+
+    offsets: Dict[str, int] = {}
+    with cand_path.open("rb") as f:
+        # Indexing only needs each row's id.
+        lineno = 0
+        while True:
+            offset = f.tell()
+            raw = f.readline()
+            if not raw:
+                break
+            lineno += 1
+            rec = project_jsonl_line(raw.decode("utf-8"), ("id",), lineno=lineno, source=cand_path)
+            if rec is None:
+                continue
+            ex_id = str(rec.get("id"))
+            if ex_id in offsets:
+                raise ValueError(f"Duplicate id {ex_id!r} in {cand_path}")
+            offsets[ex_id] = offset
+
+        seen: set[str] = set()
+        for rec in _iter_rows(base_path, fields):
+            ex_id = str(rec.get("id"))
+            if ex_id in seen:
+                raise ValueError(f"Duplicate id {ex_id!r} in {base_path}")
+            seen.add(ex_id)
+            offset = offsets.pop(ex_id, None)
+            yield ex_id, rec, (_read_at(f, offset) if offset is not None else None)
+        for offset in sorted(offsets.values()):
+            cand = _read_at(f, offset)
+            yield str(cand.get("id")), None, cand
+
+
+def consume_join(
+    base_path: Path,
+    cand_path: Path,
+    consume: Callable[[PairIter], T],
+    *,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> Tuple[T, str]:
+    """Run `consume` over the id-join of two results files: merge-join if both are
+    sorted, otherwise (detected mid-stream) start over with the offset index.
+
+    With `fields`, rows are projected to those fields (plus "id"; see
+    `iter_jsonl_fields`) instead of being decoded whole.
+    """
+
+    if fields is not None and "id" not in fields:
+        fields = ("id",) + tuple(fields)
+    try:
+        return consume(_join_sorted(base_path, cand_path, fields)), "sorted"
+    except _UnsortedResults:
+        return consume(_join_indexed(base_path, cand_path, fields)), "indexed"
+
+
+def _passed(rec: Dict[str, Any]) -> bool:
+    return float(rec.get("reward", 0.0) or 0.0) == 1.0
+
+
+def paired_test(baseline_dir: Path, candidate_dir: Path) -> Dict[str, Any]:
+    """Per-example comparison of two eval runs joined by id, with an exact McNemar test.
+
+    Tries a streaming merge-join first (constant memory when both results files
+    are sorted by id, which `course.eval` output is for sorted datasets); if
+    either file turns out unsorted, restarts with a byte-offset index of the
+    candidate (memory ~ number of ids, never the rows).
+    """
+
+    base_path = baseline_dir.expanduser().resolve() / "results.jsonl"
+    cand_path = candidate_dir.expanduser().resolve() / "results.jsonl"
+
+    def _count(pairs: PairIter) -> Dict[str, int]:
+        t = {"both_pass": 0, "pass_to_fail": 0, "fail_to_pass": 0, "both_fail": 0, "only_baseline": 0, "only_candidate": 0}
+        for _id, b, c in pairs:
+            if c is None:
+                t["only_baseline"] += 1
+            elif b is None:
+                t["only_candidate"] += 1
+            else:
+                pb, pc = _passed(b), _passed(c)
+                key = ("both_pass" if pc else "pass_to_fail") if pb else ("fail_to_pass" if pc else "both_fail")
+                t[key] += 1
+        return t
+
+    table, join = consume_join(base_path, cand_path, _count, fields=_JOIN_FIELDS)
+
+    n_paired = table["both_pass"] + table["pass_to_fail"] + table["fail_to_pass"] + table["both_fail"]
+    return {
+        "join": join,
+        "n_paired": n_paired,
+        "table": table,
+        "delta": (table["fail_to_pass"] - table["pass_to_fail"]) / n_paired if n_paired else 0.0,
+        "mcnemar_p": mcnemar_exact(table["pass_to_fail"], table["fail_to_pass"]),
+    }
+
+
+def bootstrap_deltas(
+    baseline_dir: Path,
+    candidate_dir: Path,
+    *,
+    n_resamples: int = 10_000,
+    level: float = 0.95,
+    seed: int = 0,
+    backend: str = "auto",
+) -> Dict[str, Any]:
+    """Paired bootstrap CIs for the pass-rate delta and each outcome code's rate delta.
+
+    One streaming join (as in `paired_test`) reduces the runs to counts per
+    (baseline pass, baseline code, candidate pass, candidate code) category;
+    the resampling then runs over those counts (see `category_bootstrap`), so
+    its cost does not grow with the number of examples. Only ids present in
+    both runs are used.
+    """
+
+    def _categories(pairs: PairIter) -> Dict[Tuple[bool, str, bool, str], int]:
+        cats: Dict[Tuple[bool, str, bool, str], int] = {}
+        for _id, b, c in pairs:
+            if b is None or c is None:
+                continue
+            key = (_passed(b), _outcome_code(b), _passed(c), _outcome_code(c))
+            cats[key] = cats.get(key, 0) + 1
+        return cats
+
+    base_path = baseline_dir.expanduser().resolve() / "results.jsonl"
+    cand_path = candidate_dir.expanduser().resolve() / "results.jsonl"
+    cats, join = consume_join(base_path, cand_path, _categories, fields=_JOIN_FIELDS)
+
+    keys = sorted(cats)
+    codes = sorted({k[1] for k in keys} | {k[3] for k in keys})
+    values: Dict[str, list[float]] = {"pass_rate_delta": [float(k[2]) - float(k[0]) for k in keys]}
+    for code in codes:
+        values[f"code:{code}"] = [float(k[3] == code) - float(k[1] == code) for k in keys]
+
+    boot = category_bootstrap(
+        [cats[k] for k in keys], values, n_resamples=n_resamples, level=level, seed=seed, backend=backend
+    )
+    stats = boot.pop("stats")
+    return {
+        **boot,
+        "join": join,
+        "n_paired": sum(cats.values()),
+        "pass_rate_delta": stats["pass_rate_delta"],
+        "outcome_code_deltas": {code: stats[f"code:{code}"] for code in codes},
+    }
+
+
 def gate(
     *,
     baseline: RunStats,
     candidate: RunStats,
     min_delta: float = 0.0,
+    paired: Optional[Dict[str, Any]] = None,
+    require_significance: bool = False,
+    alpha: float = 0.05,
+    bootstrap: Optional[Dict[str, Any]] = None,
+    require_ci: bool = False,
 ) -> Dict[str, Any]:
     """Production-style gate: PROMOTE / REJECT with reasons.
 
     This is intentionally simple:
-    - enforce Locked Room Rule (dataset + scorer)
+    - enforce Locked Room Rule (dataset + scorer + full vs sampled eval)
     - compare pass_rate
+    - optionally (`paired`, from `paired_test`) require the per-example change
+      to be significant: exact McNemar p <= alpha
+    - optionally (`bootstrap`, from `bootstrap_deltas`) require the lower end of
+      the pass-rate delta CI to clear min_delta
     """
 
+    if require_significance and paired is None:
+        raise ValueError("require_significance needs a paired test result (see paired_test)")
+    if require_ci and bootstrap is None:
+        raise ValueError("require_ci needs a bootstrap result (see bootstrap_deltas)")
+
     reasons: list[str] = []
 
     if baseline.scorer_name != candidate.scorer_name or baseline.scorer_version != candidate.scorer_version:
@@ -116,12 +355,33 @@ def gate(
             f"(baseline={baseline.dataset_sha256[:16]}..., candidate={candidate.dataset_sha256[:16]}...)"
         )
 
+    if baseline.sampled != candidate.sampled:
+        reasons.append(
+            "LockedRoomViolation: sampled vs full run "
+            f"(baseline sampled={baseline.sampled}, candidate sampled={candidate.sampled})"
+        )
+    elif baseline.sampled and (
+        baseline.sampling.get("seed") != candidate.sampling.get("seed")
+        or baseline.sampling.get("sample_frac") != candidate.sampling.get("sample_frac")
+    ):
+        reasons.append(
+            "LockedRoomViolation: sampled runs drew different subsamples "
+            f"(baseline seed={baseline.sampling.get('seed')} frac={baseline.sampling.get('sample_frac')}, "
+            f"candidate seed={candidate.sampling.get('seed')} frac={candidate.sampling.get('sample_frac')})"
+        )
+
     if baseline.n_examples != candidate.n_examples:
         reasons.append(
             "LockedRoomViolation: n_examples mismatch "
             f"(baseline={baseline.n_examples}, candidate={candidate.n_examples})"
         )
 
+    if paired is not None and (paired["table"]["only_baseline"] or paired["table"]["only_candidate"]):
+        reasons.append(
+            "LockedRoomViolation: example ids differ "
+            f"(only in baseline={paired['table']['only_baseline']}, only in candidate={paired['table']['only_candidate']})"
+        )
+
     delta = candidate.pass_rate - baseline.pass_rate
 
     decision: str
@@ -131,8 +391,17 @@ def gate(
         decision = "PROMOTE" if delta >= min_delta else "REJECT"
         if decision == "REJECT":
             reasons.append(f"DeltaTooSmall: delta={delta:.4f} < min_delta={min_delta:.4f}")
+        if require_significance and paired is not None and paired["mcnemar_p"] > alpha:
+            decision = "REJECT"
+            reasons.append(f"NotSignificant: mcnemar_p={paired['mcnemar_p']:.4g} > alpha={alpha:g}")
+        if require_ci and bootstrap is not None and bootstrap["pass_rate_delta"]["low"] < min_delta:
+            decision = "REJECT"
+            reasons.append(
+                f"CIBelowMinDelta: {bootstrap['level']:.0%} CI low={bootstrap['pass_rate_delta']['low']:.4f} "
+                f"< min_delta={min_delta:.4f}"
+            )
 
-    return {
+    out: Dict[str, Any] = {
         "decision": decision,
         "reasons": reasons,
         "baseline": {
@@ -149,3 +418,117 @@ def gate(
         },
         "delta": delta,
     }
+    if paired is not None:
+        out["paired"] = {**paired, "alpha": alpha, "require_significance": require_significance}
+    if bootstrap is not None:
+        out["bootstrap"] = {**bootstrap, "require_ci": require_ci}
+    return out
+
+
+class RunStatsCache:
+    """`load_run_stats` memoized on the results-file fingerprint.
+
+    The key is (run dir, results.jsonl size, mtime_ns): a run is parsed once per
+    process however many comparisons it takes part in, and is re-read if its
+    results file is rewritten.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[Tuple[str, int, int], RunStats] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, run_dir: Path) -> RunStats:
+        run_dir = run_dir.expanduser().resolve()
+        results_path = run_dir / "results.jsonl"
+        if not results_path.exists():
+            raise FileNotFoundError(f"Run dir must contain summary.json and results.jsonl: {run_dir}")
+        st = results_path.stat()
+        key = (str(run_dir), st.st_size, st.st_mtime_ns)
+        cached = self._stats.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        stats = load_run_stats(run_dir)
+        self._stats[key] = stats
+        return stats
+
+
+def gate_tournament(
+    *,
+    candidates: Sequence[Path],
+    baseline: Optional[Path] = None,
+    min_delta: float = 0.0,
+    cache: Optional[RunStatsCache] = None,
+) -> Dict[str, Any]:
+    """Gate many runs in one go.
+
+    - with `baseline`: every candidate is gated against it (one `gate()` each)
+    - without: all ordered pairs are gated; a run "beats" another when it would
+      be promoted over it, and is PROMOTE overall only if it beats every other run
+
+    Returns the pairwise decisions plus a ranking (PROMOTE first, then by delta
+    vs baseline / number of wins, then pass rate).
+    """
+
+    cache = cache or RunStatsCache()
+    runs = [Path(c) for c in candidates]
+    if baseline is None and len(runs) < 2:
+        raise ValueError("An all-pairs tournament needs at least two runs")
+
+    pairs: list[Dict[str, Any]] = []
+    ranking: list[Dict[str, Any]] = []
+    baseline_dir: Optional[str] = None
+    if baseline is not None:
+        base = cache.get(baseline)
+        baseline_dir = str(base.run_dir)
+        for run in runs:
+            d = gate(baseline=base, candidate=cache.get(run), min_delta=min_delta)
+            pairs.append(d)
+            ranking.append(
+                {
+                    "run_dir": d["candidate"]["run_dir"],
+                    "pass_rate": d["candidate"]["pass_rate"],
+                    "delta": d["delta"],
+                    "decision": d["decision"],
+                    "reasons": d["reasons"],
+                }
+            )
+        ranking.sort(key=lambda r: (r["decision"] != "PROMOTE", -r["delta"], r["run_dir"]))
+    else:
+        stats = [cache.get(run) for run in runs]
+        wins = [0] * len(stats)
+        lost_to: list[list[str]] = [[] for _ in stats]
+        for i, cand in enumerate(stats):
+            for j, base in enumerate(stats):
+                if i == j:
+                    continue
+                d = gate(baseline=base, candidate=cand, min_delta=min_delta)
+                pairs.append(d)
+                if d["decision"] == "PROMOTE":
+                    wins[i] += 1
+                else:
+                    lost_to[i].append(f"{base.run_dir.name}: {'; '.join(d['reasons'])}")
+        for i, st in enumerate(stats):
+            ranking.append(
+                {
+                    "run_dir": str(st.run_dir),
+                    "pass_rate": st.pass_rate,
+                    "wins": wins[i],
+                    "decision": "PROMOTE" if wins[i] == len(stats) - 1 else "REJECT",
+                    "reasons": lost_to[i],
+                }
+            )
+        ranking.sort(key=lambda r: (r["decision"] != "PROMOTE", -r["wins"], -r["pass_rate"], r["run_dir"]))
+
+    for rank, row in enumerate(ranking, start=1):
+        row["rank"] = rank
+    return {
+        "mode": "baseline" if baseline is not None else "all_pairs",
+        "baseline": baseline_dir,
+        "min_delta": min_delta,
+        "ranking": ranking,
+        "pairs": pairs,
+        "stats_cache": {"hits": cache.hits, "misses": cache.misses},
+    }
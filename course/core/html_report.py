@@ -0,0 +1,272 @@
+"""Static, paginated HTML report for a run dir.
+
+`write_html_report` makes one streaming pass over `results.jsonl` and writes:
+
+- `index.html`: run metadata, metrics, and every outcome code with its count
+  and links to its pages
+- `<code>/page-0001.html`, ...: the rows of one outcome code, `rows_per_page`
+  per file, each page linking to its neighbours
+
+Eval rows are grouped by their outcome code; selection rows by the best-of-N
+pick's outcome code (compact rows are rehydrated as they are written, seeking
+on one handle that stays open on the pack for the whole report). Only one page
+per outcome code is open at a time, so memory does not grow with the run, and
+no page is too big for a browser.
+"""
+
+from __future__ import annotations
+
+import html
+import itertools
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Mapping, Optional, TextIO
+
+from course.core.inspect import eval_outcome_code, infer_mode, load_summary, rehydrate_selection_row
+from course.core.io import atomic_write_text, ensure_dir, iter_jsonl
+
+_STYLE = """
+body { font-family: system-ui, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f4f4f4; }
+td.num { text-align: right; }
+pre { margin: 0; white-space: pre-wrap; word-break: break-all; max-width: 60em; }
+nav a { margin-right: 1em; }
+"""
+
+# The index links at most this many pages per code (first ones, "...", last).
+_MAX_PAGE_LINKS = 20
+
+_EVAL_COLUMNS = ("id", "expected", "reward", "parsed", "completion", "why")
+_SELECTION_COLUMNS = ("id", "expected", "baseline", "best_of_n", "baseline completion", "best completion")
+
+
+def _slug(code: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", code) or "_"
+
+
+def _page_name(page: int) -> str:
+    return f"page-{page:04d}.html"
+
+
+def _head(title: str, *, css_path: str) -> str:
+    t = html.escape(title)
+    return (
+        "<!doctype html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{t}</title><link rel=\"stylesheet\" href=\"{css_path}\"></head><body>\n"
+    )
+
+
+def _cell(value: Any, *, pre: bool = False) -> str:
+    text = html.escape("" if value is None else str(value))
+    return f"<td><pre>{text}</pre></td>" if pre else f"<td>{text}</td>"
+
+
+def _eval_cells(r: Mapping[str, Any]) -> str:
+    details = r.get("details") or {}
+    parse = details.get("parse") or {}
+    why = parse.get("error_message") or (details.get("result") or {}).get("message") or ""
+    return "".join(
+        [
+            _cell(r.get("id")),
+            _cell(r.get("expected_answer")),
+            _cell(r.get("reward")),
+            _cell(parse.get("answer_str")),
+            _cell(r.get("completion"), pre=True),
+            _cell(why),
+        ]
+    )
+
+
+def _selection_cells(r: Mapping[str, Any]) -> str:
+    b = r.get("baseline") or {}
+    bo = r.get("best_of_n") or {}
+    return "".join(
+        [
+            _cell(r.get("id")),
+            _cell(r.get("expected_answer")),
+            _cell(f"{b.get('reward')} ({b.get('outcome_code')})"),
+            _cell(f"{bo.get('reward')} ({bo.get('outcome_code')}, sample {bo.get('index')})"),
+            _cell(b.get("completion"), pre=True),
+            _cell(bo.get("completion"), pre=True),
+        ]
+    )
+
+
+class _PagedGroup:
+    """Writes one outcome code's rows into fixed-size pages, one file open at a time."""
+
+    def __init__(self, root: Path, code: str, slug: str, *, rows_per_page: int, columns: tuple[str, ...]) -> None:
+        self.code = code
+        self.slug = slug
+        self.dir = ensure_dir(root / self.slug)
+        self.rows_per_page = rows_per_page
+        self.columns = columns
+        self.n_rows = 0
+        self.n_pages = 0
+        self._f: Optional[TextIO] = None
+        self._rows_on_page = 0
+
+    def _open_page(self) -> None:
+        self.n_pages += 1
+        f = (self.dir / _page_name(self.n_pages)).open("w", encoding="utf-8")
+        f.write(_head(f"{self.code} - page {self.n_pages}", css_path="../style.css"))
+        f.write("<nav><a href=\"../index.html\">index</a>")
+        if self.n_pages > 1:
+            f.write(f"<a href=\"{_page_name(self.n_pages - 1)}\">&larr; previous</a>")
+        f.write("</nav>\n")
+        f.write(f"<h1>{html.escape(self.code)} &mdash; page {self.n_pages}</h1>\n<table>\n<tr>")
+        f.write("".join(f"<th>{html.escape(c)}</th>" for c in self.columns) + "</tr>\n")
+        self._f = f
+        self._rows_on_page = 0
+
+    def _close_page(self, *, has_next: bool) -> None:
+        assert self._f is not None
+        self._f.write("</table>\n<nav><a href=\"../index.html\">index</a>")
+        if self.n_pages > 1:
+            self._f.write(f"<a href=\"{_page_name(self.n_pages - 1)}\">&larr; previous</a>")
+        if has_next:
+            self._f.write(f"<a href=\"{_page_name(self.n_pages + 1)}\">next &rarr;</a>")
+        self._f.write("</nav>\n</body></html>\n")
+        self._f.close()
+        self._f = None
+
+    def add(self, cells: str) -> None:
+        if self._f is None:
+            self._open_page()
+        elif self._rows_on_page == self.rows_per_page:
+            # Only now is it known that the full page has a successor.
+            self._close_page(has_next=True)
+            self._open_page()
+        assert self._f is not None
+        self._f.write(f"<tr>{cells}</tr>\n")
+        self._rows_on_page += 1
+        self.n_rows += 1
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._close_page(has_next=False)
+
+
+def write_html_report(
+    run_dir: Path,
+    out_dir: Optional[Path] = None,
+    *,
+    rows_per_page: int = 200,
+) -> Dict[str, Any]:
+    """Write the report for `run_dir` (default: `<run_dir>/report/`). Returns counts."""
+
+    if rows_per_page < 1:
+        raise ValueError(f"rows_per_page must be >= 1 (got {rows_per_page})")
+    run_dir = run_dir.expanduser().resolve()
+    results_path = run_dir / "results.jsonl"
+    if not results_path.exists():
+        raise FileNotFoundError(f"Run dir {run_dir} does not contain results.jsonl")
+    out_dir = ensure_dir(out_dir or (run_dir / "report"))
+    atomic_write_text(out_dir / "style.css", _STYLE.lstrip())
+
+    summary = load_summary(run_dir / "summary.json") or {}
+    run_meta = summary.get("run") or {}
+    samples_path = run_meta.get("samples_path")
+    samples = Path(samples_path) if samples_path else None
+
+    records = iter_jsonl(results_path)
+    first = next(records, None)
+    mode = infer_mode(first) if first is not None else "empty"
+    if mode == "unknown":
+        raise ValueError(f"Unrecognized results format in {results_path} (expected eval or selection rows)")
+    columns = _EVAL_COLUMNS if mode == "eval" else _SELECTION_COLUMNS
+
+    groups: Dict[str, _PagedGroup] = {}
+    slugs: set[str] = set()
+    counts = {"n": 0, "n_pass": 0, "baseline_pass": 0, "rescued": 0}
+    pack: Optional[BinaryIO] = None
+    if first is not None and "pack_offset" in first and samples is not None and samples.exists():
+        pack = samples.open("rb")
+    try:
+        for r in itertools.chain([first], records) if first is not None else ():
+            counts["n"] += 1
+            if mode == "eval":
+                code = eval_outcome_code(r)
+                counts["n_pass"] += int(float(r.get("reward", 0.0) or 0.0) == 1.0)
+                cells = _eval_cells(r)
+            else:
+                bn = float((r.get("baseline") or {}).get("reward", 0.0) or 0.0)
+                br = float((r.get("best_of_n") or {}).get("reward", 0.0) or 0.0)
+                counts["n_pass"] += int(br == 1.0)
+                counts["baseline_pass"] += int(bn == 1.0)
+                counts["rescued"] += int(bn == 0.0 and br == 1.0)
+                code = str((r.get("best_of_n") or {}).get("outcome_code") or "unknown")
+                cells = _selection_cells(rehydrate_selection_row(r, samples, handle=pack))
+            group = groups.get(code)
+            if group is None:
+                slug = _slug(code)
+                while slug in slugs:  # two codes that sanitize to the same directory name
+                    slug += "_"
+                slugs.add(slug)
+                group = groups[code] = _PagedGroup(out_dir, code, slug, rows_per_page=rows_per_page, columns=columns)
+            group.add(cells)
+    finally:
+        for group in groups.values():
+            group.close()
+        if pack is not None:
+            pack.close()
+
+    n = counts["n"]
+    ordered = sorted(groups.values(), key=lambda g: (g.code != "ok", -g.n_rows, g.code))
+    idx = [_head(f"Run report: {run_dir.name}", css_path="style.css")]
+    idx.append(f"<h1>Run report: {html.escape(run_dir.name)}</h1>\n<table>\n")
+    scorer = run_meta.get("scorer") or {}
+    meta_rows = [
+        ("run dir", str(run_dir)),
+        ("mode", mode),
+        ("created_utc", run_meta.get("created_utc")),
+        ("scorer", f"{scorer.get('name')} v{scorer.get('version')}" if scorer else None),
+        ("dataset", run_meta.get("dataset_path")),
+        ("completions", run_meta.get("completions_path")),
+        ("samples", samples_path),
+    ]
+    if mode == "selection":
+        metric_rows = [
+            ("n", n),
+            ("pass@1", f"{counts['baseline_pass'] / n:.3f}" if n else None),
+            ("pass@N", f"{counts['n_pass'] / n:.3f}" if n else None),
+            ("rescued (baseline fail -> best success)", counts["rescued"]),
+        ]
+    else:
+        metric_rows = [
+            ("n", n),
+            ("pass_rate", f"{counts['n_pass'] / n:.3f}" if n else None),
+            ("pass / fail", f"{counts['n_pass']} / {n - counts['n_pass']}"),
+        ]
+    for k, v in meta_rows + metric_rows:
+        if v is not None:
+            idx.append(f"<tr><th>{html.escape(k)}</th>{_cell(v)}</tr>\n")
+    idx.append("</table>\n")
+    label = "best-of-N outcome code" if mode == "selection" else "outcome code"
+    idx.append(f"<h2>By {label}</h2>\n<table>\n<tr><th>{label}</th><th>count</th><th>share</th><th>pages</th></tr>\n")
+    for g in ordered:
+        pages = list(range(1, g.n_pages + 1))
+        if len(pages) > _MAX_PAGE_LINKS:
+            pages = pages[: _MAX_PAGE_LINKS - 2] + [0] + pages[-1:]
+        links = " ".join(
+            f"<a href=\"{g.slug}/{_page_name(p)}\">{p}</a>" if p else "&hellip;" for p in pages
+        )
+        idx.append(
+            f"<tr><td>{html.escape(g.code)}</td><td class=\"num\">{g.n_rows}</td>"
+            f"<td class=\"num\">{g.n_rows / n:.1%}</td><td>{links}</td></tr>\n"
+        )
+    idx.append("</table>\n")
+    if not groups:
+        idx.append("<p>Run contained no records.</p>\n")
+    idx.append("</body></html>\n")
+    atomic_write_text(out_dir / "index.html", "".join(idx))
+
+    return {
+        "out_dir": str(out_dir),
+        "mode": mode,
+        "n": n,
+        "rows_per_page": rows_per_page,
+        "codes": {g.code: {"n_rows": g.n_rows, "n_pages": g.n_pages} for g in ordered},
+    }
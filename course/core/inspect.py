@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import itertools
 import json
+import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, BinaryIO, Dict, Iterable, Mapping, Optional
 
-from course.core.io import read_jsonl
+from course.core.io import iter_jsonl, iter_jsonl_fields
+from course.core.rollouts import read_pack_samples
+from course.core.shapes import ShapeAccumulator
 
 
 @dataclass(frozen=True, slots=True)
@@ -81,43 +85,158 @@ def eval_outcome_code(rec: Mapping[str, Any]) -> str:
     return "unknown"
 
 
-def analyze_eval(records: list[Dict[str, Any]]) -> Dict[str, Any]:
-    n = len(records)
-    n_pass = sum(1 for r in records if float(r.get("reward", 0.0)) == 1.0)
-    n_fail = n - n_pass
+# What `analyze_selection` and the selection report read from each row.
+_SELECTION_FIELDS = ("id", "expected_answer", "baseline", "best_of_n", "pack_offset")
 
-    by_code: Dict[str, list[Dict[str, Any]]] = {}
-    for r in records:
-        code = eval_outcome_code(r)
-        by_code.setdefault(code, []).append(r)
 
-    items = sorted(by_code.items(), key=lambda kv: len(kv[1]), reverse=True)
-    if "ok" in by_code:
-        items = [("ok", by_code["ok"])] + [(k, v) for k, v in items if k != "ok"]
+@dataclass(frozen=True, slots=True)
+class RecordQuery:
+    """What `inspect_run` wants to see from a results file.
+
+    Filters (all optional, combined with AND): outcome `codes`, a regex
+    `pattern` searched in the completion, an `id_prefix`, and a reward range.
+    At most `per_group` matching records are kept per outcome code (eval) or
+    as rescue examples (selection); `limit`/`offset` page through the matching
+    records in file order. Counts always cover the whole file, but memory is
+    bounded by what is kept, so inspecting a huge run stays cheap. With
+    `shapes`, matching eval failures are also clustered by completion shape
+    (see `course.core.shapes`).
+    """
+
+    codes: Optional[frozenset[str]] = None
+    pattern: Optional[str] = None
+    id_prefix: Optional[str] = None
+    min_reward: Optional[float] = None
+    max_reward: Optional[float] = None
+    per_group: int = 3
+    offset: int = 0
+    limit: Optional[int] = None
+    # > 0: also cluster matching failures by completion shape and keep this many shapes per code.
+    shapes: int = 0
+
+    def compiled_pattern(self) -> Optional[re.Pattern[str]]:
+        if self.pattern is None:
+            return None
+        try:
+            return re.compile(self.pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid --grep regex {self.pattern!r}: {e}") from e
+
+    def validate(self) -> None:
+        for name in ("per_group", "offset", "shapes"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must be >= 0 (got {getattr(self, name)})")
+        if self.limit is not None and self.limit < 0:
+            raise ValueError(f"limit must be >= 0 (got {self.limit})")
+
+
+def _reward(rec: Mapping[str, Any]) -> float:
+    try:
+        return float(rec.get("reward", 0.0) or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
 
-    return {
+def _in_reward_range(reward: float, query: RecordQuery) -> bool:
+    if query.min_reward is not None and reward < query.min_reward:
+        return False
+    return query.max_reward is None or reward <= query.max_reward
+
+
+class _Page:
+    """Keeps the matching records in [offset, offset + limit)."""
+
+    def __init__(self, query: RecordQuery) -> None:
+        self.offset = query.offset
+        self.limit = query.limit
+        self.rows: list[Dict[str, Any]] = []
+
+    def offer(self, match_index: int, rec: Dict[str, Any]) -> None:
+        if self.limit is not None and self.offset <= match_index < self.offset + self.limit:
+            self.rows.append(rec)
+
+
+def _ordered_counts(counts: Mapping[str, int]) -> Dict[str, int]:
+    items = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+    if "ok" in counts:
+        items = [("ok", counts["ok"])] + [(k, v) for k, v in items if k != "ok"]
+    return dict(items)
+
+
+def analyze_eval(records: Iterable[Dict[str, Any]], query: Optional[RecordQuery] = None) -> Dict[str, Any]:
+    """Stream eval records into counts plus bounded example groups (see `RecordQuery`)."""
+
+    query = query or RecordQuery()
+    query.validate()
+    pattern = query.compiled_pattern()
+    page = _Page(query)
+
+    n = n_pass = n_matched = 0
+    by_code: Dict[str, int] = {}
+    matched_by_code: Dict[str, int] = {}
+    groups: Dict[str, list[Dict[str, Any]]] = {}
+    shapes = ShapeAccumulator(n_exemplars=query.per_group) if query.shapes else None
+    for r in records:
+        code = eval_outcome_code(r)
+        reward = _reward(r)
+        n += 1
+        n_pass += int(reward == 1.0)
+        by_code[code] = by_code.get(code, 0) + 1
+
+        if query.codes is not None and code not in query.codes:
+            continue
+        if query.id_prefix is not None and not str(r.get("id", "")).startswith(query.id_prefix):
+            continue
+        if not _in_reward_range(reward, query):
+            continue
+        if pattern is not None and not pattern.search(str(r.get("completion", ""))):
+            continue
+        page.offer(n_matched, r)
+        n_matched += 1
+        matched_by_code[code] = matched_by_code.get(code, 0) + 1
+        group = groups.setdefault(code, [])
+        if len(group) < query.per_group:
+            group.append(r)
+        if shapes is not None and code != "ok":
+            shapes.add(code, r.get("id"), r.get("completion"))
+
+    out: Dict[str, Any] = {
         "mode": "eval",
         "n": n,
         "n_pass": n_pass,
-        "n_fail": n_fail,
+        "n_fail": n - n_pass,
         "pass_rate": (n_pass / n) if n else 0.0,
-        "by_code": {k: len(v) for k, v in items},
-        "groups": by_code,
+        "by_code": _ordered_counts(by_code),
+        "n_matched": n_matched,
+        "matched_by_code": _ordered_counts(matched_by_code),
+        "groups": groups,
+        "page": page.rows,
     }
+    if shapes is not None:
+        out["shapes"] = shapes.top(query.shapes)
+        out["n_shapes"] = shapes.n_shapes()
+    return out
+
+
+def analyze_selection(records: Iterable[Dict[str, Any]], query: Optional[RecordQuery] = None) -> Dict[str, Any]:
+    """Stream selection rows into pass@1 / pass@N counts plus bounded rescue examples.
 
+    `id_prefix` and the reward range (on the best-of-N reward) filter which
+    rows are kept as examples and paged; outcome codes and `pattern` only
+    apply to eval results (compact selection rows hold no completion text).
+    """
 
-def analyze_selection(records: list[Dict[str, Any]]) -> Dict[str, Any]:
-    n = len(records)
-    rescued = 0
-    baseline_pass = 0
-    best_pass = 0
+    query = query or RecordQuery()
+    query.validate()
+    page = _Page(query)
+
+    n = rescued = baseline_pass = best_pass = n_matched = 0
     rescue_examples: list[Dict[str, Any]] = []
 
     for r in records:
-        b = r.get("baseline") or {}
-        bn = float(b.get("reward", 0.0) or 0.0)
-        bo = r.get("best_of_n") or {}
-        br = float(bo.get("reward", 0.0) or 0.0)
+        n += 1
+        bn = _reward(r.get("baseline") or {})
+        br = _reward(r.get("best_of_n") or {})
 
         if bn == 1.0:
             baseline_pass += 1
@@ -125,6 +244,14 @@ def analyze_selection(records: list[Dict[str, Any]]) -> Dict[str, Any]:
             best_pass += 1
         if bn == 0.0 and br == 1.0:
             rescued += 1
+
+        if query.id_prefix is not None and not str(r.get("id", "")).startswith(query.id_prefix):
+            continue
+        if not _in_reward_range(br, query):
+            continue
+        page.offer(n_matched, r)
+        n_matched += 1
+        if bn == 0.0 and br == 1.0 and len(rescue_examples) < query.per_group:
             rescue_examples.append(r)
 
     return {
@@ -133,18 +260,80 @@ def analyze_selection(records: list[Dict[str, Any]]) -> Dict[str, Any]:
         "pass_at_1": baseline_pass / n if n else 0.0,
         "pass_at_n": best_pass / n if n else 0.0,
         "rescued": rescued,
+        "n_matched": n_matched,
         "rescue_examples": rescue_examples,
+        "page": page.rows,
     }
 
 
-def analyze_run(run: ResolvedRun) -> Dict[str, Any]:
-    records = read_jsonl(run.results_path)
-    if not records:
+def find_record(results_path: Path, ex_id: str) -> Optional[Dict[str, Any]]:
+    """First record with `id == ex_id`, streaming; lines without the id text are not parsed."""
+
+    needle = json.dumps(ex_id)
+    with results_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if needle not in line and ex_id not in line:
+                continue
+            rec = json.loads(line)
+            if isinstance(rec, dict) and str(rec.get("id")) == ex_id:
+                return rec
+    return None
+
+
+def rehydrate_selection_row(
+    row: Mapping[str, Any], samples_path: Optional[Path], *, handle: Optional[BinaryIO] = None
+) -> Dict[str, Any]:
+    """Fill in baseline / best_of_n completions for a compact selection row.
+
+    Compact rows (selection_demo --compact) only store the byte offset of the
+    example in the selection pack; this reads that one pack record. Full rows
+    are returned unchanged. If the pack is gone or no longer matches, the
+    completion is replaced by a short explanation instead of raising.
+    Rehydrating many rows, pass an open binary `handle` on the pack.
+    """
+
+    out = dict(row)
+    if "pack_offset" not in row:
+        return out
+
+    offset = row.get("pack_offset")
+    problem: Optional[str] = None
+    samples = []
+    if offset is None:
+        problem = "<no pack record for this example>"
+    elif samples_path is None or (handle is None and not samples_path.exists()):
+        problem = f"<pack not found: {samples_path}>"
+    else:
+        try:
+            pack_id, samples = read_pack_samples(samples_path, int(offset), handle=handle)
+        except ValueError as e:
+            problem = f"<pack unreadable at offset {offset}: {e}>"
+        else:
+            if pack_id != str(row.get("id")):
+                problem = f"<pack changed since run: offset {offset} now holds id {pack_id!r}>"
+
+    for key in ("baseline", "best_of_n"):
+        part = dict(out.get(key) or {})
+        idx = int(part.get("index", 0) or 0)
+        if problem is not None:
+            part["completion"] = problem
+        elif 0 <= idx < len(samples):
+            part["completion"] = samples[idx].completion
+        out[key] = part
+    return out
+
+
+def analyze_run(run: ResolvedRun, query: Optional[RecordQuery] = None) -> Dict[str, Any]:
+    records = iter_jsonl(run.results_path)
+    first = next(records, None)
+    if first is None:
         return {"mode": "empty", "n": 0}
 
-    mode = infer_mode(records[0])
+    mode = infer_mode(first)
     if mode == "eval":
-        return analyze_eval(records)
+        return analyze_eval(itertools.chain([first], records), query)
     if mode == "selection":
-        return analyze_selection(records)
-    return {"mode": "unknown", "n": len(records)}
+        # The per-sample `all_samples` list is the bulk of a selection row and is never shown here.
+        records.close()
+        return analyze_selection(iter_jsonl_fields(run.results_path, _SELECTION_FIELDS), query)
+    return {"mode": "unknown", "n": 1 + sum(1 for _ in records)}
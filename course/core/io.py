@@ -6,10 +6,11 @@ import os
 import platform
 import subprocess
 import sys
+import time
 from dataclasses import asdict, is_dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, Mapping, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, Mapping, Optional
 
 JsonDict = Dict[str, Any]
 
@@ -56,22 +57,244 @@ def atomic_write_text(path: Path, text: str, *, encoding: str = "utf-8") -> None
     os.replace(tmp, path)
 
 
+def parse_jsonl_line(line: str, *, lineno: int, source: Any) -> Optional[JsonDict]:
+    """Parse one JSONL line into a dict (None for blank lines).
+
+    Shared by the batch and streaming readers so they report errors identically.
+    """
+
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON on line {lineno} of {source}: {e.msg}. Line={line!r}") from e
+    if not isinstance(obj, dict):
+        raise ValueError(f"Expected JSON object per line in {source}. Line {lineno} was {type(obj)}")
+    return obj
+
+
+def iter_jsonl(path: Path) -> Iterator[JsonDict]:
+    """Stream a JSONL file one dict at a time (same checks as `read_jsonl`)."""
+    with path.open("r", encoding="utf-8") as f:
+        for i, line in enumerate(f, start=1):
+            obj = parse_jsonl_line(line, lineno=i, source=path)
+            if obj is not None:
+                yield obj
+
+
+def iter_jsonl_with_offsets(path: Path) -> Iterator[tuple[int, JsonDict]]:
+    """Like `iter_jsonl`, but also yield each record's starting byte offset.
+
+    The offset can later be handed to `read_jsonl_at` to fetch that one record
+    without re-reading the file.
+    """
+    with path.open("rb") as f:
+        i = 0
+        while True:
+            offset = f.tell()
+            raw = f.readline()
+            if not raw:
+                return
+            i += 1
+            obj = parse_jsonl_line(raw.decode("utf-8"), lineno=i, source=path)
+            if obj is not None:
+                yield offset, obj
+
+
+_DECODER = json.JSONDecoder()
+_JSON_WS = " \t\r\n"
+
+
+def _rfind_key(line: str, key: str) -> int:
+    """Index of the last `"key"` followed by optional JSON whitespace and `:` (-1 if none)."""
+
+    needle = f'"{key}"'
+    end = len(line)
+    while True:
+        i = line.rfind(needle, 0, end)
+        if i == -1:
+            return -1
+        j = i + len(needle)
+        while j < len(line) and line[j] in _JSON_WS:
+            j += 1
+        if j < len(line) and line[j] == ":":
+            return i
+        end = i + len(needle) - 1  # the same text used as a value: keep looking left
+
+
+def project_jsonl_line(
+    line: str,
+    fields: tuple[str, ...],
+    *,
+    require: tuple[str, ...] = (),
+    lineno: int,
+    source: Any,
+) -> Optional[JsonDict]:
+    """Decode only the top-level `fields` of one JSONL line (None for blank lines).
+
+    Fast path: find the last `"<field>"` + `:` (any JSON whitespace between
+    them, so `"reward" : 1` matches too) of each wanted field, then decode
+    `{` + the rest of the line from the earliest of them. That only succeeds,
+    ending exactly at the end of the line, if the earliest match sits at the
+    top level, and it yields every top-level key from there on. Everything
+    before it (e.g. a big nested `details` dict) is never decoded. A field
+    whose key text appears nowhere in the line is simply absent.
+
+    Falls back to `parse_jsonl_line` (and returns the full record, a superset
+    of the wanted fields) when a found field is not in that top-level tail, when
+    no field is found, or when a field in `require` is absent, so callers can
+    ask for the full row exactly when they need more than the projection.
+    """
+
+    found: list[str] = []
+    start = -1
+    for k in fields:
+        i = _rfind_key(line, k)
+        if i != -1:
+            found.append(k)
+            start = i if start == -1 else min(start, i)
+    if found and all(k in found for k in require):
+        try:
+            tail, end = _DECODER.raw_decode("{" + line[start:])
+        except ValueError:
+            tail, end = None, 0
+        if isinstance(tail, dict) and not line[start + end - 1 :].strip() and all(k in tail for k in found):
+            return {k: tail[k] for k in found}
+    return parse_jsonl_line(line, lineno=lineno, source=source)
+
+
+def iter_jsonl_fields(path: Path, fields: Iterable[str], *, require: Iterable[str] = ()) -> Iterator[JsonDict]:
+    """Stream a JSONL file decoding only `fields` of each row (see `project_jsonl_line`).
+
+    Rows may carry more keys than asked for (fallback rows are complete), never
+    fewer: a wanted field is missing only if the row really lacks it.
+    """
+    wanted = tuple(fields)
+    required = tuple(require)
+    with path.open("r", encoding="utf-8") as f:
+        for i, line in enumerate(f, start=1):
+            obj = project_jsonl_line(line, wanted, require=required, lineno=i, source=path)
+            if obj is not None:
+                yield obj
+
+
+def split_byte_ranges(path: Path, n_parts: int) -> list[tuple[int, int]]:
+    """Cut a file into `n_parts` contiguous [start, end) byte ranges.
+
+    Cuts fall anywhere; `iter_jsonl_range` assigns each line to the range its
+    first byte falls in, so the ranges together cover every line exactly once.
+    """
+    size = path.stat().st_size
+    n_parts = max(1, min(n_parts, size or 1))
+    bounds = [size * i // n_parts for i in range(n_parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_parts)]
+
+
+def iter_jsonl_range(path: Path, start: int, end: int) -> Iterator[tuple[int, JsonDict]]:
+    """`iter_jsonl_with_offsets`, restricted to lines that start in [start, end)."""
+    with path.open("rb") as f:
+        if start > 0:
+            f.seek(start - 1)
+            f.readline()  # finish the line straddling `start` (no-op if a line starts there)
+        while True:
+            offset = f.tell()
+            if offset >= end:
+                return
+            raw = f.readline()
+            if not raw:
+                return
+            obj = parse_jsonl_line(raw.decode("utf-8"), lineno=-1, source=f"{path}@{offset}")
+            if obj is not None:
+                yield offset, obj
+
+
+def read_jsonl_at(path: Path, offset: int, *, handle: Optional[BinaryIO] = None) -> JsonDict:
+    """Read the single JSONL record that starts at byte `offset`.
+
+    Pass an open binary `handle` on `path` to seek on it instead of reopening
+    the file (many lookups into one file).
+    """
+    if handle is not None:
+        handle.seek(offset)
+        raw = handle.readline()
+    else:
+        with path.open("rb") as f:
+            f.seek(offset)
+            raw = f.readline()
+    obj = parse_jsonl_line(raw.decode("utf-8"), lineno=-1, source=f"{path}@{offset}")
+    if obj is None:
+        raise ValueError(f"No JSONL record at byte offset {offset} of {path}")
+    return obj
+
+
 def read_jsonl(path: Path) -> list[JsonDict]:
     """Read a JSONL file into a list of dicts with friendly error messages."""
-    records: list[JsonDict] = []
+    return list(iter_jsonl(path))
+
+
+def follow_jsonl(
+    path: Path,
+    *,
+    poll_interval: float = 0.5,
+    idle_timeout: Optional[float] = None,
+    stop: Optional[Callable[[], bool]] = None,
+) -> Iterator[JsonDict]:
+    """Tail a JSONL file that may still be growing (like `tail -f`).
+
+    `path` may be "-" to read stdin until EOF. For regular files, a trailing
+    line without a newline is treated as a partial write and held back until it
+    is completed. Stops when `stop()` returns True, or after `idle_timeout`
+    seconds without new data (None = wait forever).
+    """
+
+    if str(path) == "-":
+        for i, line in enumerate(sys.stdin, start=1):
+            obj = parse_jsonl_line(line, lineno=i, source="<stdin>")
+            if obj is not None:
+                yield obj
+            if stop is not None and stop():
+                return
+        return
+
+    lineno = 0
+    pending = ""
+    last_data = time.monotonic()
     with path.open("r", encoding="utf-8") as f:
-        for i, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
+        while True:
+            chunk = f.readline()
+            if chunk:
+                last_data = time.monotonic()
+                pending += chunk
+                if not pending.endswith("\n"):
+                    continue
+                lineno += 1
+                line, pending = pending, ""
+                obj = parse_jsonl_line(line, lineno=lineno, source=path)
+                if obj is not None:
+                    yield obj
+                if stop is not None and stop():
+                    return
                 continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Invalid JSON on line {i} of {path}: {e.msg}. Line={line!r}") from e
-            if not isinstance(obj, dict):
-                raise ValueError(f"Expected JSON object per line in {path}. Line {i} was {type(obj)}")
-            records.append(obj)
-    return records
+
+            if stop is not None and stop():
+                return
+            if idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+                # Writer went quiet: accept a final unterminated line as complete.
+                if pending.strip():
+                    obj = parse_jsonl_line(pending, lineno=lineno + 1, source=path)
+                    if obj is not None:
+                        yield obj
+                return
+            time.sleep(poll_interval)
+
+
+def dump_jsonl_record(rec: Any) -> str:
+    """Serialize one record as a JSONL line (including the trailing newline)."""
+    if is_dataclass(rec):
+        rec = asdict(rec)
+    return json.dumps(to_jsonable(dict(rec)), ensure_ascii=False, sort_keys=True) + "\n"
 
 
 def write_jsonl(path: Path, records: Iterable[Mapping[str, Any]]) -> None:
@@ -79,9 +302,7 @@ def write_jsonl(path: Path, records: Iterable[Mapping[str, Any]]) -> None:
     ensure_dir(path.parent)
     with path.open("w", encoding="utf-8") as f:
         for rec in records:
-            if is_dataclass(rec):
-                rec = asdict(rec)  # type: ignore[assignment]
-            f.write(json.dumps(to_jsonable(dict(rec)), ensure_ascii=False, sort_keys=True) + "\n")
+            f.write(dump_jsonl_record(rec))
 
 
 def write_json(path: Path, obj: Any, *, indent: int = 2) -> None:
@@ -187,17 +408,26 @@ def write_manifest(
     scorer: Optional[JsonDict] = None,
     extra: Optional[JsonDict] = None,
     repo_root: Optional[Path] = None,
+    fingerprint_cache: Optional[Dict[Path, JsonDict]] = None,
 ) -> None:
     """Write a production-style run manifest.
 
     The manifest is meant to be the *minimum viable evidence* needed to reproduce
     or debug a number later.
+
+    `fingerprint_cache` lets callers that write many manifests for the same
+    inputs (e.g. a checkpoint sweep) hash each file only once.
     """
 
     input_fps: list[JsonDict] = []
     for p in (inputs or []):
-        if p.exists() and p.is_file():
-            input_fps.append(file_fingerprint(p))
+        if fingerprint_cache is not None and p in fingerprint_cache:
+            input_fps.append(fingerprint_cache[p])
+        elif p.exists() and p.is_file():
+            fp = file_fingerprint(p)
+            if fingerprint_cache is not None:
+                fingerprint_cache[p] = fp
+            input_fps.append(fp)
         else:
             input_fps.append({"path": str(p), "missing": True})
 
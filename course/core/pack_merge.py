@@ -0,0 +1,134 @@
+"""Merge many completions files into one selection pack, streaming.
+
+Rollout jobs each write a `frozen_rollouts`-style JSONL (one `{"id", "completion",
+...}` record per line; an id may repeat within a file when a job drew several
+samples). `merge_completion_files` k-way merges M such files into a selection
+pack (`{"id", "samples": [...]}` per line, ids ascending):
+
+- sorted mode (default): every input must already be sorted by id; records are
+  merged with `heapq.merge`, so memory is one record per input plus the samples
+  of the id being written.
+- indexed mode (`indexed=True`): inputs may be in any order; each file is
+  scanned once to index id -> byte offsets, then records are fetched by offset.
+  Memory grows with the number of ids, never with completion text.
+
+Each sample keeps the input record's fields (logprob aliases included) plus a
+`provenance` object `{"file", "offset"}` that `coerce_sample` surfaces as
+`sample.meta["provenance"]`; provenance already present (from an earlier merge)
+is kept. With `dedupe=True`, repeated completions for the same id are dropped
+(by content hash), keeping the first in (file, position) order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from course.core.io import JsonDict, iter_jsonl_with_offsets, parse_jsonl_line, write_jsonl
+
+# (id, file index, offset, record): the sort key is the first three fields.
+_Item = Tuple[str, int, int, JsonDict]
+
+
+def _record_id(rec: JsonDict, *, source: Any) -> str:
+    if "id" not in rec:
+        raise ValueError(f"Completion record missing 'id' in {source}: {rec!r}")
+    return str(rec["id"])
+
+
+def _sorted_items(path: Path, file_idx: int) -> Iterator[_Item]:
+    prev: Optional[str] = None
+    for offset, rec in iter_jsonl_with_offsets(path):
+        ex_id = _record_id(rec, source=f"{path}@{offset}")
+        if prev is not None and ex_id < prev:
+            raise ValueError(
+                f"{path} is not sorted by id ({ex_id!r} after {prev!r} at byte {offset}); "
+                "sort it or merge with indexed=True (--index)"
+            )
+        prev = ex_id
+        yield ex_id, file_idx, offset, rec
+
+
+def _indexed_items(paths: Sequence[Path]) -> Iterator[_Item]:
+    index: Dict[str, list[Tuple[int, int]]] = {}
+    for file_idx, path in enumerate(paths):
+        for offset, rec in iter_jsonl_with_offsets(path):
+            index.setdefault(_record_id(rec, source=f"{path}@{offset}"), []).append((file_idx, offset))
+
+    with ExitStack() as stack:
+        handles = [stack.enter_context(p.open("rb")) for p in paths]
+        for ex_id in sorted(index):
+            for file_idx, offset in sorted(index.pop(ex_id)):
+                f = handles[file_idx]
+                f.seek(offset)
+                rec = parse_jsonl_line(f.readline().decode("utf-8"), lineno=-1, source=f"{paths[file_idx]}@{offset}")
+                assert rec is not None
+                yield ex_id, file_idx, offset, rec
+
+
+def _content_hash(rec: JsonDict) -> str:
+    completion = rec.get("completion")
+    text = "" if completion is None else str(completion)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def merge_completion_files(
+    paths: Sequence[Path],
+    out_path: Path,
+    *,
+    indexed: bool = False,
+    dedupe: bool = False,
+) -> Dict[str, Any]:
+    """Merge completions files into a selection pack at `out_path`. Returns counts."""
+
+    if not paths:
+        raise ValueError("merge_completion_files needs at least one input file")
+
+    stats: Dict[str, Any] = {
+        "n_inputs": len(paths),
+        "n_records": 0,
+        "n_examples": 0,
+        "n_samples": 0,
+        "n_duplicates_dropped": 0,
+        "per_input_records": [0] * len(paths),
+    }
+
+    if indexed:
+        items: Iterator[_Item] = _indexed_items(paths)
+    else:
+        items = heapq.merge(*(_sorted_items(p, i) for i, p in enumerate(paths)), key=lambda it: it[:3])
+
+    def _pack_records() -> Iterator[Dict[str, Any]]:
+        cur_id: Optional[str] = None
+        samples: list[JsonDict] = []
+        hashes: set[str] = set()
+        for ex_id, file_idx, offset, rec in items:
+            stats["n_records"] += 1
+            stats["per_input_records"][file_idx] += 1
+            if ex_id != cur_id:
+                if cur_id is not None:
+                    yield {"id": cur_id, "samples": samples}
+                cur_id, samples, hashes = ex_id, [], set()
+            if dedupe:
+                h = _content_hash(rec)
+                if h in hashes:
+                    stats["n_duplicates_dropped"] += 1
+                    continue
+                hashes.add(h)
+            sample = {k: v for k, v in rec.items() if k != "id"}
+            sample.setdefault("provenance", {"file": str(paths[file_idx]), "offset": offset})
+            samples.append(sample)
+        if cur_id is not None:
+            yield {"id": cur_id, "samples": samples}
+
+    def _counted() -> Iterator[Dict[str, Any]]:
+        for pack_rec in _pack_records():
+            stats["n_examples"] += 1
+            stats["n_samples"] += len(pack_rec["samples"])
+            yield pack_rec
+
+    write_jsonl(out_path, _counted())
+    return stats
@@ -0,0 +1,224 @@
+"""Rejection sampling: turn a selection pack into an SFT dataset.
+
+Keeps only the samples the verifier gives reward 1.0, optionally deduplicated
+(identical completion text within an example) and capped at `k` per example,
+and writes them as `{"id", "prompt", "completion", "sample_index",
+"pack_offset"}` lines to `sft.jsonl`.
+
+The pack is cut into byte-range shards (`split_byte_ranges`); each worker
+streams its shard one record at a time and writes a part file, and the parts
+are concatenated in shard order, so the output is identical for any number of
+workers and never needs the whole pack in memory. Shards only see their own
+ids, so duplicate pack ids across shards are checked in the parent before the
+parts are joined (a duplicate raises, as the serial loader does). The cheap pre-checks from
+the scorer (`passes_cheap_checks`) reject most failing samples before `score`.
+"""
+
+from __future__ import annotations
+
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from course.core.datasets import index_by_id, load_examples
+from course.core.io import (
+    atomic_write_text,
+    dump_jsonl_record,
+    ensure_dir,
+    make_run_dir,
+    split_byte_ranges,
+    utc_now_iso,
+    write_json,
+    write_manifest,
+)
+from course.core.rollouts import iter_selection_pack_range
+from course.core.scoring import SCORER_NAME, SCORER_VERSION, passes_cheap_checks, score
+
+_COUNT_KEYS = (
+    "n_examples",
+    "n_unknown_ids",
+    "n_samples",
+    "n_scorer_calls",
+    "n_passing",
+    "n_duplicates_dropped",
+    "n_over_cap_dropped",
+    "n_kept",
+    "n_examples_with_kept",
+)
+
+
+# Per-process dataset index for `_shard_worker`, set once by `_init_worker`.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(dataset_path: Path) -> None:
+    """Pool initializer: load the dataset once per worker process, not once per shard."""
+
+    _WORKER_STATE["ex_by_id"] = index_by_id(load_examples(dataset_path))
+
+
+def _shard_worker(job: Dict[str, Any]) -> Tuple[Dict[str, int], list[str]]:
+    """Filter one byte range of the pack into a part file. Returns counts and the ids seen."""
+
+    ex_by_id = _WORKER_STATE["ex_by_id"]
+    k: Optional[int] = job["k"]
+    counts = dict.fromkeys(_COUNT_KEYS, 0)
+    seen: list[str] = []
+
+    with Path(job["part_path"]).open("w", encoding="utf-8") as out:
+        for offset, ex_id, samples in iter_selection_pack_range(
+            job["samples_path"], job["start"], job["end"], max_samples=job["n"]
+        ):
+            seen.append(ex_id)
+            ex = ex_by_id.get(ex_id)
+            if ex is None:
+                counts["n_unknown_ids"] += 1
+                continue
+            counts["n_examples"] += 1
+            counts["n_samples"] += len(samples)
+
+            memo: Dict[str, bool] = {}
+            kept_texts: set[str] = set()
+            n_kept = 0
+            for i, s in enumerate(samples):
+                ok = memo.get(s.completion)
+                if ok is None:
+                    ok = passes_cheap_checks(ex, s.completion)
+                    if ok:
+                        counts["n_scorer_calls"] += 1
+                        ok = float(score(ex, s.completion).get("reward", 0.0)) == 1.0
+                    memo[s.completion] = ok
+                if not ok:
+                    continue
+                counts["n_passing"] += 1
+                if job["dedupe"] and s.completion in kept_texts:
+                    counts["n_duplicates_dropped"] += 1
+                    continue
+                if k is not None and n_kept >= k:
+                    counts["n_over_cap_dropped"] += 1
+                    continue
+                kept_texts.add(s.completion)
+                n_kept += 1
+                out.write(
+                    dump_jsonl_record(
+                        {
+                            "id": ex.id,
+                            "prompt": ex.prompt,
+                            "completion": s.completion,
+                            "sample_index": i,
+                            "pack_offset": offset,
+                        }
+                    )
+                )
+            counts["n_kept"] += n_kept
+            counts["n_examples_with_kept"] += int(n_kept > 0)
+    return counts, seen
+
+
+def build_rejection_sft(
+    *,
+    dataset_path: Path,
+    samples_path: Path,
+    out_dir: Optional[Path] = None,
+    k: Optional[int] = None,
+    dedupe: bool = False,
+    n: Optional[int] = None,
+    workers: int = 1,
+    argv: Optional[list[str]] = None,
+    args: Optional[Dict[str, Any]] = None,
+) -> tuple[Path, Dict[str, Any]]:
+    """Write `sft.jsonl` (+ summary and manifest) from a selection pack."""
+
+    if k is not None and k < 1:
+        raise ValueError(f"k must be >= 1 (got {k})")
+    if out_dir is None:
+        out_dir = make_run_dir(Path("runs"), prefix="rejection_sft")
+    created_utc = utc_now_iso()
+
+    parts_dir = ensure_dir(out_dir / "_parts")
+    # A few shards per worker keeps processes busy when shard costs differ.
+    ranges = split_byte_ranges(samples_path, workers * 4 if workers > 1 else 1)
+    jobs = [
+        {
+            "samples_path": samples_path,
+            "start": start,
+            "end": end,
+            "n": n,
+            "k": k,
+            "dedupe": dedupe,
+            "part_path": parts_dir / f"part-{i:05d}.jsonl",
+        }
+        for i, (start, end) in enumerate(ranges)
+    ]
+    if workers <= 1:
+        _init_worker(dataset_path)
+        shard_results = [_shard_worker(j) for j in jobs]
+        _WORKER_STATE.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset_path,)) as pool:
+            shard_results = list(pool.map(_shard_worker, jobs))
+
+    seen: set[str] = set()
+    for _counts, shard_seen in shard_results:
+        for ex_id in shard_seen:
+            # Shards only check duplicates locally; the serial loader checks the whole pack.
+            if ex_id in seen:
+                shutil.rmtree(parts_dir)
+                raise ValueError(f"Duplicate selection-pack id {ex_id!r} in {samples_path}")
+            seen.add(ex_id)
+
+    sft_path = out_dir / "sft.jsonl"
+    tmp = sft_path.with_suffix(".jsonl.tmp")
+    with tmp.open("wb") as out:
+        for job in jobs:
+            with Path(job["part_path"]).open("rb") as part:
+                shutil.copyfileobj(part, out)
+    tmp.replace(sft_path)
+    shutil.rmtree(parts_dir)
+
+    counts = {key: sum(c[key] for c, _seen in shard_results) for key in _COUNT_KEYS}
+    summary: Dict[str, Any] = {
+        "run": {
+            "created_utc": created_utc,
+            "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
+            "dataset_path": str(dataset_path),
+            "samples_path": str(samples_path),
+            "n": n,
+            "k": k,
+            "dedupe": dedupe,
+            "workers": workers,
+            "n_shards": len(jobs),
+        },
+        "counts": counts,
+    }
+    write_json(out_dir / "summary.json", summary)
+
+    md = []
+    md.append("# Rejection-sampling SFT set\n\n")
+    md.append(f"- Created (UTC): `{created_utc}`\n")
+    md.append(f"- Scorer: `{SCORER_NAME}` v`{SCORER_VERSION}`\n")
+    md.append(f"- Dataset: `{dataset_path}`\n")
+    md.append(f"- Samples: `{samples_path}` (n cap: `{n}`)\n")
+    md.append(f"- Keep: reward == 1.0, k per example: `{k}`, dedupe: `{dedupe}`\n")
+    md.append("\n## Counts\n")
+    for key in _COUNT_KEYS:
+        md.append(f"- {key}: `{counts[key]}`\n")
+    md.append("\n## Interpretation reminder\n")
+    md.append(
+        "Every kept completion passed the verifier, so the set inherits the verifier's blind spots.\n"
+        "Examples with no kept sample are missing from the set entirely (see n_examples_with_kept).\n"
+    )
+    atomic_write_text(out_dir / "summary.md", "".join(md))
+
+    write_manifest(
+        out_dir,
+        created_utc=created_utc,
+        script="rejection_sft",
+        argv=argv or [],
+        args=args or {},
+        inputs=[dataset_path, samples_path],
+        scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
+        extra={"n": n, "k": k, "dedupe": dedupe, "counts": counts},
+    )
+    return out_dir, summary
@@ -0,0 +1,266 @@
+"""Re-score historical runs under the current scorer version.
+
+Eval and selection runs store their completions in `results.jsonl` (compact
+selection runs store pack byte offsets instead, and their samples are read back
+from the run's pack), so a scorer bump does not require replaying the original
+inputs: this module rebuilds the examples/samples from each results file and
+scores them again, writing a new run
+dir next to the original (`<run>__rescored_v<SCORER_VERSION>`). The new manifest
+keeps the original input fingerprints (so Locked Room checks still line up) and
+points back at the run it was derived from.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Sequence
+
+from course.core.eval import EvalAccumulator, render_eval_md
+from course.core.inspect import infer_mode
+from course.core.io import (
+    JsonDict,
+    atomic_write_text,
+    ensure_dir,
+    file_fingerprint,
+    iter_jsonl,
+    utc_now_iso,
+    write_json,
+    write_jsonl,
+    write_manifest,
+)
+from course.core.rollouts import read_pack_samples
+from course.core.scoring import SCORER_NAME, SCORER_VERSION
+from course.core.selection import SelectionAccumulator, load_policy, render_selection_md
+from course.core.types import Example, RolloutSample
+
+RESCORED_MARKER = "__rescored_v"
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def rescored_dir_for(run_dir: Path) -> Path:
+    return run_dir.parent / f"{run_dir.name}{RESCORED_MARKER}{SCORER_VERSION}"
+
+
+def discover_runs(root: Path) -> list[Path]:
+    """All run dirs under `root` that have a results.jsonl (rescored dirs excluded)."""
+
+    found: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if RESCORED_MARKER not in d)
+        if "results.jsonl" in filenames:
+            found.append(Path(dirpath))
+    return found
+
+
+def _example_from_row(row: Dict[str, Any]) -> Example:
+    return Example(id=str(row["id"]), prompt=str(row.get("prompt", "")), expected_answer=int(row["expected_answer"]))
+
+
+def _sample_from_brief(obj: Dict[str, Any]) -> RolloutSample:
+    return RolloutSample(
+        completion=str(obj.get("completion") or ""),
+        sum_logprob=obj.get("sum_logprob"),
+        sum_ref_logprob=obj.get("sum_ref_logprob"),
+    )
+
+
+def _eval_rows(results_path: Path, acc: EvalAccumulator) -> Iterator[Dict[str, Any]]:
+    for row in iter_jsonl(results_path):
+        sample = None if row.get("missing_completion") else _sample_from_brief(row)
+        yield acc.add(_example_from_row(row), sample)
+
+
+def _is_missing_selection_row(row: Dict[str, Any], briefs: list[Any]) -> bool:
+    """Whether a full selection row stands for an example that had no pack record.
+
+    Such rows hold one fail-safe empty sample; newer runs flag them with
+    `missing_samples`, older ones are recognized by that lone empty sample.
+    """
+
+    if "missing_samples" in row:
+        return bool(row["missing_samples"])
+    return len(briefs) == 1 and isinstance(briefs[0], dict) and not briefs[0].get("completion") and (
+        briefs[0].get("sum_logprob") is None
+    )
+
+
+def _compact_samples(
+    row: Dict[str, Any], samples_path: Path, pack: BinaryIO
+) -> Optional[list[RolloutSample]]:
+    """Samples of a compact row, read back from the pack (None for a missing example)."""
+
+    offset = row.get("pack_offset")
+    if offset is None:
+        return None
+    pack_id, samples = read_pack_samples(samples_path, int(offset), handle=pack)
+    if pack_id != str(row.get("id")):
+        raise ValueError(
+            f"Selection pack {samples_path} changed since the run: offset {offset} holds id {pack_id!r}, "
+            f"expected {row.get('id')!r}"
+        )
+    return samples
+
+
+def _selection_rows(
+    results_path: Path,
+    acc: SelectionAccumulator,
+    pick_best: Any,
+    n: Optional[int],
+    samples_path: Optional[Path] = None,
+) -> Iterator[Dict[str, Any]]:
+    pack: Optional[BinaryIO] = None
+    try:
+        for row in iter_jsonl(results_path):
+            if "pack_offset" in row:
+                if samples_path is None or not samples_path.exists():
+                    raise ValueError(f"Compact selection run {results_path} needs its pack to rescore: {samples_path}")
+                if pack is None:
+                    pack = samples_path.open("rb")
+                samples = _compact_samples(row, samples_path, pack)
+                yield acc.add(_example_from_row(row), samples, pick_best=pick_best, n=n, pack_offset=row["pack_offset"])
+                continue
+            briefs = row.get("all_samples")
+            if not isinstance(briefs, list):
+                raise ValueError(f"Selection row {row.get('id')!r} in {results_path} has no 'all_samples' to rescore")
+            samples = None if _is_missing_selection_row(row, briefs) else [_sample_from_brief(b) for b in briefs]
+            yield acc.add(_example_from_row(row), samples, pick_best=pick_best, n=n)
+    finally:
+        if pack is not None:
+            pack.close()
+
+
+def rescore_run(
+    run_dir: Path,
+    *,
+    policy_spec: str,
+    out_dir: Optional[Path] = None,
+    include_current: bool = False,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """Re-score one run dir. Returns a status record (never raises for expected skips)."""
+
+    results_path = run_dir / "results.jsonl"
+    old_summary = _read_json(run_dir / "summary.json")
+    old_manifest = _read_json(run_dir / "manifest.json")
+    old_run = old_summary.get("run") or {}
+    old_scorer = old_run.get("scorer") or {}
+    out_dir = out_dir or rescored_dir_for(run_dir)
+
+    status: Dict[str, Any] = {
+        "run_dir": str(run_dir),
+        "out_dir": str(out_dir),
+        "old_scorer": old_scorer,
+    }
+
+    first = next(iter_jsonl(results_path), None)
+    mode = infer_mode(first) if first is not None else "empty"
+    status["mode"] = mode
+    if mode not in ("eval", "selection"):
+        return {**status, "status": "skipped", "reason": f"mode={mode}"}
+    if not include_current and old_scorer.get("name") == SCORER_NAME and old_scorer.get("version") == SCORER_VERSION:
+        return {**status, "status": "skipped", "reason": "already current scorer"}
+    if out_dir.exists() and not force:
+        return {**status, "status": "skipped", "reason": "output exists"}
+
+    created_utc = utc_now_iso()
+    ensure_dir(out_dir)
+    rescored_from = {"run_dir": str(run_dir), "scorer": old_scorer}
+
+    if mode == "eval":
+        acc = EvalAccumulator()
+        write_jsonl(out_dir / "results.jsonl", _eval_rows(results_path, acc))
+        summary = acc.summary(
+            created_utc=created_utc,
+            dataset_path=Path(str(old_run.get("dataset_path") or "")),
+            completion_source={"type": "rescore", "run_dir": str(run_dir)},
+        )
+        if "sampling" in old_summary:
+            summary["sampling"] = old_summary["sampling"]
+        summary["rescored_from"] = rescored_from
+        write_json(out_dir / "summary.json", summary)
+        atomic_write_text(out_dir / "summary.md", render_eval_md(summary, acc.top_failures))
+        old_metric, new_metric = (old_summary.get("metrics") or {}).get("pass_rate"), summary["metrics"]["pass_rate"]
+    else:
+        n = old_run.get("n")
+        samples_path = Path(str(old_run["samples_path"])) if old_run.get("samples_path") else None
+        sacc = SelectionAccumulator(compact="pack_offset" in first)
+        write_jsonl(
+            out_dir / "results.jsonl",
+            _selection_rows(results_path, sacc, load_policy(policy_spec), n, samples_path),
+        )
+        summary = sacc.summary(
+            created_utc=created_utc,
+            dataset_path=Path(str(old_run.get("dataset_path") or "")),
+            samples_path=old_run.get("samples_path") or "",
+            n=n,
+        )
+        summary["rescored_from"] = rescored_from
+        write_json(out_dir / "summary.json", summary)
+        atomic_write_text(out_dir / "summary.md", render_selection_md(summary))
+        old_metric, new_metric = (old_summary.get("metrics") or {}).get("pass_at_n"), summary["metrics"]["pass_at_n"]
+
+    # Carry the original input fingerprints over verbatim so the rescored run
+    # stays in the same locked room (same dataset hash) as its source.
+    old_inputs: list[JsonDict] = [fp for fp in (old_manifest.get("inputs") or []) if isinstance(fp, dict)]
+    old_extra = old_manifest.get("extra") or {}
+    extra: Dict[str, Any] = {
+        "rescored_from": {**rescored_from, "results": file_fingerprint(results_path)},
+        "policy": policy_spec if mode == "selection" else None,
+    }
+    if old_extra.get("sampled"):
+        extra["sampled"] = True
+        extra["sampling"] = old_extra.get("sampling")
+    write_manifest(
+        out_dir,
+        created_utc=created_utc,
+        script="rescore_runs",
+        inputs=[Path(str(fp.get("path"))) for fp in old_inputs],
+        scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
+        extra=extra,
+        fingerprint_cache={Path(str(fp.get("path"))): fp for fp in old_inputs},
+    )
+
+    return {
+        **status,
+        "status": "rescored",
+        "metric": "pass_rate" if mode == "eval" else "pass_at_n",
+        "old_value": old_metric,
+        "new_value": new_metric,
+    }
+
+
+def _rescore_worker(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    run_dir = kwargs.pop("run_dir")
+    try:
+        return rescore_run(run_dir, **kwargs)
+    except Exception as e:  # report and keep going: one bad run must not stop the batch
+        return {"run_dir": str(run_dir), "status": "error", "reason": f"{type(e).__name__}: {e}"}
+
+
+def rescore_runs(
+    root: Path,
+    *,
+    policy_spec: str,
+    workers: int = 1,
+    include_current: bool = False,
+    force: bool = False,
+    run_dirs: Optional[Sequence[Path]] = None,
+) -> list[Dict[str, Any]]:
+    """Re-score every eval/selection run under `root`, in parallel across runs."""
+
+    dirs = list(run_dirs) if run_dirs is not None else discover_runs(root)
+    jobs = [
+        {"run_dir": d, "policy_spec": policy_spec, "include_current": include_current, "force": force} for d in dirs
+    ]
+    if workers <= 1:
+        return [_rescore_worker(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_rescore_worker, jobs))
@@ -0,0 +1,340 @@
+"""Score a selection pack once, then compare many selection policies offline.
+
+A reward matrix holds, for every (example, sample) cell, everything a ranking
+policy may look at: reward, outcome code, logprobs, KL estimate, length, and the
+lexicographic rank of the completion within its example (rows for examples with
+no samples carry `"missing": true` and one fail-safe empty sample). It is written once per
+(dataset, pack, N, scorer version) to a cache directory; afterwards any number
+of policies are evaluated from it without calling the scorer again.
+
+Policies are reward-first rankings with different tie-breaks (plus one
+verifier-free baseline), named by a short spec string, e.g. `shortest` or
+`kl_penalized:0.1`. See POLICY_NAMES.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import math
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from course.core.datasets import index_by_id, load_examples
+from course.core.io import (
+    atomic_write_text,
+    ensure_dir,
+    iter_jsonl,
+    make_run_dir,
+    sha256_file,
+    utc_now_iso,
+    write_json,
+    write_jsonl,
+    write_manifest,
+)
+from course.core.rollouts import iter_selection_pack
+from course.core.scoring import SCORER_NAME, SCORER_VERSION, score
+from course.core.types import Example, RolloutSample
+
+MatrixRow = Dict[str, Any]
+RankKey = Callable[[MatrixRow, int], Tuple[Any, ...]]
+
+_INF = float("inf")
+
+# Bump when the row layout changes so stale caches are rebuilt, not misread.
+MATRIX_FORMAT_VERSION = 2
+
+
+def _outcome_code(scored: Dict[str, Any]) -> str:
+    outcome = (scored.get("details") or {}).get("result") or {}
+    return str(outcome.get("code") or "unknown")
+
+
+def matrix_row(ex: Example, samples: list[RolloutSample]) -> MatrixRow:
+    """Score every sample of one example into a matrix row (one scorer call per distinct completion)."""
+
+    memo: Dict[str, Dict[str, Any]] = {}
+    for s in samples:
+        if s.completion not in memo:
+            memo[s.completion] = score(ex, s.completion)
+    ranks = {c: r for r, c in enumerate(sorted(memo))}
+    return {
+        "id": ex.id,
+        "reward": [float(memo[s.completion].get("reward", 0.0)) for s in samples],
+        "outcome_code": [_outcome_code(memo[s.completion]) for s in samples],
+        "sum_logprob": [s.sum_logprob for s in samples],
+        "kl_est": [s.kl_estimate() for s in samples],
+        "length": [len(s.completion) for s in samples],
+        "text_rank": [ranks[s.completion] for s in samples],
+    }
+
+
+def matrix_cache_key(*, dataset_sha256: str, pack_sha256: str, n: Optional[int], max_examples: Optional[int]) -> str:
+    raw = f"{MATRIX_FORMAT_VERSION}:{SCORER_NAME}:{SCORER_VERSION}:{dataset_sha256}:{pack_sha256}:{n}:{max_examples}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def build_reward_matrix(
+    *,
+    dataset_path: Path,
+    samples_path: Path,
+    cache_dir: Path,
+    n: Optional[int] = None,
+    max_examples: Optional[int] = None,
+) -> Tuple[Path, bool]:
+    """Materialize (or reuse) the reward matrix. Returns (matrix path, cache_hit)."""
+
+    key = matrix_cache_key(
+        dataset_sha256=sha256_file(dataset_path),
+        pack_sha256=sha256_file(samples_path),
+        n=n,
+        max_examples=max_examples,
+    )
+    out_dir = ensure_dir(cache_dir / key)
+    matrix_path = out_dir / "matrix.jsonl"
+    if matrix_path.exists():
+        return matrix_path, True
+
+    examples = load_examples(dataset_path)
+    if max_examples is not None:
+        examples = examples[:max_examples]
+    ex_by_id = index_by_id(examples)
+    seen: set[str] = set()
+
+    def _rows() -> Iterator[MatrixRow]:
+        for ex_id, samples in iter_selection_pack(samples_path, max_samples=n):
+            ex = ex_by_id.get(ex_id)
+            if ex is None:
+                continue
+            seen.add(ex_id)
+            if samples:
+                yield matrix_row(ex, samples)
+            else:
+                # Same fail-safe as selection_demo for records without samples.
+                yield {**matrix_row(ex, [RolloutSample(completion="")]), "missing": True}
+        for ex in examples:
+            if ex.id not in seen:
+                yield {**matrix_row(ex, [RolloutSample(completion="")]), "missing": True}
+
+    # Write under a temp name so an interrupted build never looks like a cache hit.
+    tmp = out_dir / "matrix.jsonl.tmp"
+    write_jsonl(tmp, _rows())
+    write_json(
+        out_dir / "meta.json",
+        {
+            "format_version": MATRIX_FORMAT_VERSION,
+            "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
+            "dataset_path": str(dataset_path),
+            "samples_path": str(samples_path),
+            "n": n,
+            "max_examples": max_examples,
+            "created_utc": utc_now_iso(),
+        },
+    )
+    tmp.replace(matrix_path)
+    return matrix_path, False
+
+
+# -----------------------------------------------------------------------------
+# Policies over matrix rows: smallest key wins, index breaks remaining ties.
+# -----------------------------------------------------------------------------
+
+
+def _lp(row: MatrixRow, i: int, *, missing: float) -> float:
+    lp = row["sum_logprob"][i]
+    return missing if lp is None else float(lp)
+
+
+def _kl(row: MatrixRow, i: int) -> float:
+    kl = row["kl_est"][i]
+    return 0.0 if kl is None else float(kl)
+
+
+def make_policy(spec: str) -> RankKey:
+    """Build a ranking key from a policy spec (see POLICY_NAMES)."""
+
+    name, _, param = spec.partition(":")
+    if name == "index":
+        return lambda row, i: (-row["reward"][i], i)
+    if name == "default":
+        # Mirrors the reference tie_break_key: higher logprob (missing = 0.0),
+        # then shorter, then lexicographically smaller completion.
+        return lambda row, i: (-row["reward"][i], -_lp(row, i, missing=0.0), row["length"][i], row["text_rank"][i], i)
+    if name == "shortest":
+        return lambda row, i: (-row["reward"][i], row["length"][i], i)
+    if name == "logprob":
+        return lambda row, i: (-row["reward"][i], -_lp(row, i, missing=-_INF), i)
+    if name == "logprob_only":
+        # No verifier: what you'd ship by trusting the model's own likelihood.
+        return lambda row, i: (-_lp(row, i, missing=-_INF), i)
+    if name == "kl_penalized":
+        beta = float(param or 0.1)
+        return lambda row, i: (-(row["reward"][i] - beta * _kl(row, i)), i)
+    raise ValueError(f"Unknown policy {spec!r}; expected one of {POLICY_NAMES}")
+
+
+POLICY_NAMES = ["index", "default", "shortest", "logprob", "logprob_only", "kl_penalized[:beta]"]
+
+
+def evaluate_policies(matrix_path: Path, policies: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """One pass over the matrix, all policies at once."""
+
+    keys = {spec: make_policy(spec) for spec in policies}
+    stats = {spec: {"n": 0, "n_pass_at_1": 0, "n_pass_at_n": 0, "rescued": 0, "kl_sum": 0.0, "len_sum": 0} for spec in policies}
+
+    for row in iter_jsonl(matrix_path):
+        n_samples = len(row["reward"])
+        base_ok = row["reward"][0] == 1.0
+        for spec, key in keys.items():
+            best = min(range(n_samples), key=lambda i: key(row, i))
+            ok = row["reward"][best] == 1.0
+            st = stats[spec]
+            st["n"] += 1
+            st["n_pass_at_1"] += int(base_ok)
+            st["n_pass_at_n"] += int(ok)
+            st["rescued"] += int(ok and not base_ok)
+            st["kl_sum"] += _kl(row, best)
+            st["len_sum"] += row["length"][best]
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for spec, st in stats.items():
+        n = st["n"]
+        out[spec] = {
+            "n": n,
+            "pass_at_1": st["n_pass_at_1"] / n if n else 0.0,
+            "pass_at_n": st["n_pass_at_n"] / n if n else 0.0,
+            "rescued": st["rescued"],
+            "mean_chosen_kl_est": st["kl_sum"] / n if n else 0.0,
+            "mean_chosen_length": st["len_sum"] / n if n else 0.0,
+        }
+    return out
+
+
+def run_policy_comparison(
+    *,
+    dataset_path: Path,
+    samples_path: Path,
+    policies: Sequence[str],
+    cache_dir: Path,
+    out_dir: Optional[Path] = None,
+    n: Optional[int] = None,
+    max_examples: Optional[int] = None,
+    argv: Optional[list[str]] = None,
+    args: Optional[Dict[str, Any]] = None,
+) -> tuple[Path, Dict[str, Any]]:
+    """Build/reuse the reward matrix and write a policy comparison run dir."""
+
+    for spec in policies:
+        make_policy(spec)  # fail fast on typos, before any scoring
+
+    if out_dir is None:
+        out_dir = make_run_dir(Path("runs"), prefix="policy_compare")
+    created_utc = utc_now_iso()
+
+    matrix_path, cache_hit = build_reward_matrix(
+        dataset_path=dataset_path, samples_path=samples_path, cache_dir=cache_dir, n=n, max_examples=max_examples
+    )
+    results = evaluate_policies(matrix_path, policies)
+
+    summary: Dict[str, Any] = {
+        "run": {
+            "created_utc": created_utc,
+            "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
+            "dataset_path": str(dataset_path),
+            "samples_path": str(samples_path),
+            "n": n,
+            "matrix_path": str(matrix_path),
+            "matrix_cache_hit": cache_hit,
+        },
+        "policies": results,
+    }
+    write_json(out_dir / "summary.json", summary)
+
+    md = []
+    md.append("# Selection policy comparison (reward matrix)\n\n")
+    md.append(f"- Created (UTC): `{created_utc}`\n")
+    md.append(f"- Scorer: `{SCORER_NAME}` v`{SCORER_VERSION}`\n")
+    md.append(f"- Dataset: `{dataset_path}`\n")
+    md.append(f"- Samples: `{samples_path}` (n cap: `{n}`)\n")
+    md.append(f"- Matrix: `{matrix_path}` ({'cache hit' if cache_hit else 'built'})\n")
+    md.append("\n| policy | pass@1 | pass@N | rescued | mean chosen KL | mean chosen length |\n")
+    md.append("|---|---:|---:|---:|---:|---:|\n")
+    for spec, r in sorted(results.items(), key=lambda kv: kv[1]["pass_at_n"], reverse=True):
+        md.append(
+            f"| `{spec}` | {r['pass_at_1']:.3f} | {r['pass_at_n']:.3f} | {r['rescued']} | "
+            f"{r['mean_chosen_kl_est']:.3f} | {r['mean_chosen_length']:.1f} |\n"
+        )
+    atomic_write_text(out_dir / "summary.md", "".join(md))
+
+    write_manifest(
+        out_dir,
+        created_utc=created_utc,
+        script="reward_matrix",
+        argv=argv or [],
+        args=args or {},
+        inputs=[dataset_path, samples_path],
+        scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
+        extra={"policies": list(policies), "matrix_path": str(matrix_path), "matrix_cache_hit": cache_hit},
+    )
+    return out_dir, summary
+
+
+# -----------------------------------------------------------------------------
+# Group-relative advantages (GRPO-style batches) from the same matrix
+# -----------------------------------------------------------------------------
+
+ADVANTAGE_COLUMNS = ["id", "sample_index", "reward", "advantage", "sum_logprob", "kl_est"]
+
+
+def group_advantages(rewards: Sequence[float], *, normalize_std: bool = False, eps: float = 1e-6) -> list[float]:
+    """reward - group mean, optionally divided by (group std + eps).
+
+    Uses the population std, so a group whose samples all got the same reward
+    has advantage 0.0 everywhere (no learning signal) with or without scaling.
+    """
+
+    n = len(rewards)
+    if n == 0:
+        return []
+    mean = math.fsum(rewards) / n
+    centered = [r - mean for r in rewards]
+    if not normalize_std:
+        return centered
+    std = math.sqrt(math.fsum(c * c for c in centered) / n)
+    return [c / (std + eps) for c in centered]
+
+
+def export_advantages(
+    matrix_path: Path,
+    out_path: Path,
+    *,
+    normalize_std: bool = False,
+    eps: float = 1e-6,
+) -> Dict[str, Any]:
+    """Write one CSV row per (example, sample) with its group-relative advantage.
+
+    Streams the matrix row by row; rows marked missing (no real samples) are
+    skipped. Samples are referenced by (id, sample_index) into the pack, so the
+    batch carries no completion text. Returns counts.
+    """
+
+    stats = {"n_groups": 0, "n_rows": 0, "n_zero_signal_groups": 0, "n_missing_skipped": 0}
+    ensure_dir(out_path.parent)
+    tmp = out_path.with_suffix(out_path.suffix + ".tmp")
+    with tmp.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(ADVANTAGE_COLUMNS)
+        for row in iter_jsonl(matrix_path):
+            if row.get("missing"):
+                stats["n_missing_skipped"] += 1
+                continue
+            rewards = row["reward"]
+            advs = group_advantages(rewards, normalize_std=normalize_std, eps=eps)
+            stats["n_groups"] += 1
+            stats["n_rows"] += len(rewards)
+            if len(set(rewards)) <= 1:
+                stats["n_zero_signal_groups"] += 1
+            for i, (r, a, lp, kl) in enumerate(zip(rewards, advs, row["sum_logprob"], row["kl_est"])):
+                w.writerow([row["id"], i, r, a, "" if lp is None else lp, "" if kl is None else kl])
+    tmp.replace(out_path)
+    return stats
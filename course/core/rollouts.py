@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
 
-from course.core.io import read_jsonl
+from course.core.io import iter_jsonl_range, iter_jsonl_with_offsets, read_jsonl, read_jsonl_at
 from course.core.types import RolloutSample
 
 
@@ -85,17 +85,91 @@ def load_frozen_rollouts(path: Path) -> dict[str, RolloutSample]:
     records = read_jsonl(path)
     m: dict[str, RolloutSample] = {}
     for rec in records:
-        if "id" not in rec:
-            raise ValueError(f"Completion record missing 'id' in {path}: {rec!r}")
-        ex_id = str(rec["id"])
+        ex_id, sample = parse_completion_record(rec, source=path)
         if ex_id in m:
             raise ValueError(f"Duplicate completion id {ex_id!r} in {path}")
-
-        sample = coerce_sample({k: v for k, v in rec.items() if k != "id"})
         m[ex_id] = sample
     return m
 
 
+def parse_completion_record(rec: Dict[str, Any], *, source: Any) -> Tuple[str, RolloutSample]:
+    """Split one completions-file record into (example id, RolloutSample)."""
+
+    if "id" not in rec:
+        raise ValueError(f"Completion record missing 'id' in {source}: {rec!r}")
+    ex_id = str(rec["id"])
+    return ex_id, coerce_sample({k: v for k, v in rec.items() if k != "id"})
+
+
+def iter_selection_pack(path: Path, *, max_samples: Optional[int] = None) -> Iterator[Tuple[str, list[RolloutSample]]]:
+    """Stream a selection pack JSONL one example at a time: (id, samples).
+
+    Applies the same checks as `load_selection_pack` (missing id, duplicate id,
+    non-list samples) while holding only one record in memory. `max_samples`
+    truncates each record before coercion, so unused samples are never built.
+    """
+
+    for _offset, ex_id, samples in iter_selection_pack_with_offsets(path, max_samples=max_samples):
+        yield ex_id, samples
+
+
+def iter_selection_pack_with_offsets(
+    path: Path, *, max_samples: Optional[int] = None
+) -> Iterator[Tuple[int, str, list[RolloutSample]]]:
+    """`iter_selection_pack`, plus the byte offset of each record in the pack."""
+
+    seen: set[str] = set()
+    for offset, rec in iter_jsonl_with_offsets(path):
+        ex_id, samples_obj = _check_pack_record(rec, seen, source=path)
+        if max_samples is not None:
+            samples_obj = samples_obj[:max_samples]
+        yield offset, ex_id, [coerce_sample(s) for s in samples_obj]
+
+
+def iter_selection_pack_range(
+    path: Path, start: int, end: int, *, max_samples: Optional[int] = None
+) -> Iterator[Tuple[int, str, list[RolloutSample]]]:
+    """`iter_selection_pack_with_offsets` over one byte range (see `split_byte_ranges`).
+
+    For sharded workers; duplicate ids are only detected within the range.
+    """
+
+    seen: set[str] = set()
+    for offset, rec in iter_jsonl_range(path, start, end):
+        ex_id, samples_obj = _check_pack_record(rec, seen, source=path)
+        if max_samples is not None:
+            samples_obj = samples_obj[:max_samples]
+        yield offset, ex_id, [coerce_sample(s) for s in samples_obj]
+
+
+def read_pack_samples(
+    path: Path, offset: int, *, handle: Optional[BinaryIO] = None
+) -> Tuple[str, list[RolloutSample]]:
+    """Fetch one example's samples from a pack by byte offset (see compact selection results).
+
+    `handle` is an open binary handle on the pack, for callers doing many lookups.
+    """
+
+    ex_id, samples_obj = _check_pack_record(read_jsonl_at(path, offset, handle=handle), set(), source=path)
+    return ex_id, [coerce_sample(s) for s in samples_obj]
+
+
+def _check_pack_record(rec: Dict[str, Any], seen: set[str], *, source: Any) -> Tuple[str, list[Any]]:
+    if "id" not in rec:
+        raise ValueError(f"Selection pack record missing 'id' in {source}: {rec!r}")
+    ex_id = str(rec["id"])
+    if ex_id in seen:
+        raise ValueError(f"Duplicate selection-pack id {ex_id!r} in {source}")
+    seen.add(ex_id)
+
+    samples_obj = rec.get("samples")
+    if not isinstance(samples_obj, list):
+        raise ValueError(
+            f"Selection pack record must include list 'samples'. id={ex_id!r} rec={rec!r}"
+        )
+    return ex_id, samples_obj
+
+
 def load_selection_pack(path: Path) -> dict[str, list[RolloutSample]]:
     """Load a selection pack JSONL: id -> list of samples.
 
@@ -103,20 +177,4 @@ def load_selection_pack(path: Path) -> dict[str, list[RolloutSample]]:
       {"id": "...", "samples": ["Final: 123", {"completion": "Final: 123", ...}, ...]}
     """
 
-    records = read_jsonl(path)
-    m: dict[str, list[RolloutSample]] = {}
-    for rec in records:
-        if "id" not in rec:
-            raise ValueError(f"Selection pack record missing 'id' in {path}: {rec!r}")
-        ex_id = str(rec["id"])
-        if ex_id in m:
-            raise ValueError(f"Duplicate selection-pack id {ex_id!r} in {path}")
-
-        samples_obj = rec.get("samples")
-        if not isinstance(samples_obj, list):
-            raise ValueError(
-                f"Selection pack record must include list 'samples'. id={ex_id!r} rec={rec!r}"
-            )
-
-        m[ex_id] = [coerce_sample(s) for s in samples_obj]
-    return m
+    return dict(iter_selection_pack(path))
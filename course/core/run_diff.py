@@ -0,0 +1,226 @@
+"""Diff two runs example by example: what flipped, and how.
+
+Both runs' `results.jsonl` are streamed and joined by id with the gate's
+`consume_join` (merge-join when both files are sorted by id, else a byte-offset
+index of the candidate), so memory never holds the rows. For each shared id
+we compare the pass bit, the outcome code and the completion text:
+
+- eval rows: `reward == 1.0`, the outcome code, `completion`
+- selection rows: the same fields of `best_of_n`; compact rows carry no text,
+  so when either side is compact the picked sample index is compared instead
+
+`flips.jsonl` gets one line per example whose pass bit or outcome code
+changed; the summary counts every transition, including code -> code pairs.
+`completion_changed` is counted for every paired row, but a row whose only
+change is the completion is not written to `flips.jsonl`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from course.core.gate import PairIter, consume_join
+from course.core.inspect import eval_outcome_code, infer_mode
+from course.core.io import (
+    atomic_write_text,
+    dump_jsonl_record,
+    iter_jsonl,
+    make_run_dir,
+    utc_now_iso,
+    write_json,
+    write_manifest,
+)
+
+_TABLE_KEYS = (
+    "both_pass",
+    "pass_to_fail",
+    "fail_to_pass",
+    "both_fail",
+    "only_baseline",
+    "only_candidate",
+    "code_changed",
+    "completion_changed",
+)
+
+
+def _results_mode(results_path: Path) -> str:
+    for rec in iter_jsonl(results_path):
+        return infer_mode(rec)
+    return "empty"
+
+
+def _view(rec: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """(reward, passed, outcome_code, completion[, index]) of one row, whatever the run type.
+
+    Selection views also carry the picked sample `index`; compact rows have
+    `completion` None.
+    """
+
+    if mode == "selection":
+        part = rec.get("best_of_n") or {}
+        view: Dict[str, Any] = {"completion": part.get("completion"), "index": part.get("index")}
+        code = str(part.get("outcome_code") or "unknown")
+    else:
+        part = rec
+        view = {"completion": rec.get("completion")}
+        code = eval_outcome_code(rec)
+    reward = float(part.get("reward", 0.0) or 0.0)
+    return {"reward": reward, "passed": reward == 1.0, "outcome_code": code, **view}
+
+
+def _completion_changed(b: Dict[str, Any], c: Dict[str, Any]) -> bool:
+    if "index" in b and (b["completion"] is None or c["completion"] is None):
+        return b["index"] != c["index"]  # a compact side has no text to compare
+    return b["completion"] != c["completion"]
+
+
+def _transition(b: Dict[str, Any], c: Dict[str, Any]) -> str:
+    if b["passed"]:
+        return "both_pass" if c["passed"] else "pass_to_fail"
+    return "fail_to_pass" if c["passed"] else "both_fail"
+
+
+def diff_runs(
+    baseline_dir: Path,
+    candidate_dir: Path,
+    flips_path: Path,
+) -> Dict[str, Any]:
+    """Stream the id-join of two runs, write flipped rows to `flips_path`, return counts."""
+
+    base_path = baseline_dir.expanduser().resolve() / "results.jsonl"
+    cand_path = candidate_dir.expanduser().resolve() / "results.jsonl"
+    for p in (base_path, cand_path):
+        if not p.exists():
+            raise FileNotFoundError(f"Run dir must contain results.jsonl: {p.parent}")
+
+    modes = {_results_mode(base_path), _results_mode(cand_path)} - {"empty"}
+    if len(modes) > 1:
+        raise ValueError(f"Cannot diff an eval run against a selection run (modes: {sorted(modes)})")
+    mode = modes.pop() if modes else "empty"
+    if mode == "unknown":
+        raise ValueError("Unrecognized results format (expected eval or selection rows)")
+
+    def _diff(pairs: PairIter) -> Dict[str, Any]:
+        # `consume_join` may restart with the indexed join, so (re)open for writing here.
+        table = dict.fromkeys(_TABLE_KEYS, 0)
+        code_transitions: Dict[Tuple[str, str], int] = {}
+        n_written = 0
+        tmp = flips_path.with_suffix(flips_path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as out:
+            for ex_id, b_rec, c_rec in pairs:
+                if c_rec is None:
+                    table["only_baseline"] += 1
+                    continue
+                if b_rec is None:
+                    table["only_candidate"] += 1
+                    continue
+                b, c = _view(b_rec, mode), _view(c_rec, mode)
+                kind = _transition(b, c)
+                table[kind] += 1
+                code_changed = b["outcome_code"] != c["outcome_code"]
+                if code_changed:
+                    table["code_changed"] += 1
+                    key = (b["outcome_code"], c["outcome_code"])
+                    code_transitions[key] = code_transitions.get(key, 0) + 1
+                completion_changed = _completion_changed(b, c)
+                table["completion_changed"] += int(completion_changed)
+                if kind in ("pass_to_fail", "fail_to_pass") or code_changed:
+                    n_written += 1
+                    out.write(
+                        dump_jsonl_record(
+                            {
+                                "id": ex_id,
+                                "transition": kind,
+                                "baseline": b,
+                                "candidate": c,
+                                "completion_changed": completion_changed,
+                            }
+                        )
+                    )
+        tmp.replace(flips_path)
+        return {"table": table, "code_transitions": code_transitions, "n_flips_written": n_written}
+
+    result, join = consume_join(base_path, cand_path, _diff)
+    table = result["table"]
+    transitions = sorted(result["code_transitions"].items(), key=lambda kv: (-kv[1], kv[0]))
+    n_paired = table["both_pass"] + table["pass_to_fail"] + table["fail_to_pass"] + table["both_fail"]
+    return {
+        "mode": mode,
+        "join": join,
+        "n_paired": n_paired,
+        "table": table,
+        "code_transitions": [{"from": a, "to": b, "count": n} for (a, b), n in transitions],
+        "flips": {
+            "path": str(flips_path),
+            "n_written": result["n_flips_written"],
+            "written_for": ["pass_to_fail", "fail_to_pass", "code_changed"],
+            "note": "completion_changed is counted for every paired row but not written on its own",
+        },
+    }
+
+
+def run_diff(
+    *,
+    baseline_dir: Path,
+    candidate_dir: Path,
+    out_dir: Optional[Path] = None,
+    top_k: int = 10,
+    argv: Optional[list[str]] = None,
+    args: Optional[Dict[str, Any]] = None,
+) -> Tuple[Path, Dict[str, Any]]:
+    """Write `flips.jsonl` + summary.json/md + manifest for a baseline vs candidate diff."""
+
+    if out_dir is None:
+        out_dir = make_run_dir(Path("runs"), prefix="run_diff")
+    else:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    created_utc = utc_now_iso()
+
+    diff = diff_runs(baseline_dir, candidate_dir, out_dir / "flips.jsonl")
+    summary: Dict[str, Any] = {
+        "run": {
+            "created_utc": created_utc,
+            "baseline_dir": str(baseline_dir),
+            "candidate_dir": str(candidate_dir),
+            "mode": diff["mode"],
+            "join": diff["join"],
+        },
+        **{k: diff[k] for k in ("n_paired", "table", "code_transitions", "flips")},
+    }
+    write_json(out_dir / "summary.json", summary)
+
+    table = diff["table"]
+    md = []
+    md.append("# Run diff\n\n")
+    md.append(f"- Created (UTC): `{created_utc}`\n")
+    md.append(f"- Baseline: `{baseline_dir}`\n")
+    md.append(f"- Candidate: `{candidate_dir}`\n")
+    md.append(f"- Mode: `{diff['mode']}` ({diff['join']} join, paired: `{diff['n_paired']}`)\n")
+    md.append("\n## Transitions\n\n")
+    md.append("| transition | count |\n|---|---:|\n")
+    for key in _TABLE_KEYS:
+        md.append(f"| {key} | {table[key]} |\n")
+    if diff["code_transitions"]:
+        md.append(f"\n## Outcome-code changes (top {top_k})\n\n")
+        md.append("| from | to | count |\n|---|---|---:|\n")
+        for t in diff["code_transitions"][:top_k]:
+            md.append(f"| {t['from']} | {t['to']} | {t['count']} |\n")
+    md.append("\n## Interpretation reminder\n")
+    md.append(
+        "Only compare runs under the same dataset and scorer (Locked Room Rule); the gate checks that, this diff does not.\n"
+        f"Flipped rows (pass bit or outcome code changed) are in `flips.jsonl` ({diff['flips']['n_written']} rows).\n"
+        "`completion_changed` is counted for every paired row; rows whose only change is the completion are not written.\n"
+    )
+    atomic_write_text(out_dir / "summary.md", "".join(md))
+
+    write_manifest(
+        out_dir,
+        created_utc=created_utc,
+        script="run_diff",
+        argv=argv or [],
+        args=args or {},
+        inputs=[baseline_dir / "results.jsonl", candidate_dir / "results.jsonl"],
+        extra={"mode": diff["mode"], "join": diff["join"], "table": table},
+    )
+    return out_dir, summary
@@ -0,0 +1,472 @@
+"""A SQLite catalog of every run dir under `runs/`.
+
+Listing runs by globbing and parsing each `manifest.json` / `summary.json`
+gets slow once `runs/` holds tens of thousands of entries. The catalog keeps
+one row per run dir with what queries need:
+
+- `runs`: run id, script, mode (eval / selection / other), created_utc,
+  dataset path + sha256, scorer name/version, n_examples, pass_rate, sampled
+- `run_inputs`: every manifest input (path, sha256, size)
+- `run_metrics`: every numeric field of `summary.json["metrics"]`
+- `run_outcomes`: outcome-code counts (eval runs)
+
+Updates are incremental: each row stores a fingerprint of the (size, mtime_ns)
+of the run's manifest.json, summary.json and results.jsonl, so a refresh only
+stats files and re-reads the runs that changed (summary and results are in the
+fingerprint as well as the manifest because `course.eval --follow` rewrites
+them after the manifest is written). Rows for deleted run dirs are dropped.
+
+Eval runs are indexed through `load_run_stats`, so `RunsCatalog.run_stats`
+returns exactly what the gate would compute from the files.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from course.core.gate import RunStats, load_run_stats
+from course.core.inspect import infer_mode
+from course.core.io import utc_now_iso
+
+CATALOG_SCHEMA_VERSION = 1
+DEFAULT_CATALOG_NAME = "_catalog.sqlite"
+
+_FINGERPRINT_FILES = ("manifest.json", "summary.json", "results.jsonl")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+    run_dir TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    script TEXT,
+    mode TEXT NOT NULL,
+    created_utc TEXT,
+    dataset_path TEXT,
+    dataset_sha256 TEXT,
+    scorer_name TEXT,
+    scorer_version TEXT,
+    n_examples INTEGER,
+    pass_rate REAL,
+    sampled INTEGER NOT NULL DEFAULT 0,
+    sampling_json TEXT NOT NULL DEFAULT '{}',
+    git_commit TEXT,
+    indexed_utc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_inputs (
+    run_dir TEXT NOT NULL REFERENCES runs(run_dir) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    path TEXT,
+    sha256 TEXT,
+    size_bytes INTEGER,
+    PRIMARY KEY (run_dir, position)
+);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_dir TEXT NOT NULL REFERENCES runs(run_dir) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_dir, key)
+);
+CREATE TABLE IF NOT EXISTS run_outcomes (
+    run_dir TEXT NOT NULL REFERENCES runs(run_dir) ON DELETE CASCADE,
+    code TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_dir, code)
+);
+CREATE INDEX IF NOT EXISTS runs_run_id ON runs(run_id);
+CREATE INDEX IF NOT EXISTS runs_dataset ON runs(dataset_sha256, scorer_name, scorer_version);
+CREATE INDEX IF NOT EXISTS runs_dataset_path ON runs(dataset_path);
+CREATE INDEX IF NOT EXISTS run_inputs_sha256 ON run_inputs(sha256);
+CREATE INDEX IF NOT EXISTS run_metrics_key ON run_metrics(key, value);
+"""
+
+# Columns that `query(sort=...)` accepts directly; anything else is a metric key.
+_SORT_COLUMNS = ("created_utc", "run_id", "n_examples", "pass_rate")
+
+
+def default_catalog_path(runs_root: Path) -> Path:
+    return runs_root / DEFAULT_CATALOG_NAME
+
+
+def run_fingerprint(run_dir: Path) -> Optional[str]:
+    """(size, mtime_ns) of the files a catalog row is built from; None if not a run dir."""
+
+    parts: list[str] = []
+    found = False
+    for name in _FINGERPRINT_FILES:
+        try:
+            st = os.stat(run_dir / name)
+        except FileNotFoundError:
+            parts.append("-")
+            continue
+        if name != "results.jsonl":
+            found = True
+        parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    return "|".join(parts) if found else None
+
+
+def iter_run_dirs(runs_root: Path) -> Iterator[Path]:
+    """Run dirs (a manifest.json or summary.json inside) under `runs_root`.
+
+    Directories starting with "_" or "." (caches, shard parts, the catalog's
+    own files) are not descended into.
+    """
+
+    stack = [runs_root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        names = {e.name for e in entries}
+        if d != runs_root and ("manifest.json" in names or "summary.json" in names):
+            yield Path(d)
+        stack.extend(
+            Path(e.path)
+            for e in reversed(entries)
+            if e.is_dir(follow_symlinks=False) and not e.name.startswith(("_", "."))
+        )
+
+
+def _read_json_or_empty(path: Path) -> Dict[str, Any]:
+    try:
+        obj = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def _results_mode(results_path: Path) -> Optional[str]:
+    try:
+        with results_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    return infer_mode(json.loads(line))
+    except (FileNotFoundError, ValueError):
+        return None
+    return None
+
+
+def _numeric_metrics(metrics: Any) -> Dict[str, float]:
+    if not isinstance(metrics, dict):
+        return {}
+    return {
+        str(k): float(v)
+        for k, v in metrics.items()
+        if isinstance(v, (int, float)) and not isinstance(v, bool)
+    }
+
+
+def index_run(run_dir: Path) -> Dict[str, Any]:
+    """Read one run dir into a catalog entry (row + inputs + metrics + outcomes)."""
+
+    manifest = _read_json_or_empty(run_dir / "manifest.json")
+    summary = _read_json_or_empty(run_dir / "summary.json")
+    run = summary.get("run") or {}
+    command = manifest.get("command") or {}
+    scorer = run.get("scorer") or manifest.get("scorer") or {}
+    inputs = [i for i in (manifest.get("inputs") or []) if isinstance(i, dict)]
+    sampling = summary.get("sampling") or (manifest.get("extra") or {}).get("sampling") or {}
+
+    results_path = run_dir / "results.jsonl"
+    mode = (_results_mode(results_path) if results_path.exists() else None) or "other"
+
+    row: Dict[str, Any] = {
+        "run_dir": str(run_dir),
+        "run_id": run_dir.name,
+        "script": command.get("script"),
+        "mode": mode,
+        "created_utc": run.get("created_utc") or manifest.get("created_utc"),
+        "dataset_path": run.get("dataset_path") or (command.get("args") or {}).get("dataset"),
+        "dataset_sha256": (inputs[0].get("sha256") if inputs else None),
+        "scorer_name": scorer.get("name"),
+        "scorer_version": scorer.get("version"),
+        "n_examples": run.get("n_examples"),
+        "pass_rate": None,
+        "sampled": bool(sampling.get("sampled")),
+        "sampling": sampling if sampling.get("sampled") else {},
+        "git_commit": (manifest.get("git") or {}).get("commit"),
+    }
+    metrics = _numeric_metrics(summary.get("metrics"))
+    outcomes: Dict[str, int] = {}
+
+    if mode == "eval" and (run_dir / "summary.json").exists():
+        stats = load_run_stats(run_dir)
+        row.update(
+            dataset_path=stats.dataset_path or row["dataset_path"],
+            dataset_sha256=stats.dataset_sha256 or row["dataset_sha256"],
+            scorer_name=stats.scorer_name,
+            scorer_version=stats.scorer_version,
+            n_examples=stats.n_examples,
+            pass_rate=stats.pass_rate,
+            sampled=stats.sampled,
+            sampling=stats.sampling,
+        )
+        metrics["pass_rate"] = stats.pass_rate
+        outcomes = dict(stats.outcome_counts)
+    elif "pass_rate" in metrics:
+        row["pass_rate"] = metrics["pass_rate"]
+
+    return {"row": row, "inputs": inputs, "metrics": metrics, "outcomes": outcomes}
+
+
+class RunsCatalog:
+    """The SQLite catalog for one runs root.
+
+    `refresh()` brings the whole catalog up to date; `run_stats()` refreshes
+    just the run it is asked about, so the gate never reads a stale row.
+    """
+
+    def __init__(self, db_path: Path, runs_root: Optional[Path] = None) -> None:
+        self.db_path = Path(db_path)
+        self.runs_root = Path(runs_root) if runs_root is not None else self.db_path.parent
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._init_schema()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunsCatalog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _init_schema(self) -> None:
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            cur = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'")
+            found = cur.fetchone()
+            if found is not None and int(found["value"]) != CATALOG_SCHEMA_VERSION:
+                # Older layout: drop it; the next refresh rebuilds from the run dirs.
+                for table in ("run_outcomes", "run_metrics", "run_inputs", "runs"):
+                    self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('schema_version', ?)",
+                (str(CATALOG_SCHEMA_VERSION),),
+            )
+
+    # -- updates -----------------------------------------------------------
+
+    def _upsert(self, entry: Dict[str, Any], fingerprint: str) -> None:
+        row = entry["row"]
+        run_dir = row["run_dir"]
+        self._conn.execute("DELETE FROM runs WHERE run_dir = ?", (run_dir,))
+        self._conn.execute(
+            "INSERT INTO runs (run_dir, run_id, fingerprint, script, mode, created_utc, dataset_path, "
+            "dataset_sha256, scorer_name, scorer_version, n_examples, pass_rate, sampled, sampling_json, "
+            "git_commit, indexed_utc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_dir,
+                row["run_id"],
+                fingerprint,
+                row["script"],
+                row["mode"],
+                row["created_utc"],
+                row["dataset_path"],
+                row["dataset_sha256"],
+                row["scorer_name"],
+                row["scorer_version"],
+                row["n_examples"],
+                row["pass_rate"],
+                int(bool(row["sampled"])),
+                json.dumps(row["sampling"], sort_keys=True),
+                row["git_commit"],
+                utc_now_iso(),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT INTO run_inputs (run_dir, position, path, sha256, size_bytes) VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_dir, i, inp.get("path"), inp.get("sha256"), inp.get("size_bytes"))
+                for i, inp in enumerate(entry["inputs"])
+            ],
+        )
+        self._conn.executemany(
+            "INSERT INTO run_metrics (run_dir, key, value) VALUES (?, ?, ?)",
+            [(run_dir, k, v) for k, v in entry["metrics"].items()],
+        )
+        self._conn.executemany(
+            "INSERT INTO run_outcomes (run_dir, code, count) VALUES (?, ?, ?)",
+            [(run_dir, c, n) for c, n in entry["outcomes"].items()],
+        )
+
+    def _stored_fingerprint(self, run_dir: Path) -> Optional[str]:
+        cur = self._conn.execute("SELECT fingerprint FROM runs WHERE run_dir = ?", (str(run_dir),))
+        found = cur.fetchone()
+        return None if found is None else str(found["fingerprint"])
+
+    def _sync_one(self, run_dir: Path) -> bool:
+        """Re-index `run_dir` if its files changed. Returns True if it was (re)indexed."""
+
+        fp = run_fingerprint(run_dir)
+        if fp is None:
+            self._conn.execute("DELETE FROM runs WHERE run_dir = ?", (str(run_dir),))
+            return False
+        if fp == self._stored_fingerprint(run_dir):
+            return False
+        self._upsert(index_run(run_dir), fp)
+        return True
+
+    def refresh(self) -> Dict[str, int]:
+        """Walk the runs root and re-index what changed. Returns counts."""
+
+        root = self.runs_root.expanduser().resolve()
+        stored = {
+            r["run_dir"]: r["fingerprint"] for r in self._conn.execute("SELECT run_dir, fingerprint FROM runs")
+        }
+        counts = {"n_runs": 0, "n_indexed": 0, "n_unchanged": 0, "n_removed": 0}
+        seen: set[str] = set()
+        with self._conn:
+            for run_dir in iter_run_dirs(root):
+                key = str(run_dir)
+                fp = run_fingerprint(run_dir)
+                if fp is None:
+                    continue
+                seen.add(key)
+                counts["n_runs"] += 1
+                if stored.get(key) == fp:
+                    counts["n_unchanged"] += 1
+                    continue
+                self._upsert(index_run(run_dir), fp)
+                counts["n_indexed"] += 1
+            gone = [d for d in stored if d not in seen and Path(d).is_relative_to(root)]
+            self._conn.executemany("DELETE FROM runs WHERE run_dir = ?", [(d,) for d in gone])
+            counts["n_removed"] = len(gone)
+        return counts
+
+    # -- reads -------------------------------------------------------------
+
+    def run_stats(self, run_dir: Path) -> RunStats:
+        """`load_run_stats(run_dir)`, served from the catalog (re-indexed if stale)."""
+
+        run_dir = run_dir.expanduser().resolve()
+        with self._conn:
+            self._sync_one(run_dir)
+        cur = self._conn.execute("SELECT * FROM runs WHERE run_dir = ?", (str(run_dir),))
+        row = cur.fetchone()
+        if row is None or row["mode"] != "eval" or not (run_dir / "summary.json").exists():
+            raise FileNotFoundError(f"Run dir must contain summary.json and results.jsonl: {run_dir}")
+        outcomes = {
+            r["code"]: int(r["count"])
+            for r in self._conn.execute(
+                "SELECT code, count FROM run_outcomes WHERE run_dir = ? ORDER BY count DESC, code", (str(run_dir),)
+            )
+        }
+        return RunStats(
+            run_dir=run_dir,
+            created_utc=row["created_utc"] or "",
+            dataset_path=row["dataset_path"] or "",
+            dataset_sha256=row["dataset_sha256"] or "",
+            scorer_name=row["scorer_name"] or "",
+            scorer_version=row["scorer_version"] or "",
+            n_examples=int(row["n_examples"] or 0),
+            pass_rate=float(row["pass_rate"] or 0.0),
+            outcome_counts=outcomes,
+            sampled=bool(row["sampled"]),
+            sampling=json.loads(row["sampling_json"]),
+        )
+
+    def find(self, run_id: str) -> list[Path]:
+        """Run dirs whose name is `run_id` (several if nested dirs share a name)."""
+
+        cur = self._conn.execute("SELECT run_dir FROM runs WHERE run_id = ? ORDER BY run_dir", (run_id,))
+        return [Path(r["run_dir"]) for r in cur]
+
+    def query(
+        self,
+        *,
+        dataset: Optional[str] = None,
+        scorer_name: Optional[str] = None,
+        scorer_version: Optional[str] = None,
+        script: Optional[str] = None,
+        mode: Optional[str] = None,
+        include_sampled: bool = True,
+        sort: str = "created_utc",
+        descending: bool = True,
+        limit: Optional[int] = None,
+    ) -> list[Dict[str, Any]]:
+        """Runs matching every given filter, sorted by a column or metric key.
+
+        `dataset` matches the dataset path or a prefix of its sha256. Runs with
+        no value for the sort key come last.
+        """
+
+        where: list[str] = []
+        params: list[Any] = []
+        if dataset is not None:
+            where.append("(r.dataset_path = ? OR r.dataset_sha256 LIKE ?)")
+            params += [dataset, f"{dataset}%"]
+        for col, val in (
+            ("scorer_name", scorer_name),
+            ("scorer_version", scorer_version),
+            ("script", script),
+            ("mode", mode),
+        ):
+            if val is not None:
+                where.append(f"r.{col} = ?")
+                params.append(val)
+        if not include_sampled:
+            where.append("r.sampled = 0")
+
+        if sort in _SORT_COLUMNS:
+            join, sort_expr = "", f"r.{sort}"
+        else:
+            join, sort_expr = "LEFT JOIN run_metrics m ON m.run_dir = r.run_dir AND m.key = ?", "m.value"
+            params.insert(0, sort)
+        sql = f"SELECT r.*, {sort_expr} AS sort_value FROM runs r {join}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY sort_value IS NULL, sort_value {'DESC' if descending else 'ASC'}, r.run_dir"
+        if limit is not None:
+            if limit < 0:
+                raise ValueError(f"limit must be >= 0 (got {limit})")
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        out: list[Dict[str, Any]] = []
+        for r in self._conn.execute(sql, params):
+            d = {k: r[k] for k in r.keys() if k not in ("fingerprint", "sampling_json")}
+            d["sampled"] = bool(d["sampled"])
+            out.append(d)
+        return out
+
+    def describe(self, run_dir: Path) -> Optional[Dict[str, Any]]:
+        """Everything the catalog holds for one run (row, inputs, metrics, outcomes)."""
+
+        key = str(run_dir.expanduser().resolve())
+        cur = self._conn.execute("SELECT * FROM runs WHERE run_dir = ?", (key,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        out = {k: row[k] for k in row.keys() if k != "sampling_json"}
+        out["sampled"] = bool(out["sampled"])
+        out["sampling"] = json.loads(row["sampling_json"])
+        out["inputs"] = [
+            dict(r)
+            for r in self._conn.execute(
+                "SELECT path, sha256, size_bytes FROM run_inputs WHERE run_dir = ? ORDER BY position", (key,)
+            )
+        ]
+        out["metrics"] = {
+            r["key"]: r["value"]
+            for r in self._conn.execute("SELECT key, value FROM run_metrics WHERE run_dir = ? ORDER BY key", (key,))
+        }
+        out["outcome_counts"] = {
+            r["code"]: int(r["count"])
+            for r in self._conn.execute(
+                "SELECT code, count FROM run_outcomes WHERE run_dir = ? ORDER BY count DESC, code", (key,)
+            )
+        }
+        return out
@@ -31,6 +31,9 @@ REWARD_SPEC = {
     "no_partial_credit": True,
 }
 
+# "exactly one line: 'Final: <int>'" -> "Final: "
+FINAL_PREFIX = REWARD_SPEC["format"].split("'")[1].split("<")[0]
+
 # Stable result codes for debugging / grouping.
 # These are deliberately small and stringly-typed for ease of use.
 PARSE_ERROR_CODES = {
@@ -113,7 +116,7 @@ def _parse_final_line(line: str) -> tuple[Optional[int], Dict[str, Any]]:
         "error_message": None,
     }
 
-    prefix = "Final: "
+    prefix = FINAL_PREFIX
     if not line.startswith(prefix):
         details["error_code"] = "missing_prefix"
         details["error_message"] = "Completion must start with exactly 'Final: '"
@@ -179,6 +182,35 @@ def _parse_final_line(line: str) -> tuple[Optional[int], Dict[str, Any]]:
     return value, details
 
 
+# -----------------------------------------------------------------------------
+# Cheap pre-checks (selection cascades)
+# -----------------------------------------------------------------------------
+
+
+def passes_cheap_checks(example: Union[Example, Mapping[str, Any]], completion: Any) -> bool:
+    """Necessary conditions for reward 1.0, far cheaper than a full `score`.
+
+    False means `score(example, completion)` is guaranteed to return reward 0.0,
+    so a selection cascade may skip the sample. True promises nothing. Checks:
+    a valid expected answer, exactly one line, the spec prefix, and the exact
+    length a correct answer must have (no signs/zeros/spaces to pad it).
+    If the reward contract changes, this must change with it.
+    """
+
+    _ex_id, _prompt, expected, _extra = _extract_example_fields(example)
+    if expected is None or completion is None:
+        return False
+    try:
+        normalized = str(completion).strip()
+    except Exception:  # defensive: let the full scorer explain it
+        return True
+    if len(normalized) != len(FINAL_PREFIX) + len(str(expected)):
+        return False
+    if len(normalized.splitlines()) != 1:
+        return False
+    return normalized.startswith(FINAL_PREFIX)
+
+
 # -----------------------------------------------------------------------------
 # Public scorer API (the course contract)
 # -----------------------------------------------------------------------------
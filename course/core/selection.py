@@ -1,12 +1,30 @@
 from __future__ import annotations
 
+import heapq
+import importlib
+import shutil
+from collections import Counter
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Sequence, Tuple
 
-from course.core.datasets import load_examples
-from course.core.io import atomic_write_text, make_run_dir, utc_now_iso, write_json, write_jsonl, write_manifest
-from course.core.rollouts import load_selection_pack
+from course.core.datasets import index_by_id, load_examples
+from course.core.io import (
+    atomic_write_text,
+    dump_jsonl_record,
+    ensure_dir,
+    make_run_dir,
+    split_byte_ranges,
+    utc_now_iso,
+    write_json,
+    write_jsonl,
+    write_manifest,
+)
+from course.core.rollouts import iter_selection_pack_range, iter_selection_pack_with_offsets
 from course.core.scoring import SCORER_NAME, SCORER_VERSION, score
+from course.core.stats import expected_samples_to_first_success, pass_at_k
 from course.core.types import Example, RolloutSample
 
 
@@ -26,135 +44,692 @@ def _as_selection_triplet(obj: Any) -> Tuple[int, RolloutSample, Dict[str, Any]]
 
 
 SelectionPolicyFn = Callable[[Example, list[RolloutSample]], Any]
+PrefilterFn = Callable[[Example, str], bool]
+VerifierFn = Callable[[Example, str], bool]
 
 
-def selection_demo(
+def load_policy(spec: str) -> Callable[..., Any]:
+    """Import a selection policy from a "package.module:function" spec.
+
+    Scripts pass the policy as a spec (rather than a function object) when the
+    work happens in other processes, so student policies keep working there.
+    """
+
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Policy spec must look like 'package.module:function', got {spec!r}")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr)
+
+
+@dataclass(frozen=True, slots=True)
+class LazyPolicy:
+    """What a policy must declare to be selected lazily.
+
+    - `tie_break_key`: the key pick_best sorts ties by (ascending, then index)
+    - `max_reward`: the best reward the scorer can return; once a sample reaches
+      it, no later sample in tie-break order can win
+    """
+
+    tie_break_key: Callable[[RolloutSample], Any]
+    max_reward: float = 1.0
+
+    @staticmethod
+    def from_module(module: Any) -> "LazyPolicy":
+        """Build from a policy module exposing `tie_break_key` and `MAX_REWARD`."""
+        if not hasattr(module, "tie_break_key") or not hasattr(module, "MAX_REWARD"):
+            raise ValueError(f"{module.__name__} must define tie_break_key and MAX_REWARD for lazy selection")
+        return LazyPolicy(tie_break_key=module.tie_break_key, max_reward=float(module.MAX_REWARD))
+
+
+def lazy_pick_best(
+    example: Example,
+    samples: list[RolloutSample],
     *,
-    dataset_path: Path,
-    samples_path: Path,
-    pick_best: Callable[..., Any],
-    out_dir: Path,
-    n: Optional[int] = None,
-    max_examples: Optional[int] = None,
-) -> Dict[str, Any]:
-    """Loop B: Best-of-N selection using the deterministic verifier."""
+    policy: LazyPolicy,
+    scorer: Callable[..., Dict[str, Any]] = score,
+    prefilter: Optional[PrefilterFn] = None,
+) -> Tuple[int, RolloutSample, Dict[str, Any]]:
+    """Best-of-N that scores samples in tie-break order and stops early.
 
-    created_utc = utc_now_iso()
+    Returns exactly what a pick_best that sorts by (-reward, tie_break_key, index)
+    returns: the first sample (in that order) to reach `policy.max_reward` wins
+    outright; if none does, every sample is scored and the usual ranking applies.
+    Any other ranking needs its own eager pick_best (see `policy_pick_best`).
 
-    examples = load_examples(dataset_path)
-    if max_examples is not None:
-        examples = examples[:max_examples]
+    With a `prefilter` (see `course.core.scoring.passes_cheap_checks`) this is a
+    verifier cascade: samples it rejects are known to score 0.0 and are never
+    passed to `scorer`, unless one of them ends up being the pick.
+    """
+
+    if not samples:
+        empty = RolloutSample(completion="")
+        return 0, empty, scorer(example, empty.completion)
+
+    order = sorted(range(len(samples)), key=lambda i: (policy.tie_break_key(samples[i]), i))
+    best: Optional[Tuple[float, int, Optional[Dict[str, Any]]]] = None
+    for i in order:
+        if prefilter is not None and not prefilter(example, samples[i].completion):
+            r, out = 0.0, None
+        else:
+            out = scorer(example, samples[i].completion)
+            r = float(out.get("reward", 0.0))
+            if r >= policy.max_reward:
+                return i, samples[i], out
+        # Strictly greater: an earlier sample in tie-break order keeps equal rewards.
+        if best is None or r > best[0]:
+            best = (r, i, out)
+
+    assert best is not None
+    _r, best_i, best_out = best
+    if best_out is None:
+        best_out = scorer(example, samples[best_i].completion)
+    return best_i, samples[best_i], best_out
+
+
+@dataclass(frozen=True, slots=True)
+class LazyPickBest:
+    """`lazy_pick_best` with the pick_best(example, samples, *, scorer) signature.
+
+    A dataclass rather than a closure so it pickles (by reference to the policy
+    module's functions) into `selection_demo(workers=...)` processes.
+    """
+
+    policy: LazyPolicy
+    prefilter: Optional[PrefilterFn] = None
+
+    def __call__(self, example: Example, samples: list[RolloutSample], *, scorer: Callable[..., Any] = score) -> Any:
+        return lazy_pick_best(example, samples, policy=self.policy, scorer=scorer, prefilter=self.prefilter)
+
+
+def make_lazy_pick_best(policy: LazyPolicy, *, prefilter: Optional[PrefilterFn] = None) -> Callable[..., Any]:
+    """Adapt `lazy_pick_best` to the pick_best(example, samples, *, scorer) signature."""
+
+    return LazyPickBest(policy=policy, prefilter=prefilter)
+
+
+def policy_pick_best(module: Any, *, lazy: bool = False, prefilter: Optional[PrefilterFn] = None) -> Callable[..., Any]:
+    """The pick_best to run for a policy module: lazy/cascaded when that is safe.
+
+    `lazy_pick_best` reproduces the reference ranking (-reward, tie_break_key,
+    index), so it only stands in for modules that declare `REFERENCE_RANKING =
+    True`. Any other module's own `pick_best` is returned unchanged (eager), so
+    a custom ranking is never bypassed.
+    """
+
+    if not (lazy or prefilter is not None) or not getattr(module, "REFERENCE_RANKING", False):
+        return module.pick_best
+    return make_lazy_pick_best(LazyPolicy.from_module(module), prefilter=prefilter)
 
-    samples_map = load_selection_pack(samples_path)
 
-    rows: list[Dict[str, Any]] = []
-    pass1 = 0
-    passN = 0
-    missing = 0
-    rescued = 0
+VERIFIER_REJECTED_CODE = "verifier_rejected"
 
-    for ex in examples:
-        samples = samples_map.get(ex.id)
-        if not samples:
-            missing += 1
+
+def with_verifiers(scorer: Callable[..., Dict[str, Any]], verifiers: Sequence[VerifierFn]) -> Callable[..., Dict[str, Any]]:
+    """Chain expensive custom verifiers behind `scorer`.
+
+    A verifier is `fn(example, completion) -> bool` and only runs when the
+    scorer already gave a positive reward; the first one to return False turns
+    the result into reward 0.0 with outcome code `verifier_rejected`. Used as the
+    selection scorer, a lazy/cascaded pick_best only reaches the verifiers for
+    the top candidates, while an eager pick_best runs them on every passing sample
+    and picks the same one (for reference-ranking policies; see `policy_pick_best`).
+    """
+
+    if not verifiers:
+        return scorer
+
+    def verified(example: Any, completion: Any) -> Dict[str, Any]:
+        out = scorer(example, completion)
+        if float(out.get("reward", 0.0)) <= 0.0:
+            return out
+        for fn in verifiers:
+            if not fn(example, completion):
+                name = getattr(fn, "__qualname__", repr(fn))
+                details = dict(out.get("details") or {})
+                details["result"] = {"code": VERIFIER_REJECTED_CODE, "message": f"rejected by verifier {name}"}
+                return {"reward": 0.0, "details": details}
+        return out
+
+    return verified
+
+
+def _outcome_code_of(scored: Dict[str, Any]) -> str:
+    outcome = (scored.get("details") or {}).get("result") or {}
+    return str(outcome.get("code") or "unknown")
+
+
+def _sample_brief(s: RolloutSample) -> Dict[str, Any]:
+    return {
+        "completion": s.completion,
+        "sum_logprob": s.sum_logprob,
+        "sum_ref_logprob": s.sum_ref_logprob,
+        "kl_est": s.kl_estimate(),
+    }
+
+
+def pass_at_k_curve(correct_hist: Mapping[Tuple[int, int], int]) -> Dict[str, Any]:
+    """pass@k for every k from a histogram {(n_samples, n_correct): n_examples}.
+
+    Uses the unbiased estimator per example; for each k only examples with at
+    least k samples contribute. Also reports expected samples-to-first-success
+    over solvable examples, and a compute-vs-accuracy view (samples spent per
+    example vs pass@k, with the marginal gain of each extra sample).
+    """
+
+    if not correct_hist:
+        return {"curve": [], "n_examples": 0}
+    max_n = max(n for n, _c in correct_hist)
+
+    curve: list[Dict[str, Any]] = []
+    prev: Optional[float] = None
+    for k in range(1, max_n + 1):
+        total = 0.0
+        n_used = 0
+        for (n, c), cnt in correct_hist.items():
+            if n >= k:
+                total += cnt * pass_at_k(n, c, k)
+                n_used += cnt
+        value = total / n_used if n_used else 0.0
+        curve.append(
+            {
+                "k": k,
+                "pass_at_k": value,
+                "n_examples": n_used,
+                "samples_spent": k * n_used,
+                "marginal_gain": None if prev is None else value - prev,
+            }
+        )
+        prev = value
+
+    first_total = 0.0
+    n_solvable = 0
+    n_unsolved = 0
+    for (n, c), cnt in correct_hist.items():
+        e = expected_samples_to_first_success(n, c)
+        if e is None:
+            n_unsolved += cnt
+        else:
+            first_total += cnt * e
+            n_solvable += cnt
+
+    return {
+        "curve": curve,
+        "n_examples": sum(correct_hist.values()),
+        "n_unsolved": n_unsolved,
+        "expected_samples_to_first_success": (first_total / n_solvable) if n_solvable else None,
+    }
+
+
+class SelectionAccumulator:
+    """Running aggregates for Loop B (one example at a time).
+
+    With `pass_at_k=True` every sample is scored once (memoized, so the policy
+    does not pay again) and only a {(n_samples, n_correct): count} histogram is
+    kept; `pass_at_k_curve` turns it into pass@k for every k at the end.
+
+    With `compact=True` rows carry no completion text: per-sample rewards,
+    outcome codes and KL estimates are stored as arrays (None for samples the
+    policy never scored), and the completions are referenced by the byte offset
+    of the example's record in the pack (`pack_offset`; the pack path is the
+    run's `samples_path`). `course.core.inspect.rehydrate_selection_row` brings
+    the text back for the rows that are actually displayed.
+    """
+
+    def __init__(
+        self,
+        *,
+        scorer: Callable[..., Dict[str, Any]] = score,
+        pass_at_k: bool = False,
+        compact: bool = False,
+    ) -> None:
+        self.scorer = scorer
+        self.compact = compact
+        self.n = 0
+        self.pass1 = 0
+        self.passN = 0
+        self.missing = 0
+        self.rescued = 0
+        self.n_scorer_calls = 0
+        self.correct_hist: Optional[Counter[Tuple[int, int]]] = Counter() if pass_at_k else None
+
+    def add(
+        self,
+        ex: Example,
+        samples: Optional[list[RolloutSample]],
+        *,
+        pick_best: Callable[..., Any],
+        n: Optional[int] = None,
+        pack_offset: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Run baseline + best-of-N for one example and return its results row."""
+
+        missing = not samples
+        if missing:
+            self.missing += 1
             samples = [RolloutSample(completion="")]  # fail safe
 
         if n is not None:
             samples = samples[:n]
 
+        # Per-example memo: baseline, pass@k counting and the policy share scores,
+        # and n_scorer_calls counts only real scorer invocations.
+        memo: Dict[str, Dict[str, Any]] = {}
+
+        def scorer(example: Any, completion: Any) -> Dict[str, Any]:
+            key = "" if completion is None else str(completion)
+            if key not in memo:
+                self.n_scorer_calls += 1
+                memo[key] = self.scorer(example, completion)
+            return memo[key]
+
+        n_correct: Optional[int] = None
+        if self.correct_hist is not None:
+            n_correct = sum(1 for s in samples if float(scorer(ex, s.completion).get("reward", 0.0)) == 1.0)
+            self.correct_hist[(len(samples), n_correct)] += 1
+
         # Baseline: take first sample.
         baseline_sample = samples[0] if samples else RolloutSample(completion="")
-        baseline_scored = score(ex, baseline_sample.completion)
+        baseline_scored = scorer(ex, baseline_sample.completion)
         baseline_reward = float(baseline_scored.get("reward", 0.0))
         baseline_outcome = (baseline_scored.get("details") or {}).get("result") or {}
         baseline_code = str(baseline_outcome.get("code") or "unknown")
         if baseline_reward == 1.0:
-            pass1 += 1
+            self.pass1 += 1
 
         # Best-of-N selection.
-        pick_obj = pick_best(ex, samples, scorer=score)
+        pick_obj = pick_best(ex, samples, scorer=scorer)
         best_idx, best_sample, best_scored = _as_selection_triplet(pick_obj)
         best_reward = float(best_scored.get("reward", 0.0))
         best_outcome = (best_scored.get("details") or {}).get("result") or {}
         best_code = str(best_outcome.get("code") or "unknown")
         if best_reward == 1.0:
-            passN += 1
+            self.passN += 1
 
         if baseline_reward == 0.0 and best_reward == 1.0:
-            rescued += 1
-
-        def _sample_brief(s: RolloutSample) -> Dict[str, Any]:
-            return {
-                "completion": s.completion,
-                "sum_logprob": s.sum_logprob,
-                "sum_ref_logprob": s.sum_ref_logprob,
-                "kl_est": s.kl_estimate(),
-            }
+            self.rescued += 1
 
-        rows.append(
-            {
+        self.n += 1
+        if self.compact:
+            scored_rows = [memo.get(s.completion) for s in samples]
+            row = {
                 "id": ex.id,
-                "prompt": ex.prompt,
                 "expected_answer": ex.expected_answer,
                 "n_samples_used": len(samples),
-                "baseline": {
-                    "index": 0,
-                    "completion": baseline_sample.completion,
-                    "reward": baseline_reward,
-                    "outcome_code": baseline_code,
-                },
-                "best_of_n": {
-                    "index": best_idx,
-                    "completion": best_sample.completion,
-                    "reward": best_reward,
-                    "outcome_code": best_code,
+                "pack_offset": pack_offset,
+                "baseline": {"index": 0, "reward": baseline_reward, "outcome_code": baseline_code},
+                "best_of_n": {"index": best_idx, "reward": best_reward, "outcome_code": best_code},
+                "samples": {
+                    "reward": [None if o is None else float(o.get("reward", 0.0)) for o in scored_rows],
+                    "outcome_code": [None if o is None else _outcome_code_of(o) for o in scored_rows],
+                    "kl_est": [s.kl_estimate() for s in samples],
                 },
-                "all_samples": [_sample_brief(s) for s in samples],
             }
-        )
+            if n_correct is not None:
+                row["n_correct"] = n_correct
+            if missing:
+                row["missing_samples"] = True
+            return row
 
-    n_ex = len(examples)
-    summary: Dict[str, Any] = {
-        "run": {
-            "created_utc": created_utc,
-            "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
-            "dataset_path": str(dataset_path),
-            "samples_path": str(samples_path),
-            "n_examples": n_ex,
-            "n_missing_samples": missing,
-            "n": n,
-        },
-        "metrics": {
-            "pass_at_1": pass1 / n_ex if n_ex else 0.0,
-            "pass_at_n": passN / n_ex if n_ex else 0.0,
-            "delta": (passN - pass1) / n_ex if n_ex else 0.0,
-            "n_pass_at_1": pass1,
-            "n_pass_at_n": passN,
-            "rescued": rescued,
-        },
-    }
+        row: Dict[str, Any] = {
+            "id": ex.id,
+            "prompt": ex.prompt,
+            "expected_answer": ex.expected_answer,
+            "n_samples_used": len(samples),
+            "baseline": {
+                "index": 0,
+                "completion": baseline_sample.completion,
+                "reward": baseline_reward,
+                "outcome_code": baseline_code,
+            },
+            "best_of_n": {
+                "index": best_idx,
+                "completion": best_sample.completion,
+                "reward": best_reward,
+                "outcome_code": best_code,
+            },
+            "all_samples": [_sample_brief(s) for s in samples],
+        }
+        if n_correct is not None:
+            row["n_correct"] = n_correct
+        if missing:
+            # The fail-safe sample above is not real: flag the row so rescoring can tell.
+            row["missing_samples"] = True
+        return row
 
-    write_jsonl(out_dir / "results.jsonl", rows)
-    write_json(out_dir / "summary.json", summary)
+    _COUNTERS = ("n", "pass1", "passN", "missing", "rescued", "n_scorer_calls")
+
+    def counts(self) -> Dict[str, Any]:
+        """Plain-data snapshot of the aggregates (sent back from worker processes)."""
+        out: Dict[str, Any] = {name: getattr(self, name) for name in self._COUNTERS}
+        out["correct_hist"] = None if self.correct_hist is None else list(self.correct_hist.items())
+        return out
+
+    def merge_counts(self, counts: Dict[str, Any]) -> None:
+        """Fold in another accumulator's `counts()` (e.g. one shard of the pack)."""
+        for name in self._COUNTERS:
+            setattr(self, name, getattr(self, name) + counts[name])
+        if self.correct_hist is not None and counts.get("correct_hist"):
+            for (n_samples, n_correct), cnt in counts["correct_hist"]:
+                self.correct_hist[(n_samples, n_correct)] += cnt
+
+    def summary(self, *, created_utc: str, dataset_path: Path, samples_path: Any, n: Optional[int]) -> Dict[str, Any]:
+        n_ex = self.n
+        summary: Dict[str, Any] = {
+            "run": {
+                "created_utc": created_utc,
+                "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
+                "dataset_path": str(dataset_path),
+                "samples_path": str(samples_path),
+                "n_examples": n_ex,
+                "n_missing_samples": self.missing,
+                "n": n,
+                "results_format": "compact" if self.compact else "full",
+            },
+            "metrics": {
+                "pass_at_1": self.pass1 / n_ex if n_ex else 0.0,
+                "pass_at_n": self.passN / n_ex if n_ex else 0.0,
+                "delta": (self.passN - self.pass1) / n_ex if n_ex else 0.0,
+                "n_pass_at_1": self.pass1,
+                "n_pass_at_n": self.passN,
+                "rescued": self.rescued,
+                "n_scorer_calls": self.n_scorer_calls,
+            },
+        }
+        if self.correct_hist is not None:
+            summary["pass_at_k"] = pass_at_k_curve(self.correct_hist)
+        return summary
+
+
+def render_selection_md(summary: Dict[str, Any]) -> str:
+    run = summary["run"]
+    metrics = summary["metrics"]
 
     md = []
     md.append("# Selection demo (Best-of-N)\n\n")
-    md.append(f"- Created (UTC): `{created_utc}`\n")
+    md.append(f"- Created (UTC): `{run['created_utc']}`\n")
     md.append(f"- Scorer: `{SCORER_NAME}` v`{SCORER_VERSION}`\n")
-    md.append(f"- Dataset: `{dataset_path}`\n")
-    md.append(f"- Samples: `{samples_path}`\n")
-    md.append(f"- n_samples_used (cap): `{n}`\n")
+    md.append(f"- Dataset: `{run['dataset_path']}`\n")
+    md.append(f"- Samples: `{run['samples_path']}`\n")
+    md.append(f"- n_samples_used (cap): `{run['n']}`\n")
+    if run.get("verifiers"):
+        md.append(f"- extra verifiers: `{', '.join(run['verifiers'])}`\n")
     md.append("\n## Metrics\n")
-    md.append(f"- pass@1: **{summary['metrics']['pass_at_1']:.3f}**\n")
-    md.append(f"- pass@N: **{summary['metrics']['pass_at_n']:.3f}**\n")
-    md.append(f"- delta: **{summary['metrics']['delta']:.3f}**\n")
-    md.append(f"- rescued: `{summary['metrics']['rescued']}`\n")
+    md.append(f"- pass@1: **{metrics['pass_at_1']:.3f}**\n")
+    md.append(f"- pass@N: **{metrics['pass_at_n']:.3f}**\n")
+    md.append(f"- delta: **{metrics['delta']:.3f}**\n")
+    md.append(f"- rescued: `{metrics['rescued']}`\n")
+    if "n_scorer_calls" in metrics:
+        md.append(f"- scorer calls: `{metrics['n_scorer_calls']}`\n")
+    pak = summary.get("pass_at_k")
+    if pak and pak["curve"]:
+        md.append("\n## pass@k (unbiased estimator, all k from one pass)\n\n")
+        first = pak.get("expected_samples_to_first_success")
+        first_s = "n/a" if first is None else f"{first:.2f}"
+        md.append(f"- expected samples to first success (solvable examples): `{first_s}`\n")
+        md.append(f"- unsolved at N (no correct sample): `{pak['n_unsolved']}` / `{pak['n_examples']}`\n\n")
+        md.append("| k | pass@k | samples spent | marginal gain |\n")
+        md.append("|---:|---:|---:|---:|\n")
+        for row in pak["curve"]:
+            gain = "-" if row["marginal_gain"] is None else f"{row['marginal_gain']:+.3f}"
+            md.append(f"| {row['k']} | {row['pass_at_k']:.3f} | {row['samples_spent']} | {gain} |\n")
+
     md.append("\n## Interpretation reminder\n")
     md.append(
         "Best-of-N improves the *chosen output* by spending more sampling compute.\n"
         "It does **not** change the underlying model distribution.\n"
     )
-    atomic_write_text(out_dir / "summary.md", "".join(md))
+    return "".join(md)
+
+
+def _sort_part(part_path: Path, positions: list[int]) -> list[int]:
+    """Rewrite a part file so its rows follow dataset order; returns the sorted positions.
+
+    `positions[i]` is the dataset index of the part's i-th row. A part whose
+    pack records were already in dataset order is left untouched.
+    """
+
+    if all(a < b for a, b in zip(positions, positions[1:])):
+        return positions
+    offsets: list[int] = []
+    with part_path.open("rb") as f:
+        offset = 0
+        for line in f:
+            offsets.append(offset)
+            offset += len(line)
+    order = sorted(range(len(positions)), key=positions.__getitem__)
+    tmp = part_path.with_suffix(part_path.suffix + ".sorted")
+    with part_path.open("rb") as src, tmp.open("wb") as out:
+        for i in order:
+            src.seek(offsets[i])
+            out.write(src.readline())
+    tmp.replace(part_path)
+    return [positions[i] for i in order]
+
+
+def _merge_parts_in_dataset_order(
+    results_path: Path,
+    parts: Sequence[Tuple[Path, list[int]]],
+    examples: Sequence[Example],
+    missing_row: Callable[[Example], Dict[str, Any]],
+) -> None:
+    """k-way merge of sorted part files into results.jsonl, one row per dataset example.
+
+    Examples that no part covers (no pack record) get `missing_row(ex)` at their
+    own position, so results.jsonl follows the dataset whatever the pack order.
+    """
+
+    with ExitStack() as stack, results_path.open("wb") as out:
+        merged = heapq.merge(
+            *(zip(positions, stack.enter_context(path.open("rb"))) for path, positions in parts),
+            key=lambda item: item[0],
+        )
+        nxt = next(merged, None)
+        for pos, ex in enumerate(examples):
+            if nxt is not None and nxt[0] == pos:
+                out.write(nxt[1])
+                nxt = next(merged, None)
+            else:
+                out.write(dump_jsonl_record(missing_row(ex)).encode("utf-8"))
+
+
+# Per-process state for `_selection_shard_worker`, set once by `_init_selection_worker`.
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_selection_worker(dataset_path: Path, max_examples: Optional[int], verifiers: Sequence[str]) -> None:
+    """Pool initializer: load the dataset and verifiers once per worker process."""
+
+    examples = load_examples(dataset_path)
+    if max_examples is not None:
+        examples = examples[:max_examples]
+    ex_by_id = index_by_id(examples)
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(
+        ex_by_id=ex_by_id,
+        position={ex_id: i for i, ex_id in enumerate(ex_by_id)},
+        scorer=with_verifiers(score, [load_policy(spec) for spec in verifiers]),
+    )
+
+
+def _selection_shard_worker(job: Dict[str, Any]) -> Tuple[Dict[str, Any], list[int]]:
+    """Run Loop B over one byte range of the pack into a part file.
+
+    Returns the shard's accumulator counts and the dataset positions of its
+    rows; the part file is sorted into dataset order before returning.
+    The dataset comes from `_init_selection_worker`, not from the job.
+    `job["pick_best"]` arrives pickled by reference, so the policy is imported
+    by module path here, exactly like the parent process does.
+    """
+
+    ex_by_id = _WORKER_STATE["ex_by_id"]
+    position = _WORKER_STATE["position"]
+    scorer = _WORKER_STATE["scorer"]
+    acc = SelectionAccumulator(scorer=scorer, pass_at_k=job["pass_at_k"], compact=job["compact"])
+    positions: list[int] = []
+    n = job["n"]
+
+    def _rows() -> Iterator[Dict[str, Any]]:
+        for offset, ex_id, samples in iter_selection_pack_range(
+            job["samples_path"], job["start"], job["end"], max_samples=n
+        ):
+            ex = ex_by_id.get(ex_id)
+            if ex is None:
+                continue
+            positions.append(position[ex_id])
+            yield acc.add(ex, samples, pick_best=job["pick_best"], n=n, pack_offset=offset)
+
+    write_jsonl(job["part_path"], _rows())
+    return acc.counts(), _sort_part(job["part_path"], positions)
+
+
+def _select_sharded(
+    *,
+    dataset_path: Path,
+    samples_path: Path,
+    examples: Sequence[Example],
+    pick_best: Callable[..., Any],
+    results_path: Path,
+    acc: SelectionAccumulator,
+    workers: int,
+    n: Optional[int],
+    max_examples: Optional[int],
+    pass_at_k: bool,
+    compact: bool,
+    verifiers: Sequence[str],
+) -> None:
+    """Write results.jsonl with the pack's rows computed by `workers` processes.
+
+    Shards are contiguous byte ranges of the pack; each sorts its part file
+    into dataset order and the parts are k-way merged (missing examples filled
+    in at their positions), so results.jsonl is byte-identical to the serial run.
+    """
+
+    parts_dir = ensure_dir(results_path.parent / "_parts")
+    jobs = [
+        {
+            "samples_path": samples_path,
+            "start": start,
+            "end": end,
+            "pick_best": pick_best,
+            "n": n,
+            "pass_at_k": pass_at_k,
+            "compact": compact,
+            "part_path": parts_dir / f"part-{i:05d}.jsonl",
+        }
+        for i, (start, end) in enumerate(split_byte_ranges(samples_path, workers * 4))
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_selection_worker,
+        initargs=(dataset_path, max_examples, list(verifiers)),
+    ) as pool:
+        shard_results = list(pool.map(_selection_shard_worker, jobs))
+
+    seen: set[int] = set()
+    for counts, positions in shard_results:
+        for pos in positions:
+            # Shards only check duplicates locally; the serial loader checks the whole pack.
+            if pos in seen:
+                raise ValueError(f"Duplicate selection-pack id {examples[pos].id!r} in {samples_path}")
+            seen.add(pos)
+        acc.merge_counts(counts)
+    _merge_parts_in_dataset_order(
+        results_path,
+        [(Path(job["part_path"]), positions) for job, (_, positions) in zip(jobs, shard_results)],
+        examples,
+        lambda ex: acc.add(ex, None, pick_best=pick_best, n=n),
+    )
+    shutil.rmtree(parts_dir)
+
+
+def selection_demo(
+    *,
+    dataset_path: Path,
+    samples_path: Path,
+    pick_best: Callable[..., Any],
+    out_dir: Path,
+    n: Optional[int] = None,
+    max_examples: Optional[int] = None,
+    pass_at_k: bool = False,
+    compact: bool = False,
+    verifiers: Sequence[str] = (),
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """Loop B: Best-of-N selection using the deterministic verifier.
+
+    The pack is streamed one example at a time and joined against the dataset
+    index, and each row is written as soon as it is selected, so memory does not
+    grow with (examples x N). Rows are buffered in a part file and written to
+    results.jsonl in dataset order, whatever the pack order; examples that have
+    no pack record appear at their own position as missing.
+
+    `pass_at_k=True` also reports unbiased pass@k for every k in 1..N (see
+    `pass_at_k_curve`) from this single pass. `compact=True` writes rows that
+    reference the pack by byte offset instead of copying completions.
+    `verifiers` are "module:function" specs chained behind the scorer (see
+    `with_verifiers`) for baseline, pick_best and pass@k alike.
+
+    `workers > 1` splits the pack across processes (see `_select_sharded`);
+    rows and metrics are identical to `workers=1`. `pick_best` must then be
+    picklable: a module-level function or a `LazyPickBest`.
+    """
+
+    created_utc = utc_now_iso()
+
+    examples = load_examples(dataset_path)
+    if max_examples is not None:
+        examples = examples[:max_examples]
+    ex_by_id = index_by_id(examples)
+
+    scorer = with_verifiers(score, [load_policy(spec) for spec in verifiers])
+    acc = SelectionAccumulator(scorer=scorer, pass_at_k=pass_at_k, compact=compact)
+    results_path = out_dir / "results.jsonl"
+
+    if workers > 1:
+        ensure_dir(out_dir)
+        _select_sharded(
+            dataset_path=dataset_path,
+            samples_path=samples_path,
+            examples=examples,
+            pick_best=pick_best,
+            results_path=results_path,
+            acc=acc,
+            workers=workers,
+            n=n,
+            max_examples=max_examples,
+            pass_at_k=pass_at_k,
+            compact=compact,
+            verifiers=verifiers,
+        )
+    else:
+        position = {ex_id: i for i, ex_id in enumerate(ex_by_id)}
+        positions: list[int] = []
+
+        def _rows() -> Iterator[Dict[str, Any]]:
+            for offset, ex_id, samples in iter_selection_pack_with_offsets(samples_path, max_samples=n):
+                ex = ex_by_id.get(ex_id)
+                if ex is None:
+                    continue
+                positions.append(position[ex_id])
+                yield acc.add(ex, samples, pick_best=pick_best, n=n, pack_offset=offset)
+
+        part_path = results_path.with_name(results_path.name + ".part")
+        write_jsonl(part_path, _rows())
+        positions = _sort_part(part_path, positions)
+        _merge_parts_in_dataset_order(
+            results_path,
+            [(part_path, positions)],
+            examples,
+            lambda ex: acc.add(ex, None, pick_best=pick_best, n=n),
+        )
+        part_path.unlink()
+
+    summary = acc.summary(created_utc=created_utc, dataset_path=dataset_path, samples_path=samples_path, n=n)
+    if verifiers:
+        summary["run"]["verifiers"] = list(verifiers)
+    write_json(out_dir / "summary.json", summary)
+    atomic_write_text(out_dir / "summary.md", render_selection_md(summary))
 
     return summary
 
@@ -167,6 +742,10 @@ def run_selection_demo(
     out_dir: Optional[Path] = None,
     n: Optional[int] = None,
     max_examples: Optional[int] = None,
+    pass_at_k: bool = False,
+    compact: bool = False,
+    verifiers: Sequence[str] = (),
+    workers: int = 1,
     argv: Optional[list[str]] = None,
     args: Optional[Dict[str, Any]] = None,
 ) -> tuple[Path, Dict[str, Any]]:
@@ -180,11 +759,18 @@ def run_selection_demo(
         out_dir=out_dir,
         n=n,
         max_examples=max_examples,
+        pass_at_k=pass_at_k,
+        compact=compact,
+        verifiers=verifiers,
+        workers=workers,
     )
 
     if argv is not None or args is not None:
         created = summary.get("run", {}).get("created_utc") or utc_now_iso()
         n_missing = summary.get("run", {}).get("n_missing_samples", 0)
+        extra: Dict[str, Any] = {"n": n, "n_missing_samples": n_missing}
+        if verifiers:
+            extra["verifiers"] = list(verifiers)
         write_manifest(
             out_dir,
             created_utc=created,
@@ -193,7 +779,7 @@ def run_selection_demo(
             args=args,
             inputs=[dataset_path, samples_path],
             scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
-            extra={"n": n, "n_missing_samples": n_missing},
+            extra=extra,
         )
 
     return out_dir, summary
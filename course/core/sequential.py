@@ -0,0 +1,235 @@
+"""Sequential gate: stop scoring a candidate once the decision is settled.
+
+The candidate's completions are scored in a hash-seeded random order (the same
+ordering `course.eval --sample-frac` uses), each paired with the baseline run's
+outcome for that example. The paired difference d = candidate_pass -
+baseline_pass has mean equal to the pass-rate delta, so after n examples an
+empirical Bernstein interval around mean(d) bounds the delta.
+
+The interval is only checked at looks n = min_examples * 2^j, and look j uses
+alpha / 2^(j+1), so the error rate over all looks stays <= alpha = 1 - confidence.
+The run stops with PROMOTE once the lower bound is >= min_delta, or with REJECT
+once the upper bound is < min_delta. If neither happens, every example is scored
+and the ordinary `gate()` decides exactly.
+
+The Locked Room checks are the ones in `gate()`. They run before any scoring,
+against the candidate's dataset and scorer identity.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from course.core.completion_sources import JsonlCompletionSource
+from course.core.datasets import load_examples
+from course.core.eval import EvalAccumulator, render_eval_md
+from course.core.gate import RunStats, gate, load_run_stats
+from course.core.io import (
+    atomic_write_text,
+    iter_jsonl_fields,
+    make_run_dir,
+    sha256_file,
+    utc_now_iso,
+    write_json,
+    write_jsonl,
+    write_manifest,
+)
+from course.core.scoring import SCORER_NAME, SCORER_VERSION
+from course.core.stats import empirical_bernstein_halfwidth, hash_unit
+
+
+def _candidate_stats(
+    *, out_dir: Path, created_utc: str, dataset_path: Path, dataset_sha256: str, acc: Optional[EvalAccumulator], n_population: int
+) -> RunStats:
+    n = acc.n if acc is not None else n_population
+    return RunStats(
+        run_dir=out_dir.resolve(),
+        created_utc=created_utc,
+        dataset_path=str(dataset_path),
+        dataset_sha256=dataset_sha256,
+        scorer_name=SCORER_NAME,
+        scorer_version=SCORER_VERSION,
+        n_examples=n,
+        pass_rate=(acc.n_pass / acc.n) if acc is not None and acc.n else 0.0,
+        outcome_counts=dict(acc.outcome_codes) if acc is not None else {},
+    )
+
+
+def sequential_gate(
+    *,
+    baseline_dir: Path,
+    dataset_path: Path,
+    completions_path: Path,
+    out_dir: Optional[Path] = None,
+    min_delta: float = 0.0,
+    confidence: float = 0.95,
+    min_examples: int = 32,
+    seed: int = 0,
+    argv: Optional[list[str]] = None,
+    args: Optional[Dict[str, Any]] = None,
+) -> tuple[Path, Dict[str, Any]]:
+    """Score the candidate until PROMOTE/REJECT is settled; write a (sampled) eval run dir."""
+
+    if not 0.0 < confidence < 1.0:
+        raise ValueError(f"confidence must be in (0, 1) (got {confidence})")
+    if min_examples < 2:
+        raise ValueError(f"min_examples must be >= 2 (got {min_examples})")
+    if out_dir is None:
+        out_dir = make_run_dir(Path("runs"), prefix="seq_gate")
+    created_utc = utc_now_iso()
+    alpha = 1.0 - confidence
+
+    base = load_run_stats(baseline_dir)
+    examples = load_examples(dataset_path)
+    dataset_sha256 = sha256_file(dataset_path)
+
+    # Locked Room first: a mismatched candidate is rejected without scoring anything.
+    pre = gate(
+        baseline=base,
+        candidate=_candidate_stats(
+            out_dir=out_dir,
+            created_utc=created_utc,
+            dataset_path=dataset_path,
+            dataset_sha256=dataset_sha256,
+            acc=None,
+            n_population=len(examples),
+        ),
+        min_delta=min_delta,
+    )
+    violations = [r for r in pre["reasons"] if r.startswith("LockedRoomViolation")]
+    base_pass = {
+        str(r.get("id")): float(r.get("reward", 0.0) or 0.0) == 1.0
+        for r in iter_jsonl_fields(base.run_dir / "results.jsonl", ("id", "reward"))
+    }
+    missing = sum(1 for ex in examples if ex.id not in base_pass)
+    if missing:
+        violations.append(f"LockedRoomViolation: {missing} dataset examples have no baseline result")
+
+    order = [ex for _u, _i, ex in sorted((hash_unit(ex.id, seed=seed), i, ex) for i, ex in enumerate(examples))]
+    acc = EvalAccumulator()
+    looks: list[Dict[str, Any]] = []
+    state = {"sum_d": 0.0, "sum_d2": 0.0, "next_look": min_examples, "look": 0, "settled": None}
+
+    def _rows() -> Iterator[Dict[str, Any]]:
+        if violations:
+            return
+        source = JsonlCompletionSource(completions_path)
+        for ex in order:
+            row = acc.add(ex, source.get(ex.id))
+            d = float(row["reward"] == 1.0) - float(base_pass[ex.id])
+            state["sum_d"] += d
+            state["sum_d2"] += d * d
+            yield row
+            if acc.n < state["next_look"] or acc.n == len(order):
+                continue
+            n = acc.n
+            mean = state["sum_d"] / n
+            variance = max(0.0, (state["sum_d2"] - n * mean * mean) / (n - 1))
+            delta_j = alpha / 2 ** (state["look"] + 1)
+            hw = empirical_bernstein_halfwidth(n, variance, delta=delta_j, value_range=2.0)
+            looks.append({"n": n, "mean_delta": mean, "low": mean - hw, "high": mean + hw, "alpha_spent": delta_j})
+            state["look"] += 1
+            state["next_look"] *= 2
+            if mean - hw >= min_delta:
+                state["settled"] = "PROMOTE"
+                return
+            if mean + hw < min_delta:
+                state["settled"] = "REJECT"
+                return
+
+    write_jsonl(out_dir / "results.jsonl", _rows())
+
+    if violations:
+        decision = {**pre, "decision": "REJECT", "reasons": violations, "delta": None}
+        decision["candidate"] = {**decision["candidate"], "pass_rate": None, "n": 0}
+    elif state["settled"] is not None:
+        last = looks[-1]
+        decision = {
+            **pre,
+            "decision": state["settled"],
+            "reasons": []
+            if state["settled"] == "PROMOTE"
+            else [
+                f"DeltaTooSmall: delta <= {last['high']:.4f} < min_delta={min_delta:.4f} "
+                f"at {confidence:.0%} confidence after {last['n']} examples"
+            ],
+            "delta": last["mean_delta"],
+        }
+        decision["candidate"] = {**decision["candidate"], "pass_rate": acc.n_pass / acc.n, "n": acc.n}
+    else:
+        # Ran out of examples: the full-population delta is exact, let gate() decide.
+        decision = gate(
+            baseline=base,
+            candidate=_candidate_stats(
+                out_dir=out_dir,
+                created_utc=created_utc,
+                dataset_path=dataset_path,
+                dataset_sha256=dataset_sha256,
+                acc=acc,
+                n_population=len(examples),
+            ),
+            min_delta=min_delta,
+        )
+
+    sequential = {
+        "confidence": confidence,
+        "min_delta": min_delta,
+        "min_examples": min_examples,
+        "seed": seed,
+        "baseline_dir": str(base.run_dir),
+        "n_population": len(examples),
+        "n_scored": acc.n,
+        "stopped_early": state["settled"] is not None,
+        "looks": looks,
+        "decision": decision,
+    }
+
+    summary = acc.summary(
+        created_utc=created_utc,
+        dataset_path=dataset_path,
+        completion_source={"type": "jsonl", "path": str(completions_path)},
+    )
+    summary["sampling"] = {
+        "mode": "sequential",
+        "sampled": acc.n < len(examples),
+        "seed": seed,
+        "sample_frac": None,
+        "n_population": len(examples),
+        "n_sampled": acc.n,
+    }
+    summary["sequential"] = sequential
+    write_json(out_dir / "summary.json", summary)
+
+    md = [render_eval_md(summary, acc.top_failures)]
+    md.append("\n## Sequential gate\n")
+    md.append(f"- Baseline: `{base.run_dir}`\n")
+    md.append(f"- Decision: **{decision['decision']}** after `{acc.n}` / `{len(examples)}` examples\n")
+    md.append(f"- Confidence: `{confidence}`; min_delta: `{min_delta}`\n")
+    for r in decision["reasons"]:
+        md.append(f"- {r}\n")
+    if looks:
+        md.append("\n| n | mean delta | low | high |\n|---:|---:|---:|---:|\n")
+        for look in looks:
+            low = "-inf" if math.isinf(look["low"]) else f"{look['low']:+.3f}"
+            high = "inf" if math.isinf(look["high"]) else f"{look['high']:+.3f}"
+            md.append(f"| {look['n']} | {look['mean_delta']:+.3f} | {low} | {high} |\n")
+    atomic_write_text(out_dir / "summary.md", "".join(md))
+
+    write_manifest(
+        out_dir,
+        created_utc=created_utc,
+        script="sequential_gate",
+        argv=argv or [],
+        args=args or {},
+        inputs=[dataset_path, completions_path],
+        scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
+        extra={
+            "sampled": summary["sampling"]["sampled"],
+            "sampling": summary["sampling"],
+            "baseline_dir": str(base.run_dir),
+            "decision": decision["decision"],
+        },
+    )
+    return out_dir, sequential
@@ -0,0 +1,101 @@
+"""Cluster failing completions by "shape".
+
+A completion's shape keeps what a formatting failure is made of and drops what
+varies from example to example:
+
+- every run of digits becomes `#` ("Final: 1,024" -> "Final:·#,#")
+- whitespace is made visible: space `·`, `\\n`, `\\r`, `\\t`, any other `\\s`
+- only the first `max_chars` characters of the masked text are kept (`…` marks a cut)
+- the original length is bucketed (0-8, 9-16, 17-32, ...) and appended
+
+`ShapeAccumulator` hash-aggregates (outcome code, shape) -> count in one pass,
+keeping only a few exemplars per shape, so memory grows with the number of
+distinct shapes rather than the number of rows.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Optional
+
+# One masking step: a whole digit run, one whitespace character, or a bounded
+# chunk of anything else (bounded so a long word is not scanned past the cut).
+_TOKEN = re.compile(r"(?P<digits>\d+)|(?P<ws>\s)|(?P<other>[^\d\s]{1,64})")
+_VISIBLE_WS = {" ": "·", "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def length_bucket(n: int) -> str:
+    """Power-of-two length bucket: 0-8, 9-16, 17-32, ..."""
+
+    if n <= 8:
+        return "0-8"
+    hi = 16
+    while n > hi:
+        hi *= 2
+    return f"{hi // 2 + 1}-{hi}"
+
+
+def completion_shape(text: str, *, max_chars: int = 48) -> str:
+    """The shape signature of one completion (see module docstring)."""
+
+    # Mask token by token and stop once more than `max_chars` masked characters
+    # exist: digit runs are always consumed whole (a run cut in two would give
+    # "#" twice), and whitespace grows when made visible, so no fixed-length
+    # head of the raw text is safe to mask.
+    pieces: list[str] = []
+    n_masked = 0
+    for m in _TOKEN.finditer(text):
+        if m.lastgroup == "digits":
+            piece = "#"
+        elif m.lastgroup == "ws":
+            piece = _VISIBLE_WS.get(m.group(), "\\s")
+        else:
+            piece = m.group()
+        pieces.append(piece)
+        n_masked += len(piece)
+        if n_masked > max_chars:
+            break
+    masked = "".join(pieces)
+    if n_masked > max_chars:
+        masked = masked[:max_chars] + "…"
+    return f"{masked}  [len {length_bucket(len(text))}]"
+
+
+class ShapeAccumulator:
+    """Streaming (outcome code, shape) -> count, with up to `n_exemplars` rows each."""
+
+    def __init__(self, *, n_exemplars: int = 2, max_chars: int = 48, exemplar_chars: int = 200) -> None:
+        if n_exemplars < 0:
+            raise ValueError(f"n_exemplars must be >= 0 (got {n_exemplars})")
+        if max_chars < 1:
+            raise ValueError(f"max_chars must be >= 1 (got {max_chars})")
+        self.n_exemplars = n_exemplars
+        self.max_chars = max_chars
+        self.exemplar_chars = exemplar_chars
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._exemplars: Dict[tuple[str, str], list[Dict[str, Any]]] = {}
+
+    def add(self, code: str, ex_id: Any, completion: Optional[str]) -> None:
+        text = "" if completion is None else str(completion)
+        shape = completion_shape(text, max_chars=self.max_chars)
+        by_shape = self._counts.setdefault(code, {})
+        by_shape[shape] = by_shape.get(shape, 0) + 1
+        ex = self._exemplars.setdefault((code, shape), [])
+        if len(ex) < self.n_exemplars:
+            ex.append({"id": ex_id, "completion": text[: self.exemplar_chars]})
+
+    def top(self, k: Optional[int] = None) -> Dict[str, list[Dict[str, Any]]]:
+        """Per outcome code (most rows first): its `k` most common shapes with counts and exemplars."""
+
+        codes = sorted(self._counts, key=lambda c: (-sum(self._counts[c].values()), c))
+        out: Dict[str, list[Dict[str, Any]]] = {}
+        for code in codes:
+            shapes = sorted(self._counts[code].items(), key=lambda kv: (-kv[1], kv[0]))
+            out[code] = [
+                {"shape": shape, "count": n, "exemplars": self._exemplars[(code, shape)]}
+                for shape, n in shapes[:k]
+            ]
+        return out
+
+    def n_shapes(self) -> int:
+        return sum(len(v) for v in self._counts.values())
@@ -0,0 +1,113 @@
+"""Slice keys and accumulators for grouped eval metrics.
+
+A slice key maps an Example to a short string label. Two kinds are supported:
+- derived keys computed from the example itself (see DERIVED_SLICE_KEYS)
+- metadata fields, written either as `metadata.<field>` or just `<field>`
+
+Slicing happens in the same pass as scoring: each slice keeps only a handful of
+counters, so 40 slices cost about as much as one eval.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from course.core.types import Example
+
+MISSING_SLICE_VALUE = "<missing>"
+
+_OP_RE = re.compile(r"-?\d+\s*([+\-*/x×])\s*-?\d+")
+_OP_NAMES = {"+": "add", "-": "sub", "*": "mul", "x": "mul", "×": "mul", "/": "div"}
+
+
+def _prompt_op(ex: Example) -> str:
+    m = _OP_RE.search(ex.prompt)
+    if not m:
+        return "other"
+    return _OP_NAMES[m.group(1)]
+
+
+def _answer_magnitude(ex: Example) -> str:
+    return f"{len(str(abs(ex.expected_answer)))}-digit"
+
+
+def _answer_sign(ex: Example) -> str:
+    if ex.expected_answer < 0:
+        return "negative"
+    return "zero" if ex.expected_answer == 0 else "positive"
+
+
+DERIVED_SLICE_KEYS: Dict[str, Callable[[Example], str]] = {
+    "prompt_op": _prompt_op,
+    "answer_magnitude": _answer_magnitude,
+    "answer_sign": _answer_sign,
+}
+
+
+def slice_value(ex: Example, key: str) -> str:
+    """Label of `ex` under slice `key` (derived key or metadata field)."""
+
+    derived = DERIVED_SLICE_KEYS.get(key)
+    if derived is not None:
+        return derived(ex)
+
+    name = key[len("metadata.") :] if key.startswith("metadata.") else key
+    if name not in ex.metadata:
+        return MISSING_SLICE_VALUE
+    value = ex.metadata[name]
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+@dataclass(slots=True)
+class SliceStats:
+    n: int = 0
+    n_pass: int = 0
+    kl_sum: float = 0.0
+    n_kl: int = 0
+    outcome_counts: Counter[str] = field(default_factory=Counter)
+
+    def add(self, *, reward: float, code: str, kl_est: Optional[float]) -> None:
+        self.n += 1
+        if reward == 1.0:
+            self.n_pass += 1
+        self.outcome_counts[code] += 1
+        if kl_est is not None:
+            self.kl_sum += float(kl_est)
+            self.n_kl += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "n": self.n,
+            "n_pass": self.n_pass,
+            "pass_rate": (self.n_pass / self.n) if self.n else 0.0,
+            "outcome_counts": dict(self.outcome_counts.most_common()),
+        }
+        if self.n_kl:
+            out["n_with_kl"] = self.n_kl
+            out["mean_kl_est"] = self.kl_sum / self.n_kl
+        return out
+
+
+class SliceAccumulator:
+    """Per-(key, value) SliceStats, updated one scored example at a time."""
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = list(keys)
+        self._stats: Dict[str, Dict[str, SliceStats]] = {k: {} for k in self.keys}
+
+    def add(self, ex: Example, *, reward: float, code: str, kl_est: Optional[float]) -> None:
+        for key in self.keys:
+            value = slice_value(ex, key)
+            stats = self._stats[key].get(value)
+            if stats is None:
+                stats = self._stats[key][value] = SliceStats()
+            stats.add(reward=reward, code=code, kl_est=kl_est)
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {key: {v: s.to_dict() for v, s in sorted(by_value.items())} for key, by_value in self._stats.items()}
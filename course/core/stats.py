@@ -0,0 +1,232 @@
+"""Small, dependency-free statistics helpers.
+
+Everything here is deterministic: "random" choices are derived from hashes of
+stable keys (example ids) or from explicitly seeded generators, so a sampled
+run or a bootstrap can be reproduced exactly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+from array import array
+from statistics import NormalDist
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+
+def hash_unit(key: str, *, seed: int = 0) -> float:
+    """Map (seed, key) to a deterministic pseudo-random float in [0, 1)."""
+    digest = hashlib.sha256(f"{seed}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def wilson_interval(n_pass: int, n: int, *, level: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion.
+
+    Preferred over the normal approximation because it behaves at p=0 / p=1
+    and for small n, which is exactly where quick sampled runs live.
+    """
+
+    if n <= 0:
+        return (0.0, 1.0)
+    z = NormalDist().inv_cdf(0.5 + level / 2.0)
+    p = n_pass / n
+    denom = 1.0 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1.0 - p) / n + z * z / (4 * n * n)) / denom
+    low = 0.0 if n_pass <= 0 else max(0.0, center - half)
+    high = 1.0 if n_pass >= n else min(1.0, center + half)
+    return (low, high)
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """Unbiased pass@k estimator for one example (Chen et al., 2021).
+
+    n samples were drawn and c of them are correct; returns the probability that
+    a random size-k subset contains at least one correct sample:
+        1 - C(n - c, k) / C(n, k)
+    computed as a running product to stay stable for large n.
+    """
+
+    if k <= 0 or k > n:
+        raise ValueError(f"pass_at_k requires 1 <= k <= n (got n={n}, k={k})")
+    if n - c < k:
+        return 1.0
+    prob_all_wrong = 1.0
+    for i in range(n - c + 1, n + 1):
+        prob_all_wrong *= 1.0 - k / i
+    return 1.0 - prob_all_wrong
+
+
+def expected_samples_to_first_success(n: int, c: int) -> Optional[float]:
+    """Expected draws (without replacement) until the first correct sample.
+
+    For c correct out of n this is (n + 1) / (c + 1); None when c == 0.
+    """
+
+    if c <= 0:
+        return None
+    return (n + 1) / (c + 1)
+
+
+def mcnemar_exact(b: int, c: int) -> float:
+    """Two-sided exact McNemar p-value for paired binary outcomes.
+
+    b and c are the discordant counts (pass->fail and fail->pass). Under the null
+    each discordant pair is a fair coin, so p = 2 * P(Binom(b + c, 1/2) <= min(b, c)),
+    capped at 1. Summed in log space so it stays finite for millions of pairs.
+    """
+
+    if b < 0 or c < 0:
+        raise ValueError(f"mcnemar_exact needs non-negative counts (got b={b}, c={c})")
+    n = b + c
+    if n == 0:
+        return 1.0
+    m = min(b, c)
+    log_half_n = n * math.log(0.5)
+    log_n_fact = math.lgamma(n + 1)
+
+    def log_pmf(k: int) -> float:
+        return log_n_fact - math.lgamma(k + 1) - math.lgamma(n - k + 1) + log_half_n
+
+    # m <= n/2, so the pmf grows up to k = m: factor out the last term.
+    top = log_pmf(m)
+    tail = math.exp(top) * math.fsum(math.exp(log_pmf(k) - top) for k in range(m + 1))
+    return min(1.0, 2.0 * tail)
+
+
+def empirical_bernstein_halfwidth(n: int, variance: float, *, delta: float, value_range: float = 1.0) -> float:
+    """Two-sided empirical Bernstein bound (Maurer & Pontil, 2009).
+
+    With probability >= 1 - delta the true mean of i.i.d. values spanning
+    `value_range` lies within mean +/- this half-width, where `variance` is the
+    sample variance. Much tighter than Hoeffding when most values are equal
+    (e.g. paired pass/fail differences that are mostly 0).
+    """
+
+    if n < 2:
+        return math.inf
+    log_term = math.log(4.0 / delta)
+    return math.sqrt(2.0 * variance * log_term / n) + 7.0 * value_range * log_term / (3.0 * (n - 1))
+
+
+def poisson_variate(rng: random.Random, lam: float) -> int:
+    """Exact Poisson(lam) draw from a `random.Random`.
+
+    Multiplication method for small lam, Hoermann's PTRS transformed rejection
+    otherwise (the algorithm NumPy uses), so the cost per draw is O(1) even for
+    lam in the millions.
+    """
+
+    if lam <= 0:
+        return 0
+    if lam < 10:
+        limit = math.exp(-lam)
+        k, prod = 0, rng.random()
+        while prod > limit:
+            k += 1
+            prod *= rng.random()
+        return k
+
+    slam = math.sqrt(lam)
+    loglam = math.log(lam)
+    b = 0.931 + 2.53 * slam
+    a = -0.059 + 0.02483 * b
+    invalpha = 1.1239 + 1.1328 / (b - 3.4)
+    vr = 0.9277 - 3.6224 / (b - 2)
+    while True:
+        u = rng.random() - 0.5
+        v = rng.random()
+        us = 0.5 - abs(u)
+        k = math.floor((2 * a / us + b) * u + lam + 0.43)
+        if us >= 0.07 and v <= vr:
+            return k
+        if k < 0 or (us < 0.013 and v > us):
+            continue
+        if math.log(v) + math.log(invalpha) - math.log(a / (us * us) + b) <= -lam + k * loglam - math.lgamma(k + 1):
+            return k
+
+
+def _quantile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolation quantile (NumPy's default) of pre-sorted values."""
+    pos = q * (len(sorted_values) - 1)
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def category_bootstrap(
+    counts: Sequence[int],
+    values: Mapping[str, Sequence[float]],
+    *,
+    n_resamples: int = 10_000,
+    level: float = 0.95,
+    seed: int = 0,
+    backend: str = "auto",
+) -> Dict[str, Dict[str, Any]]:
+    """Percentile bootstrap CIs for weighted means over categorized examples.
+
+    Every example falls into one of C categories (`counts[c]` examples each),
+    and each statistic is the mean of a per-category value (`values[name][c]`).
+    This is a Poisson bootstrap: each example gets an independent Poisson(1)
+    weight, so a category's total weight is Poisson(counts[c]). One resample is
+    therefore C draws rather than n, and 10k resamples over millions of examples
+    stay cheap. With paired categories (baseline outcome, candidate outcome) the
+    pairing is preserved.
+
+    backend: "numpy" (vectorized, requires NumPy), "python" (`random` + `array`),
+    or "auto" (NumPy when importable).
+    """
+
+    if backend not in ("auto", "numpy", "python"):
+        raise ValueError(f"backend must be auto|numpy|python (got {backend!r})")
+    np = None
+    if backend in ("auto", "numpy"):
+        try:
+            import numpy as np  # type: ignore
+        except ImportError:
+            if backend == "numpy":
+                raise
+    names = list(values)
+    n_total = sum(counts)
+    point = {name: (math.fsum(c * v for c, v in zip(counts, values[name])) / n_total) if n_total else 0.0 for name in names}
+    lo_q, hi_q = (1.0 - level) / 2.0, 1.0 - (1.0 - level) / 2.0
+
+    samples: Dict[str, Sequence[float]]
+    if np is not None:
+        gen = np.random.default_rng(seed)
+        weights = gen.poisson(np.asarray(counts, dtype=float), size=(n_resamples, len(counts)))
+        totals = weights.sum(axis=1)
+        keep = totals > 0
+        samples = {
+            name: np.sort((weights[keep] @ np.asarray(values[name], dtype=float)) / totals[keep]).tolist()
+            for name in names
+        }
+        used_backend = "numpy"
+    else:
+        rng = random.Random(seed)
+        buffers = {name: array("d") for name in names}
+        for _ in range(n_resamples):
+            w = [poisson_variate(rng, c) for c in counts]
+            total = sum(w)
+            if total == 0:
+                continue
+            for name in names:
+                buffers[name].append(math.fsum(wi * v for wi, v in zip(w, values[name])) / total)
+        samples = {name: sorted(buf) for name, buf in buffers.items()}
+        used_backend = "python"
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for name in names:
+        s = samples[name]
+        low, high = (_quantile(s, lo_q), _quantile(s, hi_q)) if s else (-math.inf, math.inf)
+        out[name] = {"estimate": point[name], "low": low, "high": high}
+    return {
+        "method": "poisson_bootstrap",
+        "backend": used_backend,
+        "level": level,
+        "n_resamples": n_resamples,
+        "seed": seed,
+        "stats": out,
+    }
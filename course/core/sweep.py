@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from course.core.datasets import index_by_id, load_examples
+from course.core.eval import CachedScorer, CompletionJoin, EvalAccumulator, render_eval_md
+from course.core.io import (
+    JsonDict,
+    atomic_write_text,
+    ensure_dir,
+    iter_jsonl,
+    make_run_dir,
+    utc_now_iso,
+    write_json,
+    write_jsonl,
+    write_manifest,
+)
+from course.core.scoring import SCORER_NAME, SCORER_VERSION
+
+
+def checkpoint_labels(paths: Sequence[Path]) -> list[str]:
+    """Stable, unique, filesystem-safe labels for completion files.
+
+    Uses the file stem, or the parent directory name when the stem is the
+    generic `completions` written by `course.rollout_sample`.
+    """
+
+    labels: list[str] = []
+    for i, p in enumerate(paths):
+        base = p.parent.name if p.stem == "completions" and p.parent.name else p.stem
+        base = "".join(c if c.isalnum() or c in "-_." else "_" for c in base) or "ckpt"
+        labels.append(f"{i:03d}_{base}")
+    return labels
+
+
+def eval_sweep(
+    *,
+    dataset_path: Path,
+    completions_paths: Sequence[Path],
+    out_dir: Path,
+    max_examples: Optional[int] = None,
+    group_by: Optional[Sequence[str]] = None,
+    score_cache_size: Optional[int] = 100_000,
+    argv: Optional[list[str]] = None,
+    args: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Evaluate many completion files (one per checkpoint) against one dataset.
+
+    The dataset is loaded, indexed and hashed once; each completions file is
+    streamed and joined against the index; a shared `CachedScorer` means an
+    identical (example, completion) pair is only scored once across the sweep
+    (while it stays among the `score_cache_size` most recently used pairs).
+
+    Writes `out_dir/<label>/` as a regular eval run dir per checkpoint (gate
+    compatible), plus `curve.csv`, `summary.json` and `summary.md` at the top.
+    """
+
+    created_utc = utc_now_iso()
+
+    examples = load_examples(dataset_path)
+    if max_examples is not None:
+        examples = examples[:max_examples]
+    ex_by_id = index_by_id(examples)
+
+    scorer = CachedScorer(max_entries=score_cache_size)
+    fingerprints: Dict[Path, JsonDict] = {}
+    ensure_dir(out_dir)
+
+    curve: list[Dict[str, Any]] = []
+    for label, path in zip(checkpoint_labels(completions_paths), completions_paths):
+        run_dir = ensure_dir(out_dir / label)
+        acc = EvalAccumulator(group_by, scorer=scorer)
+        join = CompletionJoin(ex_by_id, source=path)
+        rows = itertools.chain(
+            (acc.add(ex, sample) for ex, sample in join.pairs(iter_jsonl(path))),
+            (acc.add(ex, None) for ex in join.unmatched(examples)),
+        )
+        write_jsonl(run_dir / "results.jsonl", rows)
+
+        source_desc = {"type": "jsonl", "path": str(path), "n": len(join.seen)}
+        summary = acc.summary(created_utc=created_utc, dataset_path=dataset_path, completion_source=source_desc)
+        write_json(run_dir / "summary.json", summary)
+        atomic_write_text(run_dir / "summary.md", render_eval_md(summary, acc.top_failures))
+        write_manifest(
+            run_dir,
+            created_utc=created_utc,
+            script="eval_sweep",
+            argv=argv or [],
+            args=args or {},
+            inputs=[dataset_path, path],
+            scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
+            extra={"completion_source": source_desc, "sweep_dir": str(out_dir), "checkpoint": label},
+            fingerprint_cache=fingerprints,
+        )
+
+        metrics = summary["metrics"]
+        curve.append(
+            {
+                "checkpoint": label,
+                "completions_path": str(path),
+                "n": summary["run"]["n_examples"],
+                "n_missing": summary["run"]["n_missing_completions"],
+                "pass_rate": metrics["pass_rate"],
+                "mean_kl_est": metrics.get("mean_kl_est"),
+                "n_unknown_ids": join.unknown_ids,
+                "run_dir": str(run_dir),
+            }
+        )
+
+    cols = ["checkpoint", "n", "n_missing", "pass_rate", "mean_kl_est", "completions_path"]
+    csv_lines = [",".join(cols)]
+    for row in curve:
+        csv_lines.append(",".join("" if row[c] is None else str(row[c]) for c in cols))
+    atomic_write_text(out_dir / "curve.csv", "\n".join(csv_lines) + "\n")
+
+    summary_all: Dict[str, Any] = {
+        "run": {
+            "created_utc": created_utc,
+            "scorer": {"name": SCORER_NAME, "version": SCORER_VERSION},
+            "dataset_path": str(dataset_path),
+            "n_examples": len(examples),
+            "n_checkpoints": len(curve),
+        },
+        "score_cache": {
+            "hits": scorer.hits,
+            "misses": scorer.misses,
+            "evictions": scorer.evictions,
+            "max_entries": score_cache_size,
+        },
+        "curve": curve,
+    }
+    write_json(out_dir / "summary.json", summary_all)
+
+    md = []
+    md.append("# Eval sweep (checkpoints)\n\n")
+    md.append(f"- Created (UTC): `{created_utc}`\n")
+    md.append(f"- Scorer: `{SCORER_NAME}` v`{SCORER_VERSION}`\n")
+    md.append(f"- Dataset: `{dataset_path}` (`{len(examples)}` examples)\n")
+    md.append(f"- Score cache: `{scorer.hits}` hits / `{scorer.misses}` misses\n")
+    md.append("\n## Curve\n\n")
+    md.append("| checkpoint | n | missing | pass_rate | mean_kl_est |\n")
+    md.append("|---|---:|---:|---:|---:|\n")
+    for row in curve:
+        kl = "-" if row["mean_kl_est"] is None else f"{row['mean_kl_est']:.3f}"
+        md.append(f"| `{row['checkpoint']}` | {row['n']} | {row['n_missing']} | {row['pass_rate']:.3f} | {kl} |\n")
+    atomic_write_text(out_dir / "summary.md", "".join(md))
+
+    write_manifest(
+        out_dir,
+        created_utc=created_utc,
+        script="eval_sweep",
+        argv=argv or [],
+        args=args or {},
+        inputs=[dataset_path, *completions_paths],
+        scorer={"name": SCORER_NAME, "version": SCORER_VERSION},
+        extra={"checkpoints": [row["checkpoint"] for row in curve]},
+        fingerprint_cache=fingerprints,
+    )
+
+    return summary_all
+
+
+def run_eval_sweep(
+    *,
+    dataset_path: Path,
+    completions_paths: Sequence[Path],
+    out_dir: Optional[Path] = None,
+    max_examples: Optional[int] = None,
+    group_by: Optional[Sequence[str]] = None,
+    score_cache_size: Optional[int] = 100_000,
+    argv: Optional[list[str]] = None,
+    args: Optional[Dict[str, Any]] = None,
+) -> tuple[Path, Dict[str, Any]]:
+    if out_dir is None:
+        out_dir = make_run_dir(Path("runs"), prefix="eval_sweep")
+
+    summary = eval_sweep(
+        dataset_path=dataset_path,
+        completions_paths=completions_paths,
+        out_dir=out_dir,
+        max_examples=max_examples,
+        group_by=group_by,
+        score_cache_size=score_cache_size,
+        argv=argv,
+        args=args,
+    )
+    return out_dir, summary
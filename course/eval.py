@@ -10,22 +10,87 @@ from course.core.eval import run_eval
 def main() -> None:
     p = argparse.ArgumentParser(description="Loop A: evaluate frozen rollouts using the deterministic verifier.")
     p.add_argument("--dataset", type=Path, required=True, help="Path to dataset JSONL")
-    p.add_argument("--completions", type=Path, required=True, help="Path to completions JSONL (id -> completion)")
+    p.add_argument(
+        "--completions",
+        type=Path,
+        required=True,
+        help="Path to completions JSONL (id -> completion); '-' reads stdin (with --follow)",
+    )
     p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/eval_<timestamp>)")
     p.add_argument("--max", type=int, default=None, dest="max_examples", help="Optional cap for quick runs")
+    p.add_argument(
+        "--follow",
+        action="store_true",
+        help="Score completions as they are appended (or piped on stdin) and refresh the summary while running",
+    )
+    p.add_argument("--refresh-secs", type=float, default=2.0, help="--follow: minimum seconds between summary rewrites")
+    p.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=30.0,
+        help="--follow: stop after this many seconds without new lines (file input only)",
+    )
+    p.add_argument(
+        "--group-by",
+        nargs="+",
+        default=None,
+        metavar="KEY",
+        help="Report per-slice metrics by metadata field(s) or derived keys (prompt_op, answer_magnitude, answer_sign)",
+    )
+    p.add_argument(
+        "--sample-frac",
+        type=float,
+        default=None,
+        help="Approximate mode: evaluate a hash-seeded random fraction of the dataset (reports a CI)",
+    )
+    p.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Approximate mode: score examples in hash-seeded random order until this many seconds pass",
+    )
+    p.add_argument("--seed", type=int, default=0, help="Seed for --sample-frac/--time-budget ordering")
+    p.add_argument(
+        "--ci-level",
+        type=float,
+        default=0.95,
+        help="Confidence level of the Wilson pass_rate interval reported for approximate runs",
+    )
     args = p.parse_args()
 
+    if str(args.completions) == "-" and not args.follow:
+        p.error("--completions - (stdin) requires --follow")
+    if args.follow and (args.sample_frac is not None or args.time_budget is not None):
+        p.error("--follow cannot be combined with --sample-frac/--time-budget")
+    if args.sample_frac is not None and not 0.0 < args.sample_frac <= 1.0:
+        p.error("--sample-frac must be in (0, 1]")
+    if args.time_budget is not None and args.time_budget <= 0:
+        p.error("--time-budget must be > 0 seconds")
+    if not 0.0 < args.ci_level < 1.0:
+        p.error("--ci-level must be in (0, 1)")
+
     out_dir, summary = run_eval(
         dataset_path=args.dataset,
         completions_path=args.completions,
         out_dir=args.outdir,
         max_examples=args.max_examples,
+        follow=args.follow,
+        refresh_secs=args.refresh_secs,
+        idle_timeout=args.idle_timeout,
+        group_by=args.group_by,
+        sample_frac=args.sample_frac,
+        time_budget=args.time_budget,
+        seed=args.seed,
+        ci_level=args.ci_level,
         argv=sys.argv,
         args=vars(args),
     )
 
     print(f"Wrote results to: {out_dir}")
     print(f"pass_rate={summary['metrics']['pass_rate']:.3f}  n={summary['run']['n_examples']}")
+    ci = summary["metrics"].get("pass_rate_ci")
+    if ci:
+        print(f"{ci['level']:.0%} CI: [{ci['low']:.3f}, {ci['high']:.3f}]  (sampled run; not gate-comparable with full runs)")
     if summary["run"]["n_missing_completions"]:
         print(f"WARNING: missing completions for {summary['run']['n_missing_completions']} examples")
 
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from course.core.sweep import run_eval_sweep
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Evaluate many completion files (one per checkpoint) against one dataset in a single process."
+    )
+    p.add_argument("--dataset", type=Path, required=True, help="Path to dataset JSONL")
+    p.add_argument(
+        "--completions",
+        type=Path,
+        nargs="+",
+        required=True,
+        help="Completions JSONL files, one per checkpoint (in curve order)",
+    )
+    p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/eval_sweep_<timestamp>)")
+    p.add_argument("--max", type=int, default=None, dest="max_examples", help="Optional cap for quick runs")
+    p.add_argument("--group-by", nargs="+", default=None, metavar="KEY", help="Per-slice metrics (see course.eval)")
+    p.add_argument(
+        "--score-cache-size",
+        type=int,
+        default=100_000,
+        help="Max (example, completion) scores kept in the LRU cache shared across checkpoints (0 = no cache)",
+    )
+    args = p.parse_args()
+
+    out_dir, summary = run_eval_sweep(
+        dataset_path=args.dataset,
+        completions_paths=args.completions,
+        out_dir=args.outdir,
+        max_examples=args.max_examples,
+        group_by=args.group_by,
+        score_cache_size=args.score_cache_size,
+        argv=sys.argv,
+        args=vars(args),
+    )
+
+    print(f"Wrote sweep to: {out_dir}")
+    for row in summary["curve"]:
+        kl = "" if row["mean_kl_est"] is None else f"  mean_kl_est={row['mean_kl_est']:.3f}"
+        print(f"{row['checkpoint']}: pass_rate={row['pass_rate']:.3f}  n={row['n']}{kl}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from course.core.reward_matrix import build_reward_matrix, export_advantages
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Score a selection pack (cached reward matrix) and export group-relative advantages as a CSV batch."
+    )
+    p.add_argument("--dataset", type=Path, required=True, help="Path to dataset JSONL")
+    p.add_argument("--samples", type=Path, required=True, help="Path to selection pack JSONL (id -> samples)")
+    p.add_argument("--out", type=Path, required=True, help="Batch CSV to write (id, sample_index, reward, advantage, ...)")
+    p.add_argument("--n", type=int, default=None, help="Use only the first N samples per example (group size)")
+    p.add_argument("--normalize-std", action="store_true", help="Divide by the group std (+eps) as well as centering")
+    p.add_argument("--eps", type=float, default=1e-6, help="Added to the group std when --normalize-std is set")
+    p.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path("runs/_reward_matrix_cache"),
+        help="Where reward matrices are cached (shared with course.reward_matrix)",
+    )
+    p.add_argument("--max", type=int, default=None, dest="max_examples", help="Optional cap for quick runs")
+    args = p.parse_args()
+
+    matrix_path, cache_hit = build_reward_matrix(
+        dataset_path=args.dataset,
+        samples_path=args.samples,
+        cache_dir=args.cache_dir,
+        n=args.n,
+        max_examples=args.max_examples,
+    )
+    stats = export_advantages(matrix_path, args.out, normalize_std=args.normalize_std, eps=args.eps)
+
+    print(f"Wrote advantages to: {args.out}")
+    print(f"matrix: {matrix_path} ({'cache hit' if cache_hit else 'built'})")
+    print(json.dumps(stats, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
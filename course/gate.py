@@ -4,7 +4,8 @@ import argparse
 import json
 from pathlib import Path
 
-from course.core.gate import gate, load_run_stats
+from course.core.gate import bootstrap_deltas, gate, load_run_stats, paired_test
+from course.core.runs_catalog import RunsCatalog
 
 
 def main() -> None:
@@ -12,13 +13,66 @@ def main() -> None:
     p.add_argument("--baseline", type=Path, required=True, help="Baseline run directory (runs/...)")
     p.add_argument("--candidate", type=Path, required=True, help="Candidate run directory (runs/...)")
     p.add_argument("--min-delta", type=float, default=0.0, help="Minimum pass_rate improvement required to PROMOTE")
+    p.add_argument(
+        "--paired",
+        action="store_true",
+        help="Join runs by example id (streaming) and report discordant pairs + exact McNemar p-value",
+    )
+    p.add_argument(
+        "--require-significance",
+        action="store_true",
+        help="Also REJECT unless McNemar p <= --alpha (implies --paired)",
+    )
+    p.add_argument("--alpha", type=float, default=0.05, help="Significance level for --require-significance")
+    p.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Paired bootstrap with N resamples: CIs for the pass-rate delta and per-outcome-code deltas",
+    )
+    p.add_argument("--ci-level", type=float, default=0.95, help="Confidence level for --bootstrap")
+    p.add_argument(
+        "--require-ci",
+        action="store_true",
+        help="Also REJECT unless the delta CI's lower end is >= --min-delta (uses 10000 resamples if --bootstrap is unset)",
+    )
+    p.add_argument(
+        "--catalog",
+        type=Path,
+        default=None,
+        help="Read run stats from this runs catalog (course.runs); stale entries are re-indexed first",
+    )
     p.add_argument("--json", action="store_true", help="Print decision as JSON")
     args = p.parse_args()
 
-    base = load_run_stats(args.baseline)
-    cand = load_run_stats(args.candidate)
+    if args.catalog is not None:
+        with RunsCatalog(args.catalog) as catalog:
+            base = catalog.run_stats(args.baseline)
+            cand = catalog.run_stats(args.candidate)
+    else:
+        base = load_run_stats(args.baseline)
+        cand = load_run_stats(args.candidate)
+
+    paired = paired_test(args.baseline, args.candidate) if (args.paired or args.require_significance) else None
+
+    n_resamples = args.bootstrap or (10_000 if args.require_ci else 0)
+    bootstrap = (
+        bootstrap_deltas(args.baseline, args.candidate, n_resamples=n_resamples, level=args.ci_level)
+        if n_resamples
+        else None
+    )
 
-    decision = gate(baseline=base, candidate=cand, min_delta=args.min_delta)
+    decision = gate(
+        baseline=base,
+        candidate=cand,
+        min_delta=args.min_delta,
+        paired=paired,
+        require_significance=args.require_significance,
+        alpha=args.alpha,
+        bootstrap=bootstrap,
+        require_ci=args.require_ci,
+    )
 
     if args.json:
         print(json.dumps(decision, indent=2, sort_keys=True))
@@ -27,6 +81,19 @@ def main() -> None:
         print(f"Baseline pass_rate:  {decision['baseline']['pass_rate']:.3f}  (n={decision['baseline']['n']})")
         print(f"Candidate pass_rate: {decision['candidate']['pass_rate']:.3f}  (n={decision['candidate']['n']})")
         print(f"Delta: {decision['delta']:.3f}")
+        if "paired" in decision:
+            t = decision["paired"]["table"]
+            print(
+                f"Paired ({decision['paired']['join']} join, n={decision['paired']['n_paired']}): "
+                f"pass->fail={t['pass_to_fail']}  fail->pass={t['fail_to_pass']}  "
+                f"McNemar p={decision['paired']['mcnemar_p']:.4g}"
+            )
+        if "bootstrap" in decision:
+            ci = decision["bootstrap"]["pass_rate_delta"]
+            print(
+                f"Delta {decision['bootstrap']['level']:.0%} CI (paired bootstrap, "
+                f"{decision['bootstrap']['n_resamples']} resamples): [{ci['low']:+.3f}, {ci['high']:+.3f}]"
+            )
         if decision["reasons"]:
             print("Reasons:")
             for r in decision["reasons"]:
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from course.core.gate import gate_tournament
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Gate many candidate runs against one baseline, or all pairs against each other (PROMOTE/REJECT)."
+    )
+    p.add_argument("--candidates", type=Path, nargs="+", required=True, help="Candidate run directories (runs/...)")
+    p.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Baseline run directory; omit to gate all pairs of candidates against each other",
+    )
+    p.add_argument("--min-delta", type=float, default=0.0, help="Minimum pass_rate improvement required to PROMOTE")
+    p.add_argument("--json", action="store_true", help="Print the full tournament (ranking + pairwise gates) as JSON")
+    args = p.parse_args()
+
+    result = gate_tournament(candidates=args.candidates, baseline=args.baseline, min_delta=args.min_delta)
+
+    if args.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    else:
+        if result["mode"] == "baseline":
+            print(f"Baseline: {result['baseline']}")
+            print(f"{'rank':>4}  {'decision':<8}  {'pass_rate':>9}  {'delta':>7}  run")
+            for row in result["ranking"]:
+                print(
+                    f"{row['rank']:>4}  {row['decision']:<8}  {row['pass_rate']:>9.3f}  {row['delta']:>+7.3f}  {row['run_dir']}"
+                )
+        else:
+            print(f"{'rank':>4}  {'decision':<8}  {'pass_rate':>9}  {'wins':>4}  run")
+            for row in result["ranking"]:
+                print(f"{row['rank']:>4}  {row['decision']:<8}  {row['pass_rate']:>9.3f}  {row['wins']:>4}  {row['run_dir']}")
+        for row in result["ranking"]:
+            if row["decision"] == "REJECT" and row["reasons"]:
+                print(f"\n{row['run_dir']}:")
+                for r in row["reasons"]:
+                    print(f"- {r}")
+        cache = result["stats_cache"]
+        print(f"\nrun stats loaded: {cache['misses']} (cache hits: {cache['hits']})")
+
+    promoted = any(row["decision"] == "PROMOTE" for row in result["ranking"])
+    raise SystemExit(0 if promoted else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from course.core.html_report import write_html_report
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Write a static, paginated HTML report for a run dir (index + pages per outcome code)."
+    )
+    p.add_argument("--run", type=Path, required=True, help="Run directory (runs/...) with results.jsonl")
+    p.add_argument("--outdir", type=Path, default=None, help="Report directory (defaults to <run>/report)")
+    p.add_argument("--rows-per-page", type=int, default=200, help="Rows per outcome-code page")
+    p.add_argument("--json", action="store_true", help="Print page counts as JSON")
+    args = p.parse_args()
+
+    stats = write_html_report(args.run, args.outdir, rows_per_page=args.rows_per_page)
+
+    if args.json:
+        print(json.dumps(stats, indent=2, sort_keys=True))
+        return
+    n_pages = sum(c["n_pages"] for c in stats["codes"].values())
+    print(f"Wrote report to: {Path(stats['out_dir']) / 'index.html'}")
+    print(f"mode={stats['mode']} rows={stats['n']} codes={len(stats['codes'])} pages={n_pages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,16 @@ import json
 from pathlib import Path
 from typing import Any, Dict, Mapping, Optional
 
-from course.core.inspect import analyze_run, load_summary, resolve_run
+from course.core.inspect import (
+    RecordQuery,
+    analyze_run,
+    eval_outcome_code,
+    find_record,
+    load_summary,
+    rehydrate_selection_row,
+    resolve_run,
+)
+from course.core.runs_catalog import RunsCatalog
 from course.core.scoring import SCORER_NAME, SCORER_VERSION
 
 
@@ -42,22 +51,45 @@ def _print_header(run_dir: Path, summary: Optional[Dict[str, Any]]) -> None:
             print(f"- {k}: {run_meta[k]}")
 
 
-def print_eval_report(analysis: Dict[str, Any], *, top_k: int, show: int, only_fails: bool, inspect_id: Optional[str]) -> None:
-    groups: Dict[str, list[Dict[str, Any]]] = analysis["groups"]
+def print_record(rec: Mapping[str, Any], ex_id: str) -> None:
+    code = eval_outcome_code(rec) if "reward" in rec else "-"
+    print(f"\n=== Inspect id={ex_id} (outcome_code={code}) ===\n")
+    r2 = dict(rec)
+    if "completion" in r2:
+        r2["completion"] = _truncate(str(r2.get("completion", "")), limit=800)
+    print(json.dumps(r2, indent=2, ensure_ascii=False, sort_keys=True))
+
+
+def _print_eval_row(r: Mapping[str, Any]) -> None:
+    ex_id = r.get("id")
+    expected = r.get("expected_answer")
+    completion = str(r.get("completion", ""))
+    details = r.get("details") or {}
+    parse = details.get("parse") or {}
+    msg = parse.get("error_message") or (details.get("result") or {}).get("message") or ""
+    ans = parse.get("answer_str")
+    print(f"- id={ex_id} expected={expected} parsed={ans!r}")
+    print(f"  completion: {_truncate(completion)}")
+    if msg:
+        print(f"  why: {msg}")
+
+
+def _print_page(analysis: Dict[str, Any], query: RecordQuery) -> None:
+    rows = analysis["page"]
+    first = query.offset + 1
+    print(f"\n=== Matching records {first}-{query.offset + len(rows)} of {analysis['n_matched']} ===")
+    for r in rows:
+        if analysis["mode"] == "eval":
+            print(f"[{eval_outcome_code(r)}]", end=" ")
+            _print_eval_row(r)
+        else:
+            b = r.get("baseline") or {}
+            bo = r.get("best_of_n") or {}
+            print(f"- id={r.get('id')} baseline_reward={b.get('reward')} best_reward={bo.get('reward')}")
 
-    # Single-id inspection mode
-    if inspect_id is not None:
-        for code, recs in groups.items():
-            for r in recs:
-                if str(r.get("id")) == inspect_id:
-                    print(f"\n=== Inspect id={inspect_id} (outcome_code={code}) ===\n")
-                    r2 = dict(r)
-                    comp = str(r2.get("completion", ""))
-                    r2["completion"] = _truncate(comp, limit=800)
-                    print(json.dumps(r2, indent=2, ensure_ascii=False, sort_keys=True))
-                    return
-        print(f"\nNo record found with id={inspect_id!r}")
-        return
+
+def print_eval_report(analysis: Dict[str, Any], *, top_k: int, show: int, only_fails: bool) -> None:
+    groups: Dict[str, list[Dict[str, Any]]] = analysis["groups"]
 
     n = analysis["n"]
     n_pass = analysis["n_pass"]
@@ -77,6 +109,11 @@ def print_eval_report(analysis: Dict[str, Any], *, top_k: int, show: int, only_f
     for code, cnt in codes[:top_k]:
         print(f"- {code}: {cnt}")
 
+    matched_by_code = analysis["matched_by_code"]
+    if analysis["n_matched"] != n:
+        print(f"\nMatching filters: {analysis['n_matched']}")
+        codes = [(c, cnt) for c, cnt in codes if c in matched_by_code]
+
     printed = 0
     for code, _cnt in codes[:top_k]:
         if code == "ok":
@@ -85,27 +122,34 @@ def print_eval_report(analysis: Dict[str, Any], *, top_k: int, show: int, only_f
         if not recs:
             continue
 
-        print(f"\n=== {code} (showing up to {show}) ===")
+        print(f"\n=== {code} (showing {min(show, len(recs))} of {matched_by_code[code]}) ===")
         for r in recs[:show]:
-            ex_id = r.get("id")
-            expected = r.get("expected_answer")
-            completion = str(r.get("completion", ""))
-            details = r.get("details") or {}
-            parse = details.get("parse") or {}
-            msg = parse.get("error_message") or (details.get("result") or {}).get("message") or ""
-            ans = parse.get("answer_str")
-            print(f"- id={ex_id} expected={expected} parsed={ans!r}")
-            print(f"  completion: {_truncate(completion)}")
-            if msg:
-                print(f"  why: {msg}")
+            _print_eval_row(r)
 
         printed += 1
 
     if printed == 0 and only_fails:
         print("\nNo failures found (all ok).")
 
+    if "shapes" in analysis:
+        print_shapes(analysis, top_k=top_k)
 
-def print_selection_report(analysis: Dict[str, Any], *, show: int) -> None:
+
+def print_shapes(analysis: Dict[str, Any], *, top_k: int) -> None:
+    shapes: Dict[str, list[Dict[str, Any]]] = analysis["shapes"]
+    print(f"\n=== Failure shapes (digits -> #, space -> ·; {analysis['n_shapes']} distinct) ===")
+    if not shapes:
+        print("(no failures)")
+    for code, rows in list(shapes.items())[:top_k]:
+        total = analysis["matched_by_code"].get(code, 0)
+        print(f"\n{code} ({total} rows):")
+        for row in rows:
+            print(f"  {row['count']:>8}  {row['shape']}")
+            for ex in row["exemplars"]:
+                print(f"            e.g. id={ex['id']}: {_truncate(str(ex['completion']), limit=100)}")
+
+
+def print_selection_report(analysis: Dict[str, Any], *, show: int, samples_path: Optional[Path] = None) -> None:
     print("\nMetrics (from results.jsonl):")
     print(f"- n: {analysis['n']}")
     print(f"- pass@1: {analysis['pass_at_1']:.3f}")
@@ -116,6 +160,8 @@ def print_selection_report(analysis: Dict[str, Any], *, show: int) -> None:
     if rescues:
         print(f"\n=== Rescue examples (showing up to {show}) ===")
         for r in rescues[:show]:
+            # Compact runs reference completions in the pack; fetch only what we print.
+            r = rehydrate_selection_row(r, samples_path)
             ex_id = r.get("id")
             expected = r.get("expected_answer")
             b = r.get("baseline") or {}
@@ -127,19 +173,70 @@ def print_selection_report(analysis: Dict[str, Any], *, show: int) -> None:
 
 def main() -> None:
     p = argparse.ArgumentParser(description="Inspect a run directory: group failures, print examples, and sanity-check scorer version.")
-    p.add_argument("--run", type=Path, required=True, help="Run dir (runs/...) or a results.jsonl path")
+    p.add_argument("--run", type=Path, required=True, help="Run dir (runs/...), a results.jsonl path, or a run id with --catalog")
     p.add_argument("--top-k", type=int, default=5, help="Top K outcome codes to display")
     p.add_argument("--show", type=int, default=3, help="How many examples to show per group")
     p.add_argument("--only-fails", action="store_true", help="Hide the 'ok' group and focus on failures")
     p.add_argument("--id", type=str, default=None, help="Inspect a single example id (prints its full record)")
+    p.add_argument("--code", action="append", default=None, help="Only records with this outcome code (repeatable; eval)")
+    p.add_argument("--grep", type=str, default=None, help="Only records whose completion matches this regex (eval)")
+    p.add_argument("--id-prefix", type=str, default=None, help="Only records whose id starts with this prefix")
+    p.add_argument("--min-reward", type=float, default=None, help="Only records with reward >= this (selection: best-of-N)")
+    p.add_argument("--max-reward", type=float, default=None, help="Only records with reward <= this (selection: best-of-N)")
+    p.add_argument(
+        "--shapes",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Cluster failing completions by shape (digits masked, whitespace visible, length bucket); top K per code",
+    )
+    p.add_argument("--limit", type=int, default=None, help="Also list matching records, this many per page")
+    p.add_argument("--offset", type=int, default=0, help="Skip this many matching records before the --limit page")
+    p.add_argument(
+        "--catalog",
+        type=Path,
+        default=None,
+        help="Runs catalog (course.runs) used to look up --run by run id when it is not a path",
+    )
     args = p.parse_args()
 
-    run = resolve_run(args.run)
+    run_path = args.run
+    if args.catalog is not None and not run_path.exists():
+        with RunsCatalog(args.catalog) as catalog:
+            matches = catalog.find(str(args.run))
+        if len(matches) > 1:
+            raise SystemExit(f"Run id {str(args.run)!r} is ambiguous; pass one of: " + ", ".join(map(str, matches)))
+        if matches:
+            run_path = matches[0]
+
+    run = resolve_run(run_path)
     summary = load_summary(run.summary_path)
 
     _print_header(run.run_dir, summary)
 
-    analysis = analyze_run(run)
+    samples_path = ((summary or {}).get("run") or {}).get("samples_path")
+    samples = Path(samples_path) if samples_path else None
+
+    if args.id is not None:
+        rec = find_record(run.results_path, args.id)
+        if rec is None:
+            print(f"\nNo record found with id={args.id!r}")
+        else:
+            print_record(rehydrate_selection_row(rec, samples), args.id)
+        return
+
+    query = RecordQuery(
+        codes=frozenset(args.code) if args.code else None,
+        pattern=args.grep,
+        id_prefix=args.id_prefix,
+        min_reward=args.min_reward,
+        max_reward=args.max_reward,
+        per_group=args.show,
+        offset=args.offset,
+        limit=args.limit,
+        shapes=args.shapes,
+    )
+    analysis = analyze_run(run, query)
     mode = analysis.get("mode")
 
     if mode == "eval":
@@ -148,17 +245,19 @@ def main() -> None:
             top_k=args.top_k,
             show=args.show,
             only_fails=args.only_fails,
-            inspect_id=args.id,
         )
     elif mode == "selection":
-        if args.id is not None:
-            print("Single-id inspection is currently supported only for eval-mode results.")
-        print_selection_report(analysis, show=args.show)
+        if args.code or args.grep:
+            print("Note: --code/--grep apply only to eval-mode results; ignored for this selection run.")
+        print_selection_report(analysis, show=args.show, samples_path=samples)
     elif mode == "empty":
         print("\nRun contained no records.")
     else:
         print(f"\nUnknown results format. Found {analysis.get('n')} records, but couldn't infer mode.")
 
+    if args.limit is not None and mode in ("eval", "selection"):
+        _print_page(analysis, query)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from course.core.pack_merge import merge_completion_files
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="k-way merge completions files (one per rollout job) into a single selection pack."
+    )
+    p.add_argument("--inputs", type=Path, nargs="+", required=True, help="Completions JSONL files ({id, completion, ...})")
+    p.add_argument("--out", type=Path, required=True, help="Selection pack JSONL to write")
+    p.add_argument(
+        "--index",
+        action="store_true",
+        help="Inputs are not sorted by id: index byte offsets first (memory grows with #ids, not text)",
+    )
+    p.add_argument("--dedupe", action="store_true", help="Drop repeated completions per id (content hash)")
+    p.add_argument("--json", action="store_true", help="Print merge counts as JSON")
+    args = p.parse_args()
+
+    stats = merge_completion_files(args.inputs, args.out, indexed=args.index, dedupe=args.dedupe)
+
+    if args.json:
+        print(json.dumps(stats, indent=2, sort_keys=True))
+        return
+    print(f"Wrote selection pack to: {args.out}")
+    print(
+        f"inputs={stats['n_inputs']} records={stats['n_records']} examples={stats['n_examples']} "
+        f"samples={stats['n_samples']} duplicates_dropped={stats['n_duplicates_dropped']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
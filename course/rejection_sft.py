@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from course.core.rejection import build_rejection_sft
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Rejection sampling: keep verifier-passing samples from a selection pack as an SFT JSONL."
+    )
+    p.add_argument("--dataset", type=Path, required=True, help="Path to dataset JSONL")
+    p.add_argument("--samples", type=Path, required=True, help="Path to selection pack JSONL (id -> samples)")
+    p.add_argument("--n", type=int, default=None, help="Consider only the first N samples per example")
+    p.add_argument("--k", type=int, default=None, help="Keep at most k passing samples per example")
+    p.add_argument("--dedupe", action="store_true", help="Drop repeated completion text within an example")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel processes over pack shards")
+    p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/rejection_sft_<timestamp>)")
+    args = p.parse_args()
+
+    out_dir, summary = build_rejection_sft(
+        dataset_path=args.dataset,
+        samples_path=args.samples,
+        out_dir=args.outdir,
+        k=args.k,
+        dedupe=args.dedupe,
+        n=args.n,
+        workers=args.workers,
+        argv=sys.argv,
+        args=vars(args),
+    )
+
+    counts = summary["counts"]
+    print(f"Wrote SFT set to: {out_dir / 'sft.jsonl'}")
+    print(
+        f"kept={counts['n_kept']} of samples={counts['n_samples']} "
+        f"(examples with any kept: {counts['n_examples_with_kept']}/{counts['n_examples']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+from course.core.rescore import rescore_runs
+from course.core.scoring import SCORER_NAME, SCORER_VERSION
+
+# Same policy selection_demo uses; the student repo only ships the template-backed module.
+DEFAULT_POLICY = (
+    "course.assignments.selection_policy_sol:pick_best"
+    if importlib.util.find_spec("course.assignments.selection_policy_sol") is not None
+    else "course.assignments.selection_policy:pick_best"
+)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Re-score every eval/selection run under a directory with the current scorer version."
+    )
+    p.add_argument("--runs", type=Path, default=Path("runs"), help="Root directory to scan for run dirs")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel processes (one run per task)")
+    p.add_argument("--policy", type=str, default=DEFAULT_POLICY, help="Selection policy as 'package.module:function'")
+    p.add_argument("--include-current", action="store_true", help="Also rescore runs already on the current scorer")
+    p.add_argument("--force", action="store_true", help="Overwrite existing rescored run dirs")
+    p.add_argument("--json", action="store_true", help="Print per-run status as JSON")
+    args = p.parse_args()
+
+    statuses = rescore_runs(
+        args.runs,
+        policy_spec=args.policy,
+        workers=args.workers,
+        include_current=args.include_current,
+        force=args.force,
+    )
+
+    if args.json:
+        print(json.dumps(statuses, indent=2, sort_keys=True))
+    else:
+        print(f"Current scorer: {SCORER_NAME} v{SCORER_VERSION}")
+        for st in statuses:
+            if st["status"] == "rescored":
+                old = st.get("old_value")
+                old_s = "?" if old is None else f"{old:.3f}"
+                print(f"[rescored] {st['run_dir']} ({st['metric']}: {old_s} -> {st['new_value']:.3f}) -> {st['out_dir']}")
+            else:
+                print(f"[{st['status']}] {st['run_dir']}: {st.get('reason', '')}")
+
+    n_ok = sum(1 for st in statuses if st["status"] == "rescored")
+    n_err = sum(1 for st in statuses if st["status"] == "error")
+    print(f"rescored={n_ok} skipped={len(statuses) - n_ok - n_err} errors={n_err}")
+    raise SystemExit(1 if n_err else 0)
+
+
+if __name__ == "__main__":
+    main()
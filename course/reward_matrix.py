@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from course.core.reward_matrix import POLICY_NAMES, run_policy_comparison
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Score a selection pack once into a reward matrix, then compare many selection policies on it."
+    )
+    p.add_argument("--dataset", type=Path, required=True, help="Path to dataset JSONL")
+    p.add_argument("--samples", type=Path, required=True, help="Path to selection pack JSONL (id -> samples)")
+    p.add_argument("--n", type=int, default=None, help="Use only the first N samples per example")
+    p.add_argument(
+        "--policies",
+        nargs="+",
+        default=["index", "default", "shortest", "logprob", "logprob_only", "kl_penalized:0.1"],
+        help=f"Policies to compare: {', '.join(POLICY_NAMES)}",
+    )
+    p.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path("runs/_reward_matrix_cache"),
+        help="Where reward matrices are cached (keyed by dataset/pack hash, N and scorer version)",
+    )
+    p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/policy_compare_<timestamp>)")
+    p.add_argument("--max", type=int, default=None, dest="max_examples", help="Optional cap for quick runs")
+    args = p.parse_args()
+
+    out_dir, summary = run_policy_comparison(
+        dataset_path=args.dataset,
+        samples_path=args.samples,
+        policies=args.policies,
+        cache_dir=args.cache_dir,
+        out_dir=args.outdir,
+        n=args.n,
+        max_examples=args.max_examples,
+        argv=sys.argv,
+        args=vars(args),
+    )
+
+    print(f"Wrote results to: {out_dir}")
+    print(f"matrix: {summary['run']['matrix_path']} ({'cache hit' if summary['run']['matrix_cache_hit'] else 'built'})")
+    for spec, r in summary["policies"].items():
+        print(f"{spec:>20}: pass@1={r['pass_at_1']:.3f}  pass@N={r['pass_at_n']:.3f}  rescued={r['rescued']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from course.core.run_diff import run_diff
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Diff two eval or selection runs by example id: pass/fail flips, outcome-code and completion changes."
+    )
+    p.add_argument("--baseline", type=Path, required=True, help="Baseline run directory (runs/...)")
+    p.add_argument("--candidate", type=Path, required=True, help="Candidate run directory (runs/...)")
+    p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/run_diff_<timestamp>)")
+    p.add_argument("--top-k", type=int, default=10, help="How many outcome-code transitions to list")
+    p.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = p.parse_args()
+
+    out_dir, summary = run_diff(
+        baseline_dir=args.baseline,
+        candidate_dir=args.candidate,
+        out_dir=args.outdir,
+        top_k=args.top_k,
+        argv=sys.argv,
+        args=vars(args),
+    )
+
+    if args.json:
+        print(json.dumps(summary, indent=2, sort_keys=True))
+        return
+    run = summary["run"]
+    print(f"Mode: {run['mode']} ({run['join']} join, paired={summary['n_paired']})")
+    for key, count in summary["table"].items():
+        print(f"  {key:<20} {count:>8}")
+    if summary["code_transitions"]:
+        print("\nTop outcome-code changes:")
+        for t in summary["code_transitions"][: args.top_k]:
+            print(f"  {t['from']} -> {t['to']}: {t['count']}")
+    print(f"\nWrote flipped rows to: {out_dir / 'flips.jsonl'}")
+
+
+if __name__ == "__main__":
+    main()
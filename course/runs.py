@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from course.core.runs_catalog import RunsCatalog, default_catalog_path
+
+
+def _fmt(v: object, width: int, spec: str = "") -> str:
+    if v is None:
+        return f"{'-':>{width}}"
+    return f"{v:>{width}{spec}}"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Query the SQLite catalog of run dirs (refreshed incrementally from manifest/summary/results mtimes)."
+    )
+    p.add_argument("--runs", type=Path, default=Path("runs"), help="Runs root to index")
+    p.add_argument("--catalog", type=Path, default=None, help="Catalog DB (defaults to <runs>/_catalog.sqlite)")
+    p.add_argument("--no-refresh", action="store_true", help="Query the catalog as is, without re-scanning the runs root")
+    p.add_argument("--dataset", type=str, default=None, help="Dataset path, or a prefix of its sha256")
+    p.add_argument("--scorer", type=str, default=None, help="Scorer name")
+    p.add_argument("--scorer-version", type=str, default=None, help="Scorer version")
+    p.add_argument("--script", type=str, default=None, help="Script that wrote the run (eval, selection_demo, ...)")
+    p.add_argument("--mode", choices=["eval", "selection", "other"], default=None, help="Results format")
+    p.add_argument("--full-only", action="store_true", help="Hide sampled (approximate) runs")
+    p.add_argument(
+        "--sort",
+        type=str,
+        default="created_utc",
+        help="created_utc, run_id, n_examples, pass_rate, or any summary metric key (e.g. pass_at_n)",
+    )
+    p.add_argument("--asc", action="store_true", help="Sort ascending (default: descending)")
+    p.add_argument("--limit", type=int, default=50, help="Show at most this many runs (0 = all)")
+    p.add_argument("--show", type=Path, default=None, help="Print everything the catalog holds for one run dir")
+    p.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = p.parse_args()
+
+    db_path = args.catalog or default_catalog_path(args.runs)
+    with RunsCatalog(db_path, runs_root=args.runs) as catalog:
+        if not args.no_refresh:
+            counts = catalog.refresh()
+            if not args.json:
+                print(
+                    f"catalog: {db_path} (runs={counts['n_runs']} indexed={counts['n_indexed']} "
+                    f"unchanged={counts['n_unchanged']} removed={counts['n_removed']})"
+                )
+
+        if args.show is not None:
+            entry = catalog.describe(args.show)
+            if entry is None:
+                raise SystemExit(f"Not in the catalog: {args.show}")
+            print(json.dumps(entry, indent=2, sort_keys=True))
+            return
+
+        rows = catalog.query(
+            dataset=args.dataset,
+            scorer_name=args.scorer,
+            scorer_version=args.scorer_version,
+            script=args.script,
+            mode=args.mode,
+            include_sampled=not args.full_only,
+            sort=args.sort,
+            descending=not args.asc,
+            limit=args.limit or None,
+        )
+
+    if args.json:
+        print(json.dumps(rows, indent=2, sort_keys=True))
+        return
+    extra = args.sort not in ("created_utc", "run_id", "n_examples", "pass_rate")
+    head = f"{args.sort[:12]:>12}  " if extra else ""
+    print(f"{head}{'pass_rate':>9}  {'n':>5}  {'mode':<9}  {'script':<16}  {'scorer':<8}  {'created_utc':<25}  run")
+    for r in rows:
+        col = f"{_fmt(r['sort_value'], 12, '.4g')}  " if extra else ""
+        flag = " (sampled)" if r["sampled"] else ""
+        print(
+            f"{col}{_fmt(r['pass_rate'], 9, '.3f')}  {_fmt(r['n_examples'], 5)}  {r['mode']:<9}  "
+            f"{str(r['script'] or '-'):<16}  {str(r['scorer_version'] or '-'):<8}  "
+            f"{str(r['created_utc'] or '-'):<25}  {r['run_dir']}{flag}"
+        )
+    if not rows:
+        print("(no matching runs)")
+
+
+if __name__ == "__main__":
+    main()
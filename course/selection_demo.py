@@ -5,10 +5,11 @@ import sys
 from pathlib import Path
 
 try:
-    from course.assignments.selection_policy_sol import pick_best
+    from course.assignments import selection_policy_sol as policy_module
 except ImportError:  # student repo uses the template file
-    from course.assignments.selection_policy import pick_best
-from course.core.selection import run_selection_demo
+    from course.assignments import selection_policy as policy_module
+from course.core.scoring import passes_cheap_checks
+from course.core.selection import policy_pick_best, run_selection_demo
 
 
 def main() -> None:
@@ -18,8 +19,52 @@ def main() -> None:
     p.add_argument("--n", type=int, default=None, help="Use only the first N samples per example")
     p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/selection_<timestamp>)")
     p.add_argument("--max", type=int, default=None, dest="max_examples", help="Optional cap for quick runs")
+    p.add_argument(
+        "--pass-at-k",
+        action="store_true",
+        help="Score every sample and report unbiased pass@k for all k in 1..N (compute-vs-accuracy table)",
+    )
+    p.add_argument(
+        "--lazy",
+        action="store_true",
+        help=(
+            "Score samples in tie-break order and stop at the policy's MAX_REWARD (same picks, fewer scorer calls; "
+            "only for policies declaring REFERENCE_RANKING, others run eagerly)"
+        ),
+    )
+    p.add_argument(
+        "--cascade",
+        action="store_true",
+        help="Like --lazy, but skip the scorer for samples that fail cheap format/length checks (same picks)",
+    )
+    p.add_argument(
+        "--verifier",
+        action="append",
+        default=[],
+        dest="verifiers",
+        help="Extra verifier 'package.module:function' (example, completion) -> bool; repeatable",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes to split the pack across (same rows and metrics as 1; the policy is re-imported per worker)",
+    )
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact rows: per-sample arrays + pack byte offsets instead of copied completions",
+    )
     args = p.parse_args()
 
+    pick_best = policy_pick_best(
+        policy_module,
+        lazy=args.lazy or args.cascade,
+        prefilter=passes_cheap_checks if args.cascade else None,
+    )
+    if (args.lazy or args.cascade) and pick_best is policy_module.pick_best:
+        print(f"note: {policy_module.__name__} does not declare REFERENCE_RANKING; running pick_best eagerly")
+
     out_dir, summary = run_selection_demo(
         dataset_path=args.dataset,
         samples_path=args.samples,
@@ -27,12 +72,19 @@ def main() -> None:
         out_dir=args.outdir,
         n=args.n,
         max_examples=args.max_examples,
+        pass_at_k=args.pass_at_k,
+        compact=args.compact,
+        verifiers=args.verifiers,
+        workers=args.workers,
         argv=sys.argv,
         args=vars(args),
     )
 
     print(f"Wrote results to: {out_dir}")
     print(f"pass@1={summary['metrics']['pass_at_1']:.3f}  pass@N={summary['metrics']['pass_at_n']:.3f}")
+    if "pass_at_k" in summary:
+        curve = summary["pass_at_k"]["curve"]
+        print("pass@k: " + "  ".join(f"k={row['k']}:{row['pass_at_k']:.3f}" for row in curve))
 
 
 if __name__ == "__main__":
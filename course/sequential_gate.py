@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from course.core.sequential import sequential_gate
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description="Sequential gate: score a candidate in random order vs a baseline run and stop once PROMOTE/REJECT is settled."
+    )
+    p.add_argument("--baseline", type=Path, required=True, help="Baseline (full) eval run directory")
+    p.add_argument("--dataset", type=Path, required=True, help="Path to dataset JSONL")
+    p.add_argument("--completions", type=Path, required=True, help="Candidate completions JSONL (id -> completion)")
+    p.add_argument("--min-delta", type=float, default=0.0, help="Minimum pass_rate improvement required to PROMOTE")
+    p.add_argument("--confidence", type=float, default=0.95, help="Confidence required before stopping early")
+    p.add_argument("--min-examples", type=int, default=32, help="First look; later looks double it")
+    p.add_argument("--seed", type=int, default=0, help="Seed for the hash-based scoring order")
+    p.add_argument("--outdir", type=Path, default=None, help="Output directory (defaults to runs/seq_gate_<timestamp>)")
+    p.add_argument("--json", action="store_true", help="Print the sequential record (looks + decision) as JSON")
+    args = p.parse_args()
+
+    out_dir, seq = sequential_gate(
+        baseline_dir=args.baseline,
+        dataset_path=args.dataset,
+        completions_path=args.completions,
+        out_dir=args.outdir,
+        min_delta=args.min_delta,
+        confidence=args.confidence,
+        min_examples=args.min_examples,
+        seed=args.seed,
+        argv=sys.argv,
+        args=vars(args),
+    )
+    decision = seq["decision"]
+
+    if args.json:
+        print(json.dumps(seq, indent=2, sort_keys=True))
+    else:
+        print(f"Wrote results to: {out_dir}")
+        print(f"Decision: {decision['decision']}")
+        print(f"Scored: {seq['n_scored']} / {seq['n_population']} (stopped early: {seq['stopped_early']})")
+        if decision.get("delta") is not None:
+            print(f"Delta (estimate): {decision['delta']:.3f}")
+        if decision["reasons"]:
+            print("Reasons:")
+            for r in decision["reasons"]:
+                print(f"- {r}")
+
+    raise SystemExit(0 if decision["decision"] == "PROMOTE" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from course.core.eval import CachedScorer, run_eval
+from course.core.sweep import run_eval_sweep
+from course.core.types import Example
+
+DATASET = Path("data/datasets/math_dev.jsonl")
+COMPLETIONS = Path("data/rollouts/frozen_rollouts_dev.jsonl")
+
+
+def test_follow_matches_batch_eval(tmp_path: Path):
+    # Simulate a writer that emitted lines out of order and hasn't written the last newline yet.
+    lines = COMPLETIONS.read_text(encoding="utf-8").strip().splitlines()
+    growing = tmp_path / "growing.jsonl"
+    growing.write_text("\n".join(reversed(lines[:8])), encoding="utf-8")
+
+    _, batch = run_eval(dataset_path=DATASET, completions_path=growing, out_dir=tmp_path / "batch")
+    out_dir, followed = run_eval(
+        dataset_path=DATASET,
+        completions_path=growing,
+        out_dir=tmp_path / "follow",
+        follow=True,
+        refresh_secs=0.0,
+        idle_timeout=0.0,
+    )
+
+    assert followed["metrics"] == batch["metrics"]
+    assert followed["outcomes"] == batch["outcomes"]
+    assert followed["run"]["n_missing_completions"] == batch["run"]["n_missing_completions"]
+    assert followed["run"]["follow"]["complete"] is True
+
+    on_disk = json.loads((out_dir / "summary.json").read_text(encoding="utf-8"))
+    assert on_disk["run"]["follow"]["complete"] is True
+    rows = (out_dir / "results.jsonl").read_text(encoding="utf-8").strip().splitlines()
+    assert len(rows) == batch["run"]["n_examples"]
+
+
+def test_group_by_slices_partition_the_run(tmp_path: Path):
+    dataset = tmp_path / "ds.jsonl"
+    dataset.write_text(
+        "\n".join(
+            [
+                json.dumps({"id": "a", "prompt": "Compute 2+3.", "expected_answer": 5, "metadata": {"split": "easy"}}),
+                json.dumps({"id": "b", "prompt": "Compute 12*9.", "expected_answer": 108, "metadata": {"split": "hard"}}),
+                json.dumps({"id": "c", "prompt": "Compute 11*2.", "expected_answer": 22}),
+            ]
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    completions = tmp_path / "c.jsonl"
+    completions.write_text(
+        "\n".join(
+            [
+                json.dumps({"id": "a", "completion": "Final: 5"}),
+                json.dumps({"id": "b", "completion": "Final: 107"}),
+                json.dumps({"id": "c", "completion": "Final: 22", "sum_logprob": -1.0, "sum_ref_logprob": -1.5}),
+            ]
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+
+    _, summary = run_eval(
+        dataset_path=dataset,
+        completions_path=completions,
+        out_dir=tmp_path / "run",
+        group_by=["prompt_op", "metadata.split"],
+    )
+
+    ops = summary["slices"]["prompt_op"]
+    assert ops["add"]["n"] == 1 and ops["add"]["pass_rate"] == 1.0
+    assert ops["mul"]["n"] == 2 and ops["mul"]["outcome_counts"] == {"ok": 1, "wrong_answer": 1}
+    assert ops["mul"]["mean_kl_est"] == 0.5
+
+    split = summary["slices"]["metadata.split"]
+    assert set(split) == {"easy", "hard", "<missing>"}
+    assert sum(s["n"] for s in split.values()) == summary["run"]["n_examples"]
+
+
+def test_eval_sweep_matches_single_evals_and_reuses_scores(tmp_path: Path):
+    _, single = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "single")
+    out_dir, sweep = run_eval_sweep(
+        dataset_path=DATASET,
+        completions_paths=[COMPLETIONS, COMPLETIONS],
+        out_dir=tmp_path / "sweep",
+    )
+
+    assert [row["pass_rate"] for row in sweep["curve"]] == [single["metrics"]["pass_rate"]] * 2
+    assert sweep["score_cache"]["hits"] == single["run"]["n_examples"]
+    assert (out_dir / "curve.csv").exists()
+    for row in sweep["curve"]:
+        assert (Path(row["run_dir"]) / "manifest.json").exists()
+
+
+def test_cached_scorer_is_lru_bounded():
+    calls = []
+
+    def scorer(ex, completion):
+        calls.append(completion)
+        return {"reward": 0.0, "details": {}}
+
+    cache = CachedScorer(scorer, max_entries=2)
+    ex = Example(id="a", prompt="p", expected_answer=1)
+    for c in ["x", "y", "x", "z", "y", "x"]:
+        cache(ex, c)
+    # "y" was least recently used when "z" arrived; then "x" after "y" came back.
+    assert calls == ["x", "y", "z", "y", "x"]
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (1, 5, 3, 2)
+
+    uncached = CachedScorer(scorer, max_entries=0)
+    uncached(ex, "x")
+    uncached(ex, "x")
+    assert (uncached.hits, len(uncached)) == (0, 0)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from course.assignments.selection_policy_sol import pick_best
+from course.core.datasets import load_examples
+from course.core.eval import run_eval
+from course.core.gate import RunStatsCache, bootstrap_deltas, gate, gate_tournament, load_run_stats, paired_test
+from course.core.io import iter_jsonl, iter_jsonl_fields, project_jsonl_line
+from course.core.run_diff import run_diff
+from course.core.selection import run_selection_demo
+from course.core.sequential import sequential_gate
+
+DATASET = Path("data/datasets/math_dev.jsonl")
+COMPLETIONS = Path("data/rollouts/frozen_rollouts_dev.jsonl")
+
+
+def test_gate_rejects_sampled_vs_full_run(tmp_path: Path):
+    full_dir, _ = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "full")
+    sampled_dir, summary = run_eval(
+        dataset_path=DATASET,
+        completions_path=COMPLETIONS,
+        out_dir=tmp_path / "sampled",
+        sample_frac=0.5,
+        seed=7,
+    )
+    assert summary["sampling"]["sampled"] is True
+    ci = summary["metrics"]["pass_rate_ci"]
+    assert ci["low"] <= summary["metrics"]["pass_rate"] <= ci["high"]
+
+    decision = gate(baseline=load_run_stats(full_dir), candidate=load_run_stats(sampled_dir))
+    assert decision["decision"] == "REJECT"
+    assert any("sampled vs full" in r for r in decision["reasons"])
+
+
+def test_sampled_eval_is_deterministic(tmp_path: Path):
+    ids = []
+    for name in ("a", "b"):
+        out_dir, _ = run_eval(
+            dataset_path=DATASET,
+            completions_path=COMPLETIONS,
+            out_dir=tmp_path / name,
+            sample_frac=0.5,
+            seed=3,
+        )
+        ids.append((out_dir / "results.jsonl").read_text(encoding="utf-8"))
+    assert ids[0] == ids[1]
+
+
+def test_sampled_eval_ci_level_and_time_budget_checks(tmp_path: Path):
+    cis = {}
+    for level in (0.5, 0.99):
+        _, summary = run_eval(
+            dataset_path=DATASET,
+            completions_path=COMPLETIONS,
+            out_dir=tmp_path / f"ci_{level}",
+            sample_frac=0.5,
+            ci_level=level,
+        )
+        cis[level] = summary["metrics"]["pass_rate_ci"]
+        assert cis[level]["level"] == level
+    assert cis[0.99]["low"] < cis[0.5]["low"] <= cis[0.5]["high"] < cis[0.99]["high"]
+
+    for budget in (0, -1.0):
+        with pytest.raises(ValueError, match="time_budget must be > 0"):
+            run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "tb", time_budget=budget)
+
+
+def test_gate_tournament_loads_each_run_once(tmp_path: Path):
+    good_dir, _ = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "good")
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text("".join(json.dumps({"id": ex.id, "completion": "Final: -1"}) + "\n" for ex in load_examples(DATASET)))
+    bad_dir, _ = run_eval(dataset_path=DATASET, completions_path=bad, out_dir=tmp_path / "bad")
+
+    cache = RunStatsCache()
+    result = gate_tournament(baseline=bad_dir, candidates=[bad_dir, good_dir, good_dir], cache=cache)
+    assert [r["decision"] for r in result["ranking"]] == ["PROMOTE", "PROMOTE", "PROMOTE"]
+    assert result["ranking"][0]["run_dir"] == str(good_dir.resolve())
+    assert (cache.misses, cache.hits) == (2, 2)
+
+    pairs = gate_tournament(candidates=[bad_dir, good_dir])
+    assert [(r["run_dir"], r["decision"], r["wins"]) for r in pairs["ranking"]] == [
+        (str(good_dir.resolve()), "PROMOTE", 1),
+        (str(bad_dir.resolve()), "REJECT", 0),
+    ]
+
+
+def test_paired_gate_same_table_sorted_or_shuffled_and_can_require_significance(tmp_path: Path):
+    good_dir, _ = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "good")
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text("".join(json.dumps({"id": ex.id, "completion": "Final: -1"}) + "\n" for ex in load_examples(DATASET)))
+    bad_dir, _ = run_eval(dataset_path=DATASET, completions_path=bad, out_dir=tmp_path / "bad")
+
+    sorted_result = paired_test(bad_dir, good_dir)
+    assert sorted_result["join"] == "sorted"
+    n_pass = sorted_result["table"]["fail_to_pass"]
+    assert n_pass > 0 and sorted_result["table"]["pass_to_fail"] == 0
+    assert sorted_result["mcnemar_p"] == min(1.0, 2 * 0.5**n_pass)
+
+    results = good_dir / "results.jsonl"
+    lines = results.read_text(encoding="utf-8").splitlines(keepends=True)
+    random.Random(0).shuffle(lines)
+    results.write_text("".join(lines), encoding="utf-8")
+    shuffled = paired_test(bad_dir, good_dir)
+    assert shuffled["join"] == "indexed"
+    assert shuffled["table"] == sorted_result["table"]
+
+    base, cand = load_run_stats(bad_dir), load_run_stats(good_dir)
+    assert gate(baseline=base, candidate=cand, paired=shuffled)["decision"] == "PROMOTE"
+    strict = gate(baseline=base, candidate=cand, paired=shuffled, require_significance=True, alpha=0.5**n_pass)
+    assert strict["decision"] == "REJECT"
+    assert any(r.startswith("NotSignificant") for r in strict["reasons"])
+
+
+def test_sequential_gate_stops_early_on_a_clearly_worse_candidate(tmp_path: Path):
+    dataset = tmp_path / "ds.jsonl"
+    rows = [{"id": f"ex-{i:04d}", "prompt": f"Compute {i}+0.", "expected_answer": i} for i in range(1000)]
+    dataset.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    good = tmp_path / "good.jsonl"
+    good.write_text(
+        "".join(json.dumps({"id": r["id"], "completion": f"Final: {r['expected_answer']}"}) + "\n" for r in rows),
+        encoding="utf-8",
+    )
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text("".join(json.dumps({"id": r["id"], "completion": "Final: -1"}) + "\n" for r in rows))
+    base_dir, base_summary = run_eval(dataset_path=dataset, completions_path=good, out_dir=tmp_path / "base")
+    assert base_summary["metrics"]["pass_rate"] == 1.0
+
+    out_dir, seq = sequential_gate(baseline_dir=base_dir, dataset_path=dataset, completions_path=bad, out_dir=tmp_path / "seq")
+    assert seq["decision"]["decision"] == "REJECT" and seq["stopped_early"]
+    assert seq["n_scored"] < 100
+    # The partial run is recorded as sampled, so the ordinary gate will not mistake it for a full eval.
+    assert load_run_stats(out_dir).sampled
+
+    _, same = sequential_gate(baseline_dir=base_dir, dataset_path=dataset, completions_path=good, out_dir=tmp_path / "same")
+    assert same["decision"]["decision"] == "PROMOTE"
+
+    other = tmp_path / "other.jsonl"
+    other.write_text(dataset.read_text(encoding="utf-8").replace("Compute 1+0.", "Compute 1+0 "), encoding="utf-8")
+    _, locked = sequential_gate(baseline_dir=base_dir, dataset_path=other, completions_path=good, out_dir=tmp_path / "lr")
+    assert locked["n_scored"] == 0 and locked["decision"]["decision"] == "REJECT"
+    assert any("dataset_sha256" in r for r in locked["decision"]["reasons"])
+
+
+def test_bootstrap_ci_in_gate_output_and_as_a_criterion(tmp_path: Path):
+    good_dir, good = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "good")
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text("".join(json.dumps({"id": ex.id, "completion": "Final: -1"}) + "\n" for ex in load_examples(DATASET)))
+    bad_dir, _ = run_eval(dataset_path=DATASET, completions_path=bad, out_dir=tmp_path / "bad")
+
+    boot = bootstrap_deltas(bad_dir, good_dir, n_resamples=2000, seed=3)
+    ci = boot["pass_rate_delta"]
+    assert ci["estimate"] == good["metrics"]["pass_rate"]
+    assert 0.0 < ci["low"] <= ci["estimate"] <= ci["high"]
+    assert boot["outcome_code_deltas"]["ok"]["estimate"] == ci["estimate"]
+    assert boot["outcome_code_deltas"]["wrong_answer"]["estimate"] < 0
+
+    base, cand = load_run_stats(bad_dir), load_run_stats(good_dir)
+    ok = gate(baseline=base, candidate=cand, bootstrap=boot, require_ci=True)
+    assert ok["decision"] == "PROMOTE" and ok["bootstrap"]["pass_rate_delta"] == ci
+    strict = gate(baseline=base, candidate=cand, min_delta=ci["low"] + 1e-9, bootstrap=boot, require_ci=True)
+    assert strict["decision"] == "REJECT"
+    assert any(r.startswith("CIBelowMinDelta") for r in strict["reasons"])
+
+
+def test_run_diff_counts_flips_and_survives_unsorted_results(tmp_path: Path):
+    good_dir, good = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "good")
+    rows = (good_dir / "results.jsonl").read_text(encoding="utf-8").splitlines()
+    bad_dir = tmp_path / "bad"
+    bad_dir.mkdir()
+    flipped, out = [], []
+    for line in reversed(rows):  # unsorted: forces the indexed join after a restart
+        rec = json.loads(line)
+        if rec["reward"] == 1.0:
+            rec.update(reward=0.0, outcome_code="wrong_answer")
+            flipped.append(rec["id"])
+        out.append(json.dumps(rec) + "\n")
+    (bad_dir / "results.jsonl").write_text("".join(out), encoding="utf-8")
+
+    out_dir, summary = run_diff(baseline_dir=good_dir, candidate_dir=bad_dir, out_dir=tmp_path / "diff")
+    assert summary["run"]["join"] == "indexed"
+    assert summary["n_paired"] == len(rows)
+    assert summary["table"]["pass_to_fail"] == good["metrics"]["n_pass"] == len(flipped)
+    assert summary["table"]["fail_to_pass"] == summary["table"]["completion_changed"] == 0
+    assert summary["code_transitions"] == [{"from": "ok", "to": "wrong_answer", "count": len(flipped)}]
+    flips = [json.loads(line) for line in (out_dir / "flips.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert sorted(f["id"] for f in flips) == sorted(flipped)
+
+
+def test_run_diff_compares_pick_index_against_compact_runs(tmp_path: Path):
+    pack = Path("data/rollouts/selection_pack_dev.jsonl")
+    runs = {}
+    for name, kwargs in (("full", {}), ("compact", {"compact": True}), ("n1", {"compact": True, "n": 1})):
+        runs[name], _ = run_selection_demo(
+            dataset_path=DATASET, samples_path=pack, pick_best=pick_best, out_dir=tmp_path / name, **kwargs
+        )
+
+    _, same = run_diff(baseline_dir=runs["full"], candidate_dir=runs["compact"], out_dir=tmp_path / "d1")
+    assert same["table"]["completion_changed"] == 0
+    assert same["flips"]["n_written"] == 0
+
+    _, fewer = run_diff(baseline_dir=runs["full"], candidate_dir=runs["n1"], out_dir=tmp_path / "d2")
+    full_rows = [json.loads(line) for line in (runs["full"] / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert fewer["table"]["completion_changed"] == sum(r["best_of_n"]["index"] != 0 for r in full_rows) > 0
+    n_flips = len((tmp_path / "d2" / "flips.jsonl").read_text(encoding="utf-8").splitlines())
+    assert fewer["flips"]["n_written"] == n_flips
+
+
+def test_projected_rows_match_full_parse(tmp_path: Path):
+    run_dir, _ = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=tmp_path / "run")
+    rows = list(iter_jsonl(run_dir / "results.jsonl"))
+    fields = ("id", "reward", "outcome_code")
+    for separators in ((", ", ": "), (",", ":"), (", ", " : "), (" ,\t", "\t:  ")):
+        path = tmp_path / "rows.jsonl"
+        path.write_text(
+            "".join(json.dumps(r, sort_keys=True, separators=separators) + "\n" for r in rows), encoding="utf-8"
+        )
+        projected = list(iter_jsonl_fields(path, fields))
+        assert projected == [{k: r[k] for k in fields} for r in rows], separators
+
+    # Whitespace before the colon is still a key, not an absent field.
+    assert project_jsonl_line('{"id": "a", "reward" : 1.0}', ("id", "reward"), lineno=1, source="t") == {
+        "id": "a",
+        "reward": 1.0,
+    }
+    # The key text used as a value is skipped.
+    assert project_jsonl_line('{"reward": 0.5, "id": "reward"}', ("reward",), lineno=1, source="t") == {"reward": 0.5}
+
+    def p(line: str, **kw):
+        return project_jsonl_line(line, ("reward",), lineno=1, source="t", **kw)
+
+    # Only a nested match: falls back to the full row (which has no top-level reward).
+    assert p('{"a": {"reward": 1}, "b": 2}') == {"a": {"reward": 1}, "b": 2}
+    assert p('{"reward": 0, "a": {"reward": 1}}') == {"reward": 0, "a": {"reward": 1}}
+    # Key text inside a string value is escaped, so it never matches.
+    assert p('{"x": "say \\"reward\\": 5", "reward": 2}') == {"reward": 2}
+    # A required field that is absent returns the full row.
+    row = '{"reward": 1, "details": {}}'
+    full = project_jsonl_line(row, ("reward", "outcome_code"), require=("outcome_code",), lineno=1, source="t")
+    assert full == {"reward": 1, "details": {}}
+    assert p("  \n") is None
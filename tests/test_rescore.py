@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from course.assignments.selection_policy_sol import pick_best
+from course.core.eval import run_eval
+from course.core.rescore import rescore_runs, rescored_dir_for
+from course.core.selection import run_selection_demo
+
+POLICY = "course.assignments.selection_policy_sol:pick_best"
+
+
+def test_rescore_reproduces_eval_and_selection_runs(tmp_path: Path):
+    runs = tmp_path / "runs"
+    eval_dir, eval_summary = run_eval(
+        dataset_path=Path("data/datasets/math_dev.jsonl"),
+        completions_path=Path("data/rollouts/frozen_rollouts_dev.jsonl"),
+        out_dir=runs / "eval_a",
+    )
+    sel_dir, sel_summary = run_selection_demo(
+        dataset_path=Path("data/datasets/math_dev.jsonl"),
+        samples_path=Path("data/rollouts/selection_pack_dev.jsonl"),
+        pick_best=pick_best,
+        out_dir=runs / "sel_a",
+        n=4,
+        argv=[],
+    )
+
+    # Both runs are already on the current scorer: skipped unless asked.
+    assert {s["status"] for s in rescore_runs(runs, policy_spec=POLICY)} == {"skipped"}
+
+    statuses = rescore_runs(runs, policy_spec=POLICY, include_current=True)
+    assert sorted(s["status"] for s in statuses) == ["rescored", "rescored"]
+
+    new_eval = rescored_dir_for(eval_dir)
+    assert (new_eval / "results.jsonl").read_text() == (eval_dir / "results.jsonl").read_text()
+    new_sel = json.loads((rescored_dir_for(sel_dir) / "summary.json").read_text())
+    assert new_sel["metrics"] == sel_summary["metrics"]
+
+    manifest = json.loads((new_eval / "manifest.json").read_text())
+    old_manifest = json.loads((eval_dir / "manifest.json").read_text())
+    assert manifest["inputs"] == old_manifest["inputs"]
+    assert manifest["extra"]["rescored_from"]["run_dir"] == str(eval_dir)
+
+
+def test_rescore_rehydrates_compact_selection_runs_from_the_pack(tmp_path: Path):
+    pack = Path("data/rollouts/selection_pack_dev.jsonl")
+    records = pack.read_text(encoding="utf-8").splitlines()
+    short_pack = tmp_path / "pack.jsonl"
+    short_pack.write_text("\n".join(records[1:]) + "\n", encoding="utf-8")  # first example missing
+
+    sel_dir, sel_summary = run_selection_demo(
+        dataset_path=Path("data/datasets/math_dev.jsonl"),
+        samples_path=short_pack,
+        pick_best=pick_best,
+        out_dir=tmp_path / "runs" / "sel_compact",
+        compact=True,
+        argv=[],
+    )
+    [status] = rescore_runs(tmp_path / "runs", policy_spec=POLICY, include_current=True)
+    assert status["status"] == "rescored", status
+
+    new_dir = rescored_dir_for(sel_dir)
+    assert (new_dir / "results.jsonl").read_text() == (sel_dir / "results.jsonl").read_text()
+    new_summary = json.loads((new_dir / "summary.json").read_text())
+    assert new_summary["metrics"] == sel_summary["metrics"]
+    assert new_summary["run"]["results_format"] == "compact"
+    assert new_summary["run"]["n_missing_samples"] == 1
+
+    short_pack.write_text("\n".join(reversed(records)) + "\n", encoding="utf-8")  # offsets now point elsewhere
+    [status] = rescore_runs(tmp_path / "runs", policy_spec=POLICY, include_current=True, force=True)
+    assert status["status"] == "error" and "changed since the run" in status["reason"]
+
+
+def test_rescore_keeps_missing_examples_missing_in_full_and_compact_runs(tmp_path: Path):
+    records = Path("data/rollouts/selection_pack_dev.jsonl").read_text(encoding="utf-8").splitlines()
+    pack = tmp_path / "pack.jsonl"
+    pack.write_text("\n".join(records[2:]) + "\n", encoding="utf-8")  # two examples missing
+
+    runs = tmp_path / "runs"
+    originals = {}
+    for name, compact in (("full", False), ("compact", True), ("legacy", False)):
+        out_dir, summary = run_selection_demo(
+            dataset_path=Path("data/datasets/math_dev.jsonl"),
+            samples_path=pack,
+            pick_best=pick_best,
+            out_dir=runs / name,
+            compact=compact,
+            argv=[],
+        )
+        assert summary["run"]["n_missing_samples"] == 2
+        originals[name] = summary
+    # Runs written before rows were flagged: only the lone empty fail-safe sample marks them.
+    legacy = runs / "legacy" / "results.jsonl"
+    rows = [json.loads(line) for line in legacy.read_text(encoding="utf-8").splitlines()]
+    assert sum(r.pop("missing_samples", False) for r in rows) == 2
+    legacy.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+
+    statuses = rescore_runs(runs, policy_spec=POLICY, include_current=True)
+    assert [s["status"] for s in statuses] == ["rescored"] * 3
+    for name, summary in originals.items():
+        new = json.loads((rescored_dir_for(runs / name) / "summary.json").read_text())
+        assert new["run"]["n_missing_samples"] == 2, name
+        assert new["metrics"] == summary["metrics"], name
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+import shutil
+from pathlib import Path
+
+from course.core.eval import run_eval
+from course.core.gate import load_run_stats
+from course.core.runs_catalog import RunsCatalog
+
+DATASET = Path("data/datasets/math_dev.jsonl")
+COMPLETIONS = Path("data/rollouts/frozen_rollouts_dev.jsonl")
+
+
+def _bad_completions(tmp_path: Path) -> Path:
+    ids = [json.loads(line)["id"] for line in DATASET.read_text(encoding="utf-8").splitlines() if line.strip()]
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text("".join(json.dumps({"id": i, "completion": "Final: -1"}) + "\n" for i in ids), encoding="utf-8")
+    return bad
+
+
+def test_catalog_matches_load_run_stats_and_refreshes_incrementally(tmp_path: Path):
+    runs = tmp_path / "runs"
+    good_dir, _ = run_eval(dataset_path=DATASET, completions_path=COMPLETIONS, out_dir=runs / "good")
+    bad_dir, _ = run_eval(dataset_path=DATASET, completions_path=_bad_completions(tmp_path), out_dir=runs / "sweep" / "bad")
+
+    with RunsCatalog(runs / "_catalog.sqlite") as catalog:
+        assert catalog.refresh() == {"n_runs": 2, "n_indexed": 2, "n_unchanged": 0, "n_removed": 0}
+        assert catalog.run_stats(good_dir) == load_run_stats(good_dir)
+        assert catalog.refresh()["n_unchanged"] == 2
+
+        rows = catalog.query(dataset=str(DATASET), scorer_version=load_run_stats(good_dir).scorer_version, sort="pass_rate")
+        assert [Path(r["run_dir"]) for r in rows] == [good_dir.resolve(), bad_dir.resolve()]
+        assert catalog.find("bad") == [bad_dir.resolve()]
+
+        # Rewriting a run re-indexes just that run; deleting one drops its row.
+        run_eval(dataset_path=DATASET, completions_path=_bad_completions(tmp_path), out_dir=good_dir)
+        assert catalog.refresh() == {"n_runs": 2, "n_indexed": 1, "n_unchanged": 1, "n_removed": 0}
+        assert catalog.run_stats(good_dir).pass_rate == 0.0
+        shutil.rmtree(bad_dir)
+        assert catalog.refresh()["n_removed"] == 1
+        assert catalog.find("bad") == []
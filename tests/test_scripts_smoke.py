@@ -4,8 +4,10 @@ import json
 from pathlib import Path
 
 from course.core.eval import run_eval
-from course.core.inspect import analyze_run, resolve_run
+from course.core.html_report import write_html_report
+from course.core.inspect import RecordQuery, analyze_run, find_record, resolve_run
 from course.core.selection import run_selection_demo
+from course.core.shapes import ShapeAccumulator, completion_shape
 
 try:
     from course.assignments.selection_policy_sol import pick_best as _pick_best
@@ -87,3 +89,75 @@ def test_eval_logprob_kl_support(tmp_path: Path):
     lines = (out_dir / "results.jsonl").read_text(encoding="utf-8").strip().splitlines()
     rec0 = json.loads(lines[0])
     assert rec0["kl_est"] is not None
+
+
+def test_inspect_query_filters_and_pages_with_bounded_groups():
+    run = resolve_run(Path("runs/l0_build_eval"))
+    full = analyze_run(run, RecordQuery(per_group=1))
+    assert full["n"] == full["n_matched"] == 20
+    assert all(len(g) == 1 for g in full["groups"].values())
+    assert sum(full["by_code"].values()) == 20
+
+    q = RecordQuery(codes=frozenset({"wrong_answer"}), pattern=r"^Final: \d+$", offset=1, limit=2)
+    page = analyze_run(run, q)
+    assert page["n"] == 20 and page["n_matched"] == 4
+    assert page["matched_by_code"] == {"wrong_answer": 4}
+    assert [r["id"] for r in page["page"]] == ["dev-0007", "dev-0012"]
+
+    rec = find_record(run.results_path, "dev-0012")
+    assert rec is not None and rec["id"] == "dev-0012"
+    assert find_record(run.results_path, "nope") is None
+
+
+def test_failure_shapes_mask_digits_and_show_whitespace():
+    assert completion_shape("Final: 1,024") == "Final:·#,#  [len 9-16]"
+    assert completion_shape("Final:\t7\n") == "Final:\\t#\\n  [len 9-16]"
+    assert completion_shape("x" * 100, max_chars=4) == "xxxx…  [len 65-128]"
+    # A digit run crossing 2*max_chars raw characters is still one "#", so the
+    # shape does not depend on the run's length.
+    for n_digits in (10, 13, 14, 20):
+        assert completion_shape("ab " + "1" * n_digits + " x", max_chars=8).startswith("ab·#·x  [len ")
+    assert completion_shape("ab " + "1" * 20 + " xyz", max_chars=6) == "ab·#·x…  [len 17-32]"
+    assert completion_shape("\n" * 10, max_chars=8) == "\\n" * 4 + "…  [len 9-16]"
+
+    acc = ShapeAccumulator(n_exemplars=1)
+    for i, text in enumerate(["Final: 1.5", "Final: 22.0", "Final: abc"]):
+        acc.add("non_digit_characters", f"id-{i}", text)
+    top = acc.top(1)["non_digit_characters"]
+    assert top == [{"shape": "Final:·#.#  [len 9-16]", "count": 2, "exemplars": [{"id": "id-0", "completion": "Final: 1.5"}]}]
+
+    analysis = analyze_run(resolve_run(Path("runs/l0_build_eval")), RecordQuery(shapes=5))
+    assert "ok" not in analysis["shapes"]
+    assert sum(s["count"] for rows in analysis["shapes"].values() for s in rows) == analysis["n_fail"]
+
+
+def test_html_report_pages_each_outcome_code(tmp_path: Path):
+    stats = write_html_report(Path("runs/l0_build_eval"), tmp_path / "report", rows_per_page=3)
+    assert stats["mode"] == "eval" and stats["n"] == 20
+    assert stats["codes"]["ok"] == {"n_rows": 4, "n_pages": 2}
+    page1 = (tmp_path / "report" / "ok" / "page-0001.html").read_text(encoding="utf-8")
+    page2 = (tmp_path / "report" / "ok" / "page-0002.html").read_text(encoding="utf-8")
+    assert page1.count("<tr><td>") == 3 and 'href="page-0002.html"' in page1
+    assert page2.count("<tr><td>") == 1 and "next" not in page2
+    index = (tmp_path / "report" / "index.html").read_text(encoding="utf-8")
+    assert 'href="wrong_answer/page-0002.html"' in index
+
+    sel = write_html_report(Path("runs/l0_5_build_sel_n4"), tmp_path / "sel")
+    assert sel["mode"] == "selection"
+    assert sum(c["n_rows"] for c in sel["codes"].values()) == sel["n"] == 20
+
+    # Compact rows are rehydrated from the pack: same pages as the full run.
+    for fmt in ("full", "compact"):
+        run_selection_demo(
+            dataset_path=Path("data/datasets/math_dev.jsonl"),
+            samples_path=Path("data/rollouts/selection_pack_dev.jsonl"),
+            pick_best=_pick_best,
+            out_dir=tmp_path / f"sel_{fmt}",
+            compact=fmt == "compact",
+        )
+        write_html_report(tmp_path / f"sel_{fmt}", tmp_path / f"report_{fmt}")
+    pages = sorted((tmp_path / "report_full").glob("*/page-*.html"))
+    assert pages
+    for page in pages:
+        compact_page = tmp_path / "report_compact" / page.relative_to(tmp_path / "report_full")
+        assert compact_page.read_text(encoding="utf-8") == page.read_text(encoding="utf-8")
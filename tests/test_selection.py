@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import csv
+import json
+import random
+import types
+from pathlib import Path
+
+import pytest
+
+from course.assignments import selection_policy_sol
+from course.assignments.selection_policy_sol import pick_best
+from course.core.datasets import index_by_id, load_examples
+from course.core.inspect import rehydrate_selection_row
+from course.core.pack_merge import merge_completion_files
+from course.core.rejection import build_rejection_sft
+from course.core.reward_matrix import build_reward_matrix, export_advantages, group_advantages, run_policy_comparison
+from course.core.rollouts import iter_selection_pack, load_selection_pack
+from course.core.scoring import passes_cheap_checks, score
+from course.core.selection import (
+    VERIFIER_REJECTED_CODE,
+    LazyPickBest,
+    LazyPolicy,
+    lazy_pick_best,
+    make_lazy_pick_best,
+    policy_pick_best,
+    run_selection_demo,
+    with_verifiers,
+)
+from course.core.types import Example, RolloutSample
+
+DATASET = Path("data/datasets/math_dev.jsonl")
+PACK = Path("data/rollouts/selection_pack_dev.jsonl")
+
+
+def _write_pack(path: Path, records: list[dict]) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return path
+
+
+def test_iter_selection_pack_keeps_loader_checks(tmp_path: Path):
+    dup = _write_pack(tmp_path / "dup.jsonl", [{"id": "a", "samples": []}, {"id": "a", "samples": []}])
+    with pytest.raises(ValueError, match="Duplicate selection-pack id"):
+        list(iter_selection_pack(dup))
+
+    bad = _write_pack(tmp_path / "bad.jsonl", [{"id": "a", "samples": "Final: 1"}])
+    with pytest.raises(ValueError, match="list 'samples'"):
+        list(iter_selection_pack(bad))
+
+    capped = _write_pack(tmp_path / "ok.jsonl", [{"id": "a", "samples": ["x", "y", "z"]}])
+    [(ex_id, samples)] = list(iter_selection_pack(capped, max_samples=2))
+    assert ex_id == "a" and [s.completion for s in samples] == ["x", "y"]
+
+
+def test_streaming_selection_writes_rows_in_dataset_order(tmp_path: Path):
+    records = [json.loads(line) for line in PACK.read_text(encoding="utf-8").splitlines()[:3]]
+    pack = _write_pack(tmp_path / "pack.jsonl", [records[2], records[0]])
+
+    out_dir, summary = run_selection_demo(
+        dataset_path=DATASET,
+        samples_path=pack,
+        pick_best=pick_best,
+        out_dir=tmp_path / "run",
+        max_examples=3,
+    )
+    ids = [json.loads(line)["id"] for line in (out_dir / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+    # Shuffled pack, example 1 missing: rows still follow the dataset.
+    assert ids == [records[0]["id"], records[1]["id"], records[2]["id"]]
+    assert summary["run"]["n_missing_samples"] == 1
+    assert not (out_dir / "results.jsonl.part").exists()
+
+
+def test_pass_at_k_curve_endpoints_match_selection_metrics(tmp_path: Path):
+    _, summary = run_selection_demo(
+        dataset_path=DATASET,
+        samples_path=PACK,
+        pick_best=pick_best,
+        out_dir=tmp_path / "run",
+        pass_at_k=True,
+    )
+    curve = summary["pass_at_k"]["curve"]
+    assert [row["k"] for row in curve] == [1, 2, 3, 4]
+    # With a reward-maximizing policy, pass@N is exactly "any sample correct".
+    assert curve[-1]["pass_at_k"] == pytest.approx(summary["metrics"]["pass_at_n"])
+    assert all(a["pass_at_k"] <= b["pass_at_k"] for a, b in zip(curve, curve[1:]))
+
+
+def test_lazy_pick_best_matches_eager_policy_with_fewer_scores():
+    policy = LazyPolicy.from_module(selection_policy_sol)
+    rng = random.Random(0)
+    pool = ["Final: 22", "Final: 23", "Final:  22", "22", "Final: 022", "Final: 22\n"]
+    lazy_calls = eager_calls = 0
+
+    def counting(counter: str):
+        def _score(example, completion):
+            nonlocal lazy_calls, eager_calls
+            if counter == "lazy":
+                lazy_calls += 1
+            else:
+                eager_calls += 1
+            return score(example, completion)
+
+        return _score
+
+    ex = Example(id="x", prompt="Compute 11*2.", expected_answer=22)
+    for _ in range(200):
+        samples = [
+            RolloutSample(completion=rng.choice(pool), sum_logprob=rng.choice([None, -1.0, -2.0]))
+            for _ in range(rng.randint(1, 6))
+        ]
+        eager = pick_best(ex, samples, scorer=counting("eager"))
+        idx, _sample, scored = lazy_pick_best(ex, samples, policy=policy, scorer=counting("lazy"))
+        assert idx == eager.best_index
+        assert scored["reward"] == eager.scored["reward"]
+
+    assert lazy_calls < eager_calls
+
+
+def test_lazy_entry_point_falls_back_to_a_custom_pick_best():
+    def latest_winner(example, samples, *, scorer=score):
+        # Custom ranking: among the best rewards, the *last* sample wins.
+        rewards = [float(scorer(example, s.completion)["reward"]) for s in samples]
+        i = max(range(len(samples)), key=lambda j: (rewards[j], j))
+        return i, samples[i], scorer(example, samples[i].completion)
+
+    custom = types.ModuleType("custom_policy")
+    custom.pick_best = latest_winner
+    custom.tie_break_key = selection_policy_sol.tie_break_key
+    custom.MAX_REWARD = 1.0
+
+    assert isinstance(policy_pick_best(selection_policy_sol, lazy=True), LazyPickBest)
+    assert policy_pick_best(custom, lazy=True) is latest_winner
+    assert policy_pick_best(custom, prefilter=passes_cheap_checks) is latest_winner
+
+    rng = random.Random(2)
+    ex = Example(id="x", prompt="Compute 11*2.", expected_answer=22)
+    pool = ["Final: 22", "Final: 23", "Final: 22 ", "22"]
+    for _ in range(100):
+        samples = [RolloutSample(completion=rng.choice(pool)) for _ in range(rng.randint(1, 6))]
+        eager_idx = latest_winner(ex, samples)[0]
+        for lazy, prefilter in ((True, None), (False, passes_cheap_checks)):
+            picked = policy_pick_best(custom, lazy=lazy, prefilter=prefilter)(ex, samples, scorer=score)
+            assert picked[0] == eager_idx
+
+
+def test_compact_rows_rehydrate_to_full_rows(tmp_path: Path):
+    full_dir, full = run_selection_demo(
+        dataset_path=DATASET, samples_path=PACK, pick_best=pick_best, out_dir=tmp_path / "full"
+    )
+    compact_dir, compact = run_selection_demo(
+        dataset_path=DATASET, samples_path=PACK, pick_best=pick_best, out_dir=tmp_path / "compact", compact=True
+    )
+    assert compact["metrics"] == full["metrics"]
+    assert compact["run"]["results_format"] == "compact"
+
+    full_text = (full_dir / "results.jsonl").read_text(encoding="utf-8")
+    compact_text = (compact_dir / "results.jsonl").read_text(encoding="utf-8")
+    assert len(compact_text) < len(full_text)
+
+    for full_line, compact_line in zip(full_text.splitlines(), compact_text.splitlines()):
+        f_row, c_row = json.loads(full_line), json.loads(compact_line)
+        c_row = rehydrate_selection_row(c_row, PACK)
+        assert c_row["baseline"]["completion"] == f_row["baseline"]["completion"]
+        assert c_row["best_of_n"]["completion"] == f_row["best_of_n"]["completion"]
+        assert c_row["samples"]["reward"][c_row["best_of_n"]["index"]] == f_row["best_of_n"]["reward"]
+
+
+def test_reward_matrix_policies_match_selection_and_reuse_cache(tmp_path: Path):
+    _, sel = run_selection_demo(dataset_path=DATASET, samples_path=PACK, pick_best=pick_best, out_dir=tmp_path / "sel")
+    kwargs = dict(
+        dataset_path=DATASET,
+        samples_path=PACK,
+        policies=["default", "index", "logprob_only"],
+        cache_dir=tmp_path / "cache",
+    )
+    _, first = run_policy_comparison(out_dir=tmp_path / "a", **kwargs)
+    _, second = run_policy_comparison(out_dir=tmp_path / "b", **kwargs)
+
+    assert not first["run"]["matrix_cache_hit"] and second["run"]["matrix_cache_hit"]
+    assert first["policies"] == second["policies"]
+    default = first["policies"]["default"]
+    assert default["pass_at_1"] == pytest.approx(sel["metrics"]["pass_at_1"])
+    assert default["pass_at_n"] == pytest.approx(sel["metrics"]["pass_at_n"])
+    assert default["rescued"] == sel["metrics"]["rescued"]
+    # Without the verifier there is nothing to rescue with.
+    assert first["policies"]["logprob_only"]["pass_at_n"] <= default["pass_at_n"]
+
+    with pytest.raises(ValueError, match="Unknown policy"):
+        run_policy_comparison(out_dir=tmp_path / "c", **{**kwargs, "policies": ["nope"]})
+
+
+def test_cascade_with_verifier_matches_eager_selection():
+    verifier_calls = []
+
+    def no_trailing_newline(example, completion):
+        verifier_calls.append(completion)
+        return not completion.endswith("\n")
+
+    verified = with_verifiers(score, [no_trailing_newline])
+    policy = LazyPolicy.from_module(selection_policy_sol)
+    rng = random.Random(1)
+    pool = ["Final: 22", "Final: 22\n", "Final: 23", "Final:  22", "22", "Final: -22", " Final: 22 ", "Final: 2\n2", ""]
+    ex = Example(id="x", prompt="Compute 11*2.", expected_answer=22)
+
+    for completion in pool:
+        if not passes_cheap_checks(ex, completion):
+            assert score(ex, completion)["reward"] == 0.0
+
+    for _ in range(300):
+        samples = [
+            RolloutSample(completion=rng.choice(pool), sum_logprob=rng.choice([None, -1.0, -2.0]))
+            for _ in range(rng.randint(1, 6))
+        ]
+        eager = pick_best(ex, samples, scorer=verified)
+        idx, _sample, scored = lazy_pick_best(ex, samples, policy=policy, scorer=verified, prefilter=passes_cheap_checks)
+        assert idx == eager.best_index
+        assert scored == eager.scored
+
+    assert score(ex, "Final: 22\n")["reward"] == 1.0
+    assert verified(ex, "Final: 22\n")["details"]["result"]["code"] == VERIFIER_REJECTED_CODE
+    assert verifier_calls
+
+
+def test_merge_completion_files_rebuilds_pack_sorted_or_indexed(tmp_path: Path):
+    pack = load_selection_pack(PACK)
+    jobs = [tmp_path / f"job{j}.jsonl" for j in range(4)]
+    for j, path in enumerate(jobs):
+        _write_pack(path, [{"id": ex_id, "completion": s[j].completion} for ex_id, s in sorted(pack.items())])
+
+    merged = merge_completion_files(jobs, tmp_path / "sorted.jsonl")
+    rebuilt = load_selection_pack(tmp_path / "sorted.jsonl")
+    assert merged["n_examples"] == len(pack) and merged["n_samples"] == 4 * len(pack)
+    assert {k: [s.completion for s in v] for k, v in rebuilt.items()} == {
+        k: [s.completion for s in v] for k, v in pack.items()
+    }
+    assert rebuilt["dev-0001"][2].meta["provenance"]["file"] == str(jobs[2])
+
+    for path in jobs:  # shuffle lines: sorted mode refuses, indexed mode gives the same pack
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+        random.Random(str(path)).shuffle(lines)
+        path.write_text("".join(lines), encoding="utf-8")
+    with pytest.raises(ValueError, match="not sorted by id"):
+        merge_completion_files(jobs, tmp_path / "bad.jsonl")
+    merge_completion_files(jobs, tmp_path / "indexed.jsonl", indexed=True)
+    reindexed = load_selection_pack(tmp_path / "indexed.jsonl")
+    assert {k: [s.completion for s in v] for k, v in reindexed.items()} == {
+        k: [s.completion for s in v] for k, v in rebuilt.items()
+    }
+
+    deduped = merge_completion_files(jobs, tmp_path / "dedup.jsonl", indexed=True, dedupe=True)
+    n_distinct = sum(len({s.completion for s in v}) for v in pack.values())
+    assert deduped["n_samples"] == n_distinct
+    assert deduped["n_duplicates_dropped"] == 4 * len(pack) - n_distinct
+
+
+def test_group_advantages_center_and_scale_per_example(tmp_path: Path):
+    assert group_advantages([1.0, 0.0, 0.0, 0.0]) == pytest.approx([0.75, -0.25, -0.25, -0.25])
+    scaled = group_advantages([1.0, 0.0], normalize_std=True, eps=0.0)
+    assert scaled == pytest.approx([1.0, -1.0])
+    assert group_advantages([1.0, 1.0], normalize_std=True) == [0.0, 0.0]
+
+    matrix_path, _ = build_reward_matrix(dataset_path=DATASET, samples_path=PACK, cache_dir=tmp_path / "cache")
+    stats = export_advantages(matrix_path, tmp_path / "adv.csv", normalize_std=True)
+    with (tmp_path / "adv.csv").open(encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == stats["n_rows"] == 4 * stats["n_groups"]
+    by_id: dict[str, float] = {}
+    for r in rows:
+        by_id[r["id"]] = by_id.get(r["id"], 0.0) + float(r["advantage"])
+    assert all(abs(total) < 1e-9 for total in by_id.values())
+
+
+def test_rejection_sft_is_identical_across_workers_and_respects_cap(tmp_path: Path):
+    _, one = build_rejection_sft(dataset_path=DATASET, samples_path=PACK, out_dir=tmp_path / "w1", k=1)
+    _, two = build_rejection_sft(dataset_path=DATASET, samples_path=PACK, out_dir=tmp_path / "w2", k=1, workers=2)
+    sft = (tmp_path / "w1" / "sft.jsonl").read_text(encoding="utf-8")
+    assert sft == (tmp_path / "w2" / "sft.jsonl").read_text(encoding="utf-8")
+    assert one["counts"] == two["counts"]
+
+    ex_by_id = index_by_id(load_examples(DATASET))
+    rows = [json.loads(line) for line in sft.splitlines()]
+    assert len({r["id"] for r in rows}) == len(rows) == one["counts"]["n_kept"]
+    assert all(score(ex_by_id[r["id"]], r["completion"])["reward"] == 1.0 for r in rows)
+
+    _, uncapped = build_rejection_sft(dataset_path=DATASET, samples_path=PACK, out_dir=tmp_path / "all")
+    assert uncapped["counts"]["n_kept"] == uncapped["counts"]["n_passing"] >= one["counts"]["n_kept"]
+
+    # A duplicated id in two different shards is caught whatever the worker count.
+    records = [json.loads(line) for line in PACK.read_text(encoding="utf-8").splitlines()]
+    dup = _write_pack(tmp_path / "dup.jsonl", [records[0]] + records[1:] + [records[0]])
+    for workers in (1, 2):
+        with pytest.raises(ValueError, match="Duplicate selection-pack id"):
+            build_rejection_sft(dataset_path=DATASET, samples_path=dup, out_dir=tmp_path / f"dup{workers}", workers=workers)
+        assert not (tmp_path / f"dup{workers}" / "sft.jsonl").exists()
+
+
+def test_parallel_selection_matches_serial_rows_and_metrics(tmp_path: Path):
+    records = [json.loads(line) for line in PACK.read_text(encoding="utf-8").splitlines()]
+    pack = _write_pack(tmp_path / "pack.jsonl", records[3:] + records[:1])  # two examples missing
+    cascade = make_lazy_pick_best(LazyPolicy.from_module(selection_policy_sol), prefilter=passes_cheap_checks)
+
+    for name, policy, kwargs in (("eager", pick_best, {}), ("cascade", cascade, {"pass_at_k": True, "compact": True})):
+        runs = {}
+        for workers in (1, 3):
+            out = tmp_path / f"{name}_{workers}"
+            _, summary = run_selection_demo(
+                dataset_path=DATASET, samples_path=pack, pick_best=policy, out_dir=out, workers=workers, **kwargs
+            )
+            summary["run"].pop("created_utc")
+            runs[workers] = ((out / "results.jsonl").read_text(encoding="utf-8"), summary)
+        assert runs[1] == runs[3]
+        assert runs[1][1]["run"]["n_missing_samples"] == 2
+        ids = [json.loads(line)["id"] for line in runs[1][0].splitlines()]
+        assert ids == [r["id"] for r in records]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import statistics
+from math import comb
+
+import pytest
+
+from course.core.stats import (
+    category_bootstrap,
+    expected_samples_to_first_success,
+    pass_at_k,
+    poisson_variate,
+    wilson_interval,
+)
+
+
+@pytest.mark.parametrize("n,c", [(4, 0), (4, 1), (4, 3), (8, 2), (10, 10)])
+def test_pass_at_k_matches_combinatorial_definition(n: int, c: int):
+    for k in range(1, n + 1):
+        expected = 1.0 - comb(n - c, k) / comb(n, k)
+        assert pass_at_k(n, c, k) == pytest.approx(expected)
+
+
+def test_expected_samples_to_first_success_matches_enumeration():
+    n, c = 5, 2
+    positions = []
+    for correct in itertools.combinations(range(n), c):
+        positions.append(min(correct) + 1)
+    assert expected_samples_to_first_success(n, c) == pytest.approx(sum(positions) / len(positions))
+    assert expected_samples_to_first_success(n, 0) is None
+
+
+def test_wilson_interval_brackets_the_estimate():
+    low, high = wilson_interval(0, 20)
+    assert low == 0.0 and 0.0 < high < 0.2
+    low, high = wilson_interval(15, 20)
+    assert low < 0.75 < high
+
+
+def test_poisson_variate_matches_mean_and_variance():
+    rng = random.Random(0)
+    for lam in (0.7, 4.0, 25.0, 5000.0):
+        xs = [poisson_variate(rng, lam) for _ in range(20000)]
+        assert statistics.mean(xs) == pytest.approx(lam, rel=0.03)
+        assert statistics.pvariance(xs) == pytest.approx(lam, rel=0.06)
+
+
+def test_category_bootstrap_matches_normal_theory_and_is_seeded():
+    # 1M paired examples: 5% net gain, 35% discordant.
+    counts = [600_000, 200_000, 150_000, 50_000]
+    values = {"delta": [0.0, 1.0, -1.0, 0.0]}
+    a = category_bootstrap(counts, values, n_resamples=4000, seed=1, backend="python")
+    b = category_bootstrap(counts, values, n_resamples=4000, seed=1, backend="python")
+    assert a == b
+    ci = a["stats"]["delta"]
+    se = math.sqrt((0.35 - 0.05**2) / 1_000_000)
+    assert ci["estimate"] == pytest.approx(0.05)
+    assert ci["low"] == pytest.approx(0.05 - 1.96 * se, abs=2e-4)
+    assert ci["high"] == pytest.approx(0.05 + 1.96 * se, abs=2e-4)
+
+
+def test_category_bootstrap_numpy_backend_agrees_with_python():
+    pytest.importorskip("numpy")
+
+    counts, values = [900, 60, 40], {"delta": [0.0, 1.0, -1.0]}
+    py = category_bootstrap(counts, values, n_resamples=4000, backend="python")["stats"]["delta"]
+    vec = category_bootstrap(counts, values, n_resamples=4000, backend="numpy")["stats"]["delta"]
+    assert vec["low"] == pytest.approx(py["low"], abs=0.005)
+    assert vec["high"] == pytest.approx(py["high"], abs=0.005)